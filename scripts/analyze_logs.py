@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SVN 合并助手 - 应用日志分析
+
+流式解析 latest.log / app_*.log（默认为 collect_logs.py 检查的所有位置，也可指定文件或目录），
+统计：
+- 各级别、各 tag（SVN / STORAGE / PRELOAD / MERGE ...）的日志条数
+- 消息模板：把 revision（r123）、URL、路径、数字等可变部分替换为占位符后聚类，
+  输出每个模板的条数和首次/最后出现时间（见 lib/log_templates.py）
+
+逐行处理，内存中只保留计数和模板表，与日志量无关。
+各文件在独立进程中并行分析（--jobs），最后合并计数和模板表。
+
+使用示例：
+```bash
+python scripts/analyze_logs.py                           # 所有默认位置的日志
+python scripts/analyze_logs.py logs/collected_xxx/        # 分析收集到的日志目录
+python scripts/analyze_logs.py --level warn --top 50      # 只看 WARN 及以上
+python scripts/analyze_logs.py --tag svn --since 2h       # 最近 2 小时的 SVN 日志
+python scripts/analyze_logs.py --json report.json
+```
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent / "lib"))
+from app_log_format import LEVELS
+from app_log_reader import iter_log_records, resolve_log_files
+from log_templates import DEFAULT_MAX_TEMPLATES, TemplateCounter
+from log_time_window import TimeWindow, time_argument
+
+
+@dataclass
+class LogSummary:
+    """流式聚合结果"""
+    files: List[str] = field(default_factory=list)
+    bytes: int = 0
+    records: int = 0
+    detail_lines: int = 0
+    first_time: Optional[datetime] = None
+    last_time: Optional[datetime] = None
+    levels: Counter = field(default_factory=Counter)
+    tags: Dict[str, Counter] = field(default_factory=dict)
+
+    def merge(self, other: "LogSummary"):
+        """合并另一个文件的统计"""
+        self.files.extend(other.files)
+        self.bytes += other.bytes
+        self.records += other.records
+        self.detail_lines += other.detail_lines
+        self.levels.update(other.levels)
+        for tag, counts in other.tags.items():
+            self.tags.setdefault(tag, Counter()).update(counts)
+        if other.first_time is not None:
+            self.first_time = min(filter(None, (self.first_time, other.first_time)))
+        if other.last_time is not None:
+            self.last_time = max(filter(None, (self.last_time, other.last_time)))
+
+
+def analyze_file(
+    path: Path,
+    window: Optional[TimeWindow],
+    tags: Optional[List[str]],
+    min_level: str,
+    max_templates: int,
+) -> Tuple[LogSummary, TemplateCounter]:
+    """读取一个日志文件并聚合（在工作进程中执行）"""
+    summary = LogSummary(files=[str(path)], bytes=path.stat().st_size)
+    templates = TemplateCounter(max_templates)
+    skipped_levels = set(LEVELS[:LEVELS.index(min_level)])
+    tag_filter = {tag.upper() for tag in tags} if tags else None
+
+    for record in iter_log_records([path], window):
+        if tag_filter is not None and record.tag.upper() not in tag_filter:
+            continue
+        if record.level in skipped_levels:
+            continue
+        if window is not None and not window.overlaps(record.time, record.time):
+            continue
+
+        summary.records += 1
+        summary.detail_lines += record.detail_lines
+        summary.levels[record.level] += 1
+        tag_counts = summary.tags.get(record.tag)
+        if tag_counts is None:
+            tag_counts = summary.tags[record.tag] = Counter()
+        tag_counts[record.level] += 1
+        if summary.first_time is None or record.time < summary.first_time:
+            summary.first_time = record.time
+        if summary.last_time is None or record.time > summary.last_time:
+            summary.last_time = record.time
+        templates.add(record.level, record.tag, record.message, record.time)
+    return summary, templates
+
+
+def analyze(
+    files: List[Path],
+    window: Optional[TimeWindow],
+    tags: Optional[List[str]],
+    min_level: str,
+    max_templates: int,
+    jobs: int,
+) -> Tuple[LogSummary, TemplateCounter]:
+    """并行分析所有日志文件并合并结果"""
+    summary = LogSummary()
+    templates = TemplateCounter(max_templates)
+    arguments = [(path, window, tags, min_level, max_templates) for path in files]
+    if jobs <= 1 or len(files) <= 1:
+        results = [analyze_file(*item) for item in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(files))) as pool:
+            results = list(pool.map(analyze_file, *zip(*arguments)))
+    for file_summary, file_templates in results:
+        summary.merge(file_summary)
+        templates.merge(file_templates)
+    return summary, templates
+
+
+def _format_time(moment: Optional[datetime]) -> str:
+    return moment.isoformat(sep=" ", timespec="seconds") if moment else "-"
+
+
+def print_report(summary: LogSummary, templates: TemplateCounter, top: int, elapsed: float) -> None:
+    """输出文本报告"""
+    print(f"分析 {len(summary.files)} 个日志文件，{summary.bytes / 1024 / 1024:.1f} MB，耗时 {elapsed:.2f}s")
+    print(f"日志 {summary.records} 条（另有 {summary.detail_lines} 行错误详情/堆栈）")
+    print(f"时间范围: {_format_time(summary.first_time)} ~ {_format_time(summary.last_time)}")
+
+    print()
+    print("按级别:")
+    for level in sorted(summary.levels, key=lambda name: LEVELS.index(name) if name in LEVELS else len(LEVELS)):
+        print(f"  {level:<6} {summary.levels[level]:>8}")
+
+    print()
+    print("按 tag:")
+    print(f"  {'tag':<10} {'合计':>8}" + "".join(f" {level:>7}" for level in LEVELS))
+    for tag, counts in sorted(summary.tags.items(), key=lambda item: -sum(item[1].values())):
+        print(f"  {tag:<10} {sum(counts.values()):>8}" + "".join(f" {counts.get(level, 0):>7}" for level in LEVELS))
+
+    ranked = templates.top(top)
+    print()
+    print(f"消息模板（共 {len(templates.templates)} 个，显示前 {len(ranked)} 个）:")
+    for stats in ranked:
+        print(f"  {stats.count:>8}  [{stats.level:<5}] [{stats.tag}] {stats.template}")
+        print(f"            首次 {_format_time(stats.first_seen)}  最后 {_format_time(stats.last_seen)}")
+    if templates.overflow:
+        print(f"  模板数达到上限 {templates.max_templates}，另有 {templates.overflow} 条日志未归类")
+
+
+def build_json(summary: LogSummary, templates: TemplateCounter, top: int, elapsed: float) -> Dict[str, object]:
+    """可序列化为 JSON 的报告"""
+    data: Dict[str, object] = {
+        "files": summary.files,
+        "bytes": summary.bytes,
+        "records": summary.records,
+        "detail_lines": summary.detail_lines,
+        "first_time": _format_time(summary.first_time),
+        "last_time": _format_time(summary.last_time),
+        "levels": dict(summary.levels),
+        "tags": {tag: dict(counts) for tag, counts in summary.tags.items()},
+    }
+    data["elapsed"] = round(elapsed, 3)
+    data["templates"] = [
+        dict(asdict(stats), first_seen=_format_time(stats.first_seen), last_seen=_format_time(stats.last_seen))
+        for stats in templates.top(top)
+    ]
+    data["template_count"] = len(templates.templates)
+    data["template_overflow"] = templates.overflow
+    return data
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="应用日志统计与消息模板聚类")
+    parser.add_argument("paths", nargs="*", type=Path, help="日志文件或目录，默认查找所有日志位置")
+    parser.add_argument("--tag", action="append", help="只统计该 tag（可重复，不区分大小写）")
+    parser.add_argument("--level", type=str.upper, choices=LEVELS, default="DEBUG", help="只统计该级别及以上")
+    parser.add_argument("--since", type=time_argument, help='起始时间，如 "2026-10-16 22:40"、"22:40"、"2h"')
+    parser.add_argument("--until", type=time_argument, help="结束时间，格式同 --since")
+    parser.add_argument("--top", type=int, default=30, help="输出的模板数，默认 30")
+    parser.add_argument(
+        "--max-templates",
+        type=int,
+        default=DEFAULT_MAX_TEMPLATES,
+        help=f"最多保留的模板数，默认 {DEFAULT_MAX_TEMPLATES}",
+    )
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="并行分析的进程数，默认为 CPU 核数")
+    parser.add_argument("--json", metavar="PATH", help="同时把报告写入 JSON 文件（- 表示输出到标准输出）")
+    args = parser.parse_args(argv)
+
+    if args.top <= 0 or args.max_templates <= 0 or args.jobs <= 0:
+        parser.error("--top、--max-templates 和 --jobs 必须为正数")
+    window = TimeWindow(args.since, args.until) if args.since or args.until else None
+
+    files = resolve_log_files(args.paths, Path(__file__).parent.parent)
+    if not files:
+        print("未找到日志文件（可用 check_log_paths.py 查看检查的位置）")
+        return 1
+
+    started = time.monotonic()
+    summary, templates = analyze(files, window, args.tag, args.level, args.max_templates, args.jobs)
+    elapsed = time.monotonic() - started
+
+    if args.json == "-":
+        print(json.dumps(build_json(summary, templates, args.top, elapsed), ensure_ascii=False, indent=2))
+        return 0
+    print_report(summary, templates, args.top, elapsed)
+    if args.json:
+        Path(args.json).write_text(
+            json.dumps(build_json(summary, templates, args.top, elapsed), ensure_ascii=False, indent=2),
+            encoding="utf-8",
+        )
+        print(f"\nJSON 报告: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,28 +8,71 @@ SVN 合并助手 - 跨平台桌面构建脚本。
 - 支持通过参数显式指定目标平台
 - 构建前同步 VERSION.yaml 到 pubspec.yaml
 - 输出脚本日志到 logs/scripts/build_latest.log
+- 命令输出流式写入日志，完整输出另存为 logs/scripts/build_<时间戳>.cmdNN.txt.gz
+- pub get / build_runner / flutter build 按输入指纹跳过未变化的步骤
+  （缓存位于 .dart_tool/svn_merge_build/，--force 或 --clean 时忽略）
+- 命令连续 --stall-timeout 秒没有输出时判定为停滞并终止；pub get / build_runner /
+  flutter build 的超时按历史耗时推算（最近成功耗时 p95 × 3），历史不足时用默认值
+- --modes debug,profile,release 一次构建多个模式：环境检查、版本同步、
+  pub get 和代码生成只执行一次，各模式依次构建，打包与下一个模式的构建并行
+- 按类别（引擎、AOT 快照、flutter_assets、原生插件）统计产物体积并按版本记录，
+  相对上一个版本增长超过阈值时告警或失败（--size-threshold / --size-check）
 """
 
 import argparse
 import os
 import platform
+import re
 import shutil
 import subprocess
 import sys
+import time
 import traceback
-import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, List, Optional, Union
+from typing import Callable, ContextManager, Iterable, List, Optional, Tuple, Union
 
 sys.path.insert(0, str(Path(__file__).parent / "lib"))
+from artifact_packager import ARCHIVE_FORMATS, DEFAULT_COMPRESSION_LEVEL, archive_suffix, create_archive
+from build_fingerprint import FingerprintCache, flutter_build_inputs, flutter_sdk_inputs, pub_get_inputs
+from build_history import HISTORY_FILE_NAME, adaptive_timeout
+from bundle_size import CATEGORIES, SizeHistory, SizeReport, analyze_bundle, compare_with_previous, format_bytes
+from command_stream import CommandStalled, stream_command
 from script_logger import ScriptLogger
+from version_manager import VersionManager
 
 
 SUPPORTED_PLATFORMS = ("windows", "macos", "linux")
 BUILD_MODES = ("debug", "profile", "release")
 APP_NAME = "SvnAutoMerge"
+OUTPUT_HEAD_LINES = 100
+OUTPUT_TAIL_LINES = 100
+FAILURE_TAIL_LINES = 40
+DEFAULT_STALL_SECONDS = 300
+CODEGEN_PART_PATTERN = re.compile(r"""^part\s+['"]([^'"]+\.g\.dart)['"];""", re.MULTILINE)
+
+
+
+@dataclass
+class ModeResult:
+    """单个构建模式的结果。"""
+    mode: str
+    output_path: Path
+    build_seconds: float
+    built: bool
+    output_bytes: int = 0
+    archive_path: Optional[Path] = None
+    archive_bytes: int = 0
+    package_seconds: float = 0.0
+    size_report: Optional[SizeReport] = None
+
 
 logger: Optional[ScriptLogger] = None
+stream_output = True
+stall_seconds: float = DEFAULT_STALL_SECONDS
+command_counter = 0
 
 
 def get_project_root() -> Path:
@@ -66,13 +109,40 @@ def quote_command(command: Iterable[str]) -> str:
     return subprocess.list2cmdline([str(part) for part in command])
 
 
+def phase(name: str) -> ContextManager[object]:
+    """记录一个构建阶段的计时 span（无 logger 时为空操作）。"""
+    if logger:
+        return logger.span(name)
+    return nullcontext()
+
+
+def step_timeout(step: str, default: int, target_platform: Optional[str] = None) -> float:
+    """按历史耗时推算步骤超时（最近成功耗时 p95 × 3，限制在 [120 秒, 默认值 × 2]）。"""
+    if not logger:
+        return default
+    timeout, p95 = adaptive_timeout(
+        "build",
+        step,
+        default,
+        platform=target_platform,
+        db_path=logger.log_dir / HISTORY_FILE_NAME,
+    )
+    if p95 is not None:
+        logger.info(f"超时 {timeout:.0f} 秒（历史 p95 {p95:.1f} 秒 × 3）: {step}")
+    return timeout
+
+
 def run_command(
     command: List[str],
     cwd: Path,
-    timeout_seconds: int,
+    timeout_seconds: float,
     check: bool = True,
 ) -> subprocess.CompletedProcess[str]:
-    """执行命令并写入日志。"""
+    """执行命令并写入日志。
+
+    默认流式执行：输出逐行写入日志，完整输出另存 gzip 旁路文件，
+    返回值的 stdout 只包含有界的头部/尾部行。
+    """
     if logger:
         logger.command(quote_command(command))
 
@@ -81,6 +151,24 @@ def run_command(
     if use_shell:
         command_for_run = quote_command(command)
 
+    span: ContextManager[object] = nullcontext()
+    if logger:
+        span = logger.span(quote_command(command), category="command", quiet=True)
+    with span:
+        if stream_output:
+            return run_command_streaming(command, command_for_run, cwd, timeout_seconds, check, use_shell)
+        return run_command_buffered(command, command_for_run, cwd, timeout_seconds, check, use_shell)
+
+
+def run_command_buffered(
+    command: List[str],
+    command_for_run: Union[List[str], str],
+    cwd: Path,
+    timeout_seconds: float,
+    check: bool,
+    use_shell: bool,
+) -> subprocess.CompletedProcess[str]:
+    """一次性执行命令，结束后记录前 200 行输出。"""
     result = subprocess.run(
         command_for_run,
         cwd=str(cwd),
@@ -105,6 +193,79 @@ def run_command(
     return result
 
 
+def run_command_streaming(
+    command: List[str],
+    command_for_run: Union[List[str], str],
+    cwd: Path,
+    timeout_seconds: float,
+    check: bool,
+    use_shell: bool,
+) -> subprocess.CompletedProcess[str]:
+    """流式执行命令：输出实时写日志，内存只保留头尾行。"""
+    global command_counter
+    command_counter += 1
+
+    spill_file = None
+    on_line = None
+    if logger:
+        spill_file = logger.get_artifact_path(f".cmd{command_counter:02d}.txt.gz")
+        on_line = logger.command_output_line
+
+    try:
+        result = stream_command(
+            command_for_run,
+            cwd=cwd,
+            timeout_seconds=timeout_seconds,
+            on_line=on_line,
+            spill_file=spill_file,
+            shell=use_shell,
+            head_size=OUTPUT_HEAD_LINES,
+            tail_size=OUTPUT_TAIL_LINES,
+            stall_seconds=stall_seconds,
+        )
+    except subprocess.TimeoutExpired as error:
+        if isinstance(error, CommandStalled):
+            reason = str(error)
+        else:
+            reason = f"命令超过 {timeout_seconds:.0f} 秒未完成"
+        if logger:
+            logger.error(f"{reason}，已终止: {quote_command(command)}")
+            tail = (error.output or "").splitlines()[-FAILURE_TAIL_LINES:]
+            if tail:
+                logger.error(f"命令输出末尾 {len(tail)} 行:")
+                for line in tail:
+                    logger.error(f"  | {line}")
+            if spill_file is not None and spill_file.exists():
+                logger.info(f"完整输出: {spill_file}")
+        raise RuntimeError(f"{reason}: {quote_command(command)}") from error
+
+    output = result.output
+    if logger:
+        logger.info(
+            f"命令结束（exit {result.returncode}，{result.duration:.1f} 秒，"
+            f"输出 {output.total_lines} 行）"
+        )
+        if spill_file is not None and output.total_lines:
+            logger.info(f"完整输出: {spill_file}")
+
+    if check and result.returncode != 0:
+        if logger and output.total_lines:
+            tail = output.last_lines(FAILURE_TAIL_LINES)
+            logger.error(f"命令输出末尾 {len(tail)} 行:")
+            for line in tail:
+                logger.error(f"  | {line}")
+        raise RuntimeError(
+            f"命令执行失败（exit {result.returncode}）: {quote_command(command)}"
+        )
+
+    return subprocess.CompletedProcess(
+        args=command,
+        returncode=result.returncode,
+        stdout=output.text(),
+        stderr="",
+    )
+
+
 def find_flutter() -> Optional[str]:
     """查找 Flutter CLI。"""
     flutter_path = shutil.which("flutter")
@@ -155,30 +316,16 @@ def validate_platform(target_platform: str, current_platform: str, project_root:
 
 
 def sync_version(project_root: Path, component: str) -> Optional[str]:
-    """复用现有版本管理脚本，同步版本号并返回版本字符串。"""
-    version_manager = project_root / "scripts" / "lib" / "version_manager.py"
-    if not version_manager.exists():
-        if logger:
-            logger.warn("未找到版本管理脚本，跳过版本同步")
-        return None
-
-    python_cmd = sys.executable
+    """同步版本号到 pubspec.yaml 及各平台 Runner 文件并返回版本字符串（进程内，只读取一次 VERSION.yaml）。"""
     try:
+        manager = VersionManager(project_root=project_root)
+        if logger:
+            logger.info("同步 VERSION.yaml 到 pubspec.yaml 及平台 Runner 文件...")
+        for result in manager.sync_all(component):
+            if logger and result.status == "updated":
+                logger.info(f"已更新版本号: {result.path.relative_to(project_root)}")
+        version = manager.get_version(component)
         if logger:
-            logger.info("同步 VERSION.yaml 到 pubspec.yaml...")
-        run_command(
-            [python_cmd, str(version_manager), "sync", component],
-            project_root,
-            timeout_seconds=60,
-        )
-
-        result = run_command(
-            [python_cmd, str(version_manager), "extract", component],
-            project_root,
-            timeout_seconds=60,
-        )
-        version = result.stdout.strip().splitlines()[-1] if result.stdout.strip() else None
-        if version and logger:
             logger.info(f"当前版本: {version}")
         return version
     except Exception as error:
@@ -197,6 +344,176 @@ def should_run_codegen(project_root: Path) -> bool:
     return "build_runner" in content
 
 
+def find_codegen_sources(project_root: Path) -> List[Path]:
+    """查找声明了 *.g.dart part 的 Dart 源文件（json_serializable 模型）。"""
+    sources: List[Path] = []
+    lib_dir = project_root / "lib"
+    if not lib_dir.exists():
+        return sources
+    for dart_file in sorted(lib_dir.rglob("*.dart")):
+        if dart_file.name.endswith(".g.dart"):
+            continue
+        try:
+            content = dart_file.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            continue
+        if CODEGEN_PART_PATTERN.search(content):
+            sources.append(dart_file)
+    return sources
+
+
+def codegen_outputs(sources: List[Path]) -> List[Path]:
+    """返回代码生成源文件对应的 *.g.dart 产物路径。"""
+    outputs: List[Path] = []
+    for source in sources:
+        content = source.read_text(encoding="utf-8")
+        for part in CODEGEN_PART_PATTERN.findall(content):
+            outputs.append(source.parent / part)
+    return outputs
+
+
+def run_cached_step(
+    cache: FingerprintCache,
+    use_cache: bool,
+    step: str,
+    digest: str,
+    outputs: List[Path],
+    action: Callable[[], object],
+    digest_after: Optional[Callable[[], str]] = None,
+) -> bool:
+    """指纹未变化且产物存在时跳过步骤，否则执行并记录指纹。
+
+    Args:
+        cache: 指纹缓存
+        use_cache: 是否允许跳过（--force/--clean 时为 False，但仍记录指纹）
+        step: 步骤名
+        digest: 执行前的输入指纹
+        outputs: 步骤产物，任一缺失都会重新执行
+        action: 实际执行的动作
+        digest_after: 步骤会改写自身输入时（如 pub get 更新 pubspec.lock），
+            用它重新计算执行后的指纹
+
+    Returns:
+        是否实际执行了步骤
+    """
+    if use_cache and cache.is_fresh(step, digest, outputs):
+        if logger:
+            logger.info(f"输入未变化且产物存在，跳过: {step}")
+            # 标记所在阶段为缓存命中，运行历史统计耗时时排除
+            current = logger.trace.current("step")
+            if current is not None:
+                current.args["cached"] = True
+        return False
+
+    action()
+
+    cache.record(step, digest_after() if digest_after else digest)
+    cache.save()
+    return True
+
+
+def prepare_build(
+    flutter_cmd: str,
+    project_root: Path,
+    clean: bool,
+    skip_codegen: bool,
+    force: bool = False,
+) -> Tuple[FingerprintCache, bool]:
+    """执行各构建模式共享的准备步骤（clean / pub get / 代码生成）。
+
+    Returns:
+        (指纹缓存, 是否允许按指纹跳过步骤)
+    """
+    if clean:
+        with phase("flutter clean"):
+            run_command([flutter_cmd, "clean"], project_root, timeout_seconds=600, check=False)
+
+    # flutter clean 会删除 .dart_tool，因此在清理之后再加载缓存
+    cache = FingerprintCache.for_project(project_root)
+    use_cache = not clean and not force
+    tool_info = {"flutter": flutter_cmd}
+    sdk_inputs = flutter_sdk_inputs(flutter_cmd)
+
+    with phase("flutter pub get"):
+        pub_inputs = pub_get_inputs(project_root, flutter_cmd)
+
+        def pub_digest() -> str:
+            return cache.fingerprint(project_root, pub_inputs, extra=tool_info)
+
+        run_cached_step(
+            cache,
+            use_cache,
+            "pub_get",
+            pub_digest(),
+            [project_root / ".dart_tool" / "package_config.json"],
+            lambda: run_command(
+                [flutter_cmd, "pub", "get"],
+                project_root,
+                timeout_seconds=step_timeout("flutter pub get", 600),
+            ),
+            digest_after=pub_digest,
+        )
+
+    if not skip_codegen and should_run_codegen(project_root):
+        with phase("build_runner"):
+            sources = find_codegen_sources(project_root)
+            codegen_inputs = sources + [project_root / "pubspec.lock", project_root / "build.yaml"] + sdk_inputs
+            run_cached_step(
+                cache,
+                use_cache,
+                "build_runner",
+                cache.fingerprint(project_root, codegen_inputs, extra=tool_info),
+                codegen_outputs(sources),
+                lambda: run_command(
+                    [
+                        flutter_cmd,
+                        "pub",
+                        "run",
+                        "build_runner",
+                        "build",
+                        "--delete-conflicting-outputs",
+                    ],
+                    project_root,
+                    timeout_seconds=step_timeout("build_runner", 900),
+                ),
+            )
+    elif skip_codegen and logger:
+        logger.info("已按参数跳过代码生成")
+
+    return cache, use_cache
+
+
+def build_mode(
+    flutter_cmd: str,
+    project_root: Path,
+    target_platform: str,
+    mode: str,
+    cache: FingerprintCache,
+    use_cache: bool,
+) -> bool:
+    """执行单个模式的 flutter build，返回是否实际执行。"""
+    with phase(f"flutter build {target_platform} --{mode}"):
+        build_inputs = flutter_build_inputs(project_root, target_platform, flutter_cmd)
+        return run_cached_step(
+            cache,
+            use_cache,
+            f"build_{target_platform}_{mode}",
+            cache.fingerprint(
+                project_root,
+                build_inputs,
+                extra={"flutter": flutter_cmd, "platform": target_platform, "mode": mode},
+            ),
+            [get_build_output_path(project_root, target_platform, mode)],
+            lambda: run_command(
+                [flutter_cmd, "build", target_platform, f"--{mode}"],
+                project_root,
+                timeout_seconds=step_timeout(
+                    f"flutter build {target_platform} --{mode}", 1800, target_platform
+                ),
+            ),
+        )
+
+
 def run_flutter_build(
     flutter_cmd: str,
     project_root: Path,
@@ -204,34 +521,154 @@ def run_flutter_build(
     mode: str,
     clean: bool,
     skip_codegen: bool,
+    force: bool = False,
 ) -> None:
-    """执行 Flutter 桌面构建。"""
-    if clean:
-        run_command([flutter_cmd, "clean"], project_root, timeout_seconds=600, check=False)
+    """执行 Flutter 桌面构建（单个模式）。"""
+    cache, use_cache = prepare_build(flutter_cmd, project_root, clean, skip_codegen, force)
+    build_mode(flutter_cmd, project_root, target_platform, mode, cache, use_cache)
+
+
+def parse_modes(value: str) -> List[str]:
+    """解析 --modes 参数（逗号分隔，去重并保持顺序）。"""
+    modes: List[str] = []
+    for part in value.split(","):
+        mode = part.strip().lower()
+        if not mode:
+            continue
+        if mode not in BUILD_MODES:
+            raise argparse.ArgumentTypeError(
+                f"不支持的构建模式: {mode}，可选值: {', '.join(BUILD_MODES)}"
+            )
+        if mode not in modes:
+            modes.append(mode)
+    if not modes:
+        raise argparse.ArgumentTypeError("至少需要一个构建模式")
+    return modes
+
+
+def run_build_matrix(
+    flutter_cmd: str,
+    project_root: Path,
+    target_platform: str,
+    modes: List[str],
+    cache: FingerprintCache,
+    use_cache: bool,
+    package: Optional[Callable[[ModeResult], None]] = None,
+) -> List[ModeResult]:
+    """依次构建各模式，每个模式构建完成后在后台打包。
+
+    同一项目的 flutter 命令会争用 Flutter 的全局启动锁和共享的
+    build/、.dart_tool/ 目录，并发执行 flutter build 并不能提速，
+    因此构建串行执行；打包（纯 Python、多线程压缩）与下一个模式的构建重叠。
+    """
+    results: List[ModeResult] = []
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="package") as packager:
+        pending: List[Future] = []
+        for mode in modes:
+            start = time.monotonic()
+            built = build_mode(flutter_cmd, project_root, target_platform, mode, cache, use_cache)
+            output_path = get_build_output_path(project_root, target_platform, mode)
+            if not output_path.exists():
+                raise RuntimeError(f"构建命令完成，但未找到预期产物: {output_path}")
+            if logger:
+                logger.info(f"构建产物 ({mode}): {output_path}")
+
+            size_report = analyze_bundle(output_path, APP_NAME)
+            result = ModeResult(
+                mode=mode,
+                output_path=output_path,
+                build_seconds=time.monotonic() - start,
+                built=built,
+                output_bytes=size_report.total_bytes,
+                size_report=size_report,
+            )
+            results.append(result)
+            if package is not None:
+                pending.append(packager.submit(package, result))
+
+        for future in pending:
+            future.result()
+    return results
+
+
+def log_matrix_summary(results: List[ModeResult]) -> None:
+    """输出各模式耗时与产物大小汇总表。"""
+    if not logger or not results:
+        return
+    logger.info("构建汇总:")
+    logger.info(f"  {'模式':<8} {'构建耗时':>10} {'产物大小':>12} {'打包耗时':>10} {'归档大小':>12}  归档")
+    for result in results:
+        build_time = f"{result.build_seconds:.1f}s" + ("" if result.built else "*")
+        archive_name = result.archive_path.name if result.archive_path else "-"
+        logger.info(
+            f"  {result.mode:<8} {build_time:>10} {format_size(result.output_bytes):>12} "
+            f"{result.package_seconds:>9.1f}s {format_size(result.archive_bytes):>12}  {archive_name}"
+        )
+    if any(not result.built for result in results):
+        logger.info("  * 输入未变化，沿用了已有构建产物")
 
-    run_command([flutter_cmd, "pub", "get"], project_root, timeout_seconds=600)
 
-    if not skip_codegen and should_run_codegen(project_root):
-        run_command(
-            [
-                flutter_cmd,
-                "pub",
-                "run",
-                "build_runner",
-                "build",
-                "--delete-conflicting-outputs",
-            ],
-            project_root,
-            timeout_seconds=900,
+def check_bundle_sizes(
+    results: List[ModeResult],
+    target_platform: str,
+    version: Optional[str],
+    threshold_percent: float,
+    action: str,
+) -> None:
+    """输出产物体积分类，记录到体积历史，并与上一个版本比较。
+
+    action 为 fail 时，任一类别增长超过阈值会抛出 RuntimeError。
+    """
+    if action == "off" or not results:
+        return
+
+    history = SizeHistory()
+    regressed_modes: List[str] = []
+    for result in results:
+        report = result.size_report
+        if report is None:
+            continue
+        if logger:
+            logger.info(f"产物体积 ({result.mode}): {format_size(report.total_bytes)}，{report.file_count} 个文件")
+            for category in CATEGORIES:
+                if report.categories[category]:
+                    logger.info(f"  {category:<15} {format_bytes(report.categories[category]):>10}")
+
+        if not version:
+            if logger:
+                logger.warn("未获取到版本号，跳过体积历史记录与比较")
+            continue
+
+        comparison = compare_with_previous(
+            history, version, target_platform, result.mode, report, threshold_percent
         )
-    elif skip_codegen and logger:
-        logger.info("已按参数跳过代码生成")
+        history.record(version, target_platform, result.mode, report)
+        if not logger:
+            continue
+        if comparison.previous_version is None:
+            logger.info(f"没有低于 {version} 的 {target_platform}/{result.mode} 历史体积记录，已记录为基线")
+            continue
+        for regression in comparison.regressions:
+            logger.warn(
+                f"体积增长 ({result.mode}) {regression.category}: "
+                f"{format_bytes(regression.previous_bytes)} ({regression.previous_version}) -> "
+                f"{format_bytes(regression.current_bytes)} ({version})，"
+                f"+{regression.growth_percent:.1f}% 超过阈值 {threshold_percent:g}%"
+            )
+        if comparison.regressions:
+            regressed_modes.append(result.mode)
+        else:
+            logger.info(f"体积相对 {comparison.previous_version} 未超过阈值 {threshold_percent:g}% ({result.mode})")
+
+    if regressed_modes and action == "fail":
+        raise RuntimeError(f"产物体积增长超过阈值: {', '.join(regressed_modes)}")
 
-    run_command(
-        [flutter_cmd, "build", target_platform, f"--{mode}"],
-        project_root,
-        timeout_seconds=1800,
-    )
+
+def format_size(size: int) -> str:
+    """把字节数格式化为便于阅读的字符串。"""
+    if size <= 0:
+        return "-"
+    return f"{size / (1024 * 1024):.1f} MB"
 
 
 def get_build_output_path(project_root: Path, target_platform: str, mode: str) -> Path:
@@ -251,39 +688,48 @@ def normalize_version_for_file(version: Optional[str]) -> str:
     return version.replace("+", "build")
 
 
-def add_directory_to_zip(zip_file: zipfile.ZipFile, source: Path, include_root: bool) -> None:
-    """把目录加入 zip 包。"""
-    base_dir = source.parent if include_root else source
-    for file_path in source.rglob("*"):
-        if file_path.is_file():
-            zip_file.write(file_path, file_path.relative_to(base_dir))
-
-
 def package_output(
     project_root: Path,
     target_platform: str,
     output_path: Path,
     version: Optional[str],
+    archive_format: str = "zip",
+    compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+    workers: Optional[int] = None,
+    force: bool = False,
+    mode: str = "release",
 ) -> Path:
-    """打包构建产物为 zip。"""
+    """打包构建产物（可复现归档 + SHA-256 清单，内容未变时复用已有归档）。
+
+    release 产物命名为 SvnAutoMerge_<平台>_<版本>，其他模式追加 _<模式> 后缀。
+    """
     dist_dir = project_root / "dist"
     dist_dir.mkdir(parents=True, exist_ok=True)
     version_for_file = normalize_version_for_file(version)
-    zip_path = dist_dir / f"{APP_NAME}_{target_platform}_{version_for_file}.zip"
-
-    if zip_path.exists():
-        zip_path.unlink()
+    mode_suffix = "" if mode == "release" else f"_{mode}"
+    archive_path = dist_dir / (
+        f"{APP_NAME}_{target_platform}_{version_for_file}{mode_suffix}{archive_suffix(archive_format)}"
+    )
 
     include_root = target_platform == "macos"
-    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
-        if output_path.is_dir():
-            add_directory_to_zip(archive, output_path, include_root=include_root)
-        else:
-            archive.write(output_path, output_path.name)
+    result = create_archive(
+        archive_path,
+        output_path,
+        include_root=include_root,
+        archive_format=archive_format,
+        level=compression_level,
+        workers=workers,
+        force=force,
+    )
 
     if logger:
-        logger.info(f"打包产物: {zip_path}")
-    return zip_path
+        size_mb = archive_path.stat().st_size / (1024 * 1024)
+        if result.reused:
+            logger.info(f"产物内容未变化，沿用已有归档: {archive_path} ({size_mb:.1f} MB)")
+        else:
+            logger.info(f"打包产物: {archive_path} ({size_mb:.1f} MB，{result.file_count} 个文件)")
+        logger.info(f"产物清单: {result.manifest_path}")
+    return archive_path
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -303,6 +749,11 @@ def create_parser() -> argparse.ArgumentParser:
         default="release",
         help="构建模式，默认 release",
     )
+    parser.add_argument(
+        "--modes",
+        type=parse_modes,
+        help="一次构建多个模式（逗号分隔，如 debug,profile,release），指定后忽略 --mode",
+    )
     parser.add_argument(
         "--component",
         default="app",
@@ -313,6 +764,11 @@ def create_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="构建前执行 flutter clean",
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="忽略输入指纹缓存和产物清单，强制执行所有步骤并重新打包",
+    )
     parser.add_argument(
         "--skip-codegen",
         action="store_true",
@@ -321,7 +777,51 @@ def create_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "--package",
         action="store_true",
-        help="构建成功后打包为 dist/*.zip",
+        help="构建成功后打包到 dist/（格式见 --archive-format）",
+    )
+    parser.add_argument(
+        "--archive-format",
+        choices=ARCHIVE_FORMATS,
+        default="zip",
+        help="打包格式，默认 zip（多线程并行压缩）",
+    )
+    parser.add_argument(
+        "--compression-level",
+        type=int,
+        choices=range(0, 10),
+        default=DEFAULT_COMPRESSION_LEVEL,
+        metavar="0-9",
+        help=f"压缩级别 0-9，默认 {DEFAULT_COMPRESSION_LEVEL}（0 表示只存储）",
+    )
+    parser.add_argument(
+        "--package-workers",
+        type=int,
+        help="zip 并行压缩线程数，默认 CPU 核数",
+    )
+    parser.add_argument(
+        "--size-threshold",
+        type=float,
+        default=10.0,
+        metavar="PERCENT",
+        help="产物任一类别相对上一个版本增长超过该百分比视为体积回归，默认 10",
+    )
+    parser.add_argument(
+        "--size-check",
+        choices=("warn", "fail", "off"),
+        default="warn",
+        help="体积回归时的处理：warn 仅告警（默认），fail 构建失败，off 不统计",
+    )
+    parser.add_argument(
+        "--stall-timeout",
+        type=float,
+        default=DEFAULT_STALL_SECONDS,
+        metavar="SECONDS",
+        help=f"命令连续多少秒没有输出视为停滞并终止，默认 {DEFAULT_STALL_SECONDS}，0 表示不检测（--no-stream 时不生效）",
+    )
+    parser.add_argument(
+        "--no-stream",
+        action="store_true",
+        help="关闭流式输出，命令结束后一次性记录输出（前 200 行）",
     )
     parser.add_argument(
         "--dry-run",
@@ -333,8 +833,8 @@ def create_parser() -> argparse.ArgumentParser:
 
 def main(argv: Optional[List[str]] = None) -> int:
     """主入口。"""
-    global logger
-    logger = ScriptLogger("build")
+    global logger, stream_output, stall_seconds
+    logger = ScriptLogger("build", buffered=True)
 
     parser = create_parser()
     try:
@@ -347,6 +847,8 @@ def main(argv: Optional[List[str]] = None) -> int:
             logger.failed("参数解析失败")
         return code
 
+    stream_output = not args.no_stream
+    stall_seconds = args.stall_timeout
     project_root = get_project_root()
     os.chdir(str(project_root))
 
@@ -357,7 +859,9 @@ def main(argv: Optional[List[str]] = None) -> int:
         logger.info(f"项目目录: {project_root}")
         logger.info(f"当前平台: {current_platform}")
         logger.info(f"目标平台: {target_platform}")
-        logger.info(f"构建模式: {args.mode}")
+        modes = args.modes or [args.mode]
+        logger.info(f"构建模式: {', '.join(modes)}")
+        logger.set_metadata(platform=target_platform, mode=",".join(modes))
 
         validate_platform(target_platform, current_platform, project_root)
 
@@ -366,25 +870,50 @@ def main(argv: Optional[List[str]] = None) -> int:
             logger.success("dry-run 校验完成")
             return 0
 
-        flutter_cmd = check_flutter(project_root)
-        version = sync_version(project_root, args.component)
-        run_flutter_build(
+        with phase("检查 Flutter 环境"):
+            flutter_cmd = check_flutter(project_root)
+        with phase("同步版本号"):
+            version = sync_version(project_root, args.component)
+        logger.set_metadata(version=version)
+        cache, use_cache = prepare_build(
             flutter_cmd=flutter_cmd,
             project_root=project_root,
-            target_platform=target_platform,
-            mode=args.mode,
             clean=args.clean,
             skip_codegen=args.skip_codegen,
+            force=args.force,
         )
 
-        output_path = get_build_output_path(project_root, target_platform, args.mode)
-        if not output_path.exists():
-            raise RuntimeError(f"构建命令完成，但未找到预期产物: {output_path}")
-
-        logger.info(f"构建产物: {output_path}")
-
-        if args.package:
-            package_output(project_root, target_platform, output_path, version)
+        def package_mode(result: ModeResult) -> None:
+            start = time.monotonic()
+            with phase(f"打包产物 ({result.mode})"):
+                result.archive_path = package_output(
+                    project_root,
+                    target_platform,
+                    result.output_path,
+                    version,
+                    archive_format=args.archive_format,
+                    compression_level=args.compression_level,
+                    workers=args.package_workers,
+                    force=args.force,
+                    mode=result.mode,
+                )
+            result.archive_bytes = result.archive_path.stat().st_size
+            result.package_seconds = time.monotonic() - start
+
+        results = run_build_matrix(
+            flutter_cmd,
+            project_root,
+            target_platform,
+            modes,
+            cache,
+            use_cache,
+            package=package_mode if args.package else None,
+        )
+        log_matrix_summary(results)
+        logger.set_metadata(
+            artifact_bytes=sum(result.archive_bytes or result.output_bytes for result in results)
+        )
+        check_bundle_sizes(results, target_platform, version, args.size_threshold, args.size_check)
 
         logger.success("构建完成")
         return 0
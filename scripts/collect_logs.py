@@ -10,6 +10,20 @@ SVN 合并助手 - 日志收集脚本（跨平台 Python 实现）
 - 配置文件
 - 系统信息
 
+多个位置（项目 logs/、exe 目录、应用支持目录）中内容相同的日志按 SHA-256 去重，
+只保留一份，collect_index.json 记录每个文件的来源和被去重的副本。
+
+--archive [zip|tar.gz|tar.xz]：不生成散文件目录，直接写出一个压缩包
+（源文件在线程池中并行读取压缩，单次顺序写入，见 lib/artifact_packager.py）。
+
+--incremental：只收集上次收集之后新增的内容（见 lib/collect_manifest.py）。
+已收集过的归档 app_*.log 不再重复收集，latest.log 只收集追加的尾部，
+输出文件名形如 app_support_latest.from_<偏移>.log。
+
+--since / --until：只收集时间窗口内的日志行（见 lib/log_time_window.py）。
+每个日志文件按字节偏移二分查找行首时间戳定位窗口，只流式复制窗口内的片段，
+不在窗口内的文件直接跳过；输出文件名形如 app_support_latest.window.log。
+
 路径处理规则：
 - 必须使用 pathlib.Path 处理所有路径
 - 严禁手动拼装路径分隔符（/ 或 \\）
@@ -17,16 +31,72 @@ SVN 合并助手 - 日志收集脚本（跨平台 Python 实现）
 - 使用 Path.joinpath() 或 / 操作符拼接路径
 """
 
+import argparse
+import hashlib
+import json
 import os
 import platform
 import shutil
 import subprocess
 import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
-
-LOG_PATTERNS = ("latest.log", "app_*.log")
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent / "lib"))
+from app_log_paths import get_exe_dir, get_runtime_log_dirs, get_user_config_dirs, list_log_files
+from artifact_packager import ARCHIVE_FORMATS, DEFAULT_COMPRESSION_LEVEL, ArchiveEntry, archive_suffix, write_tar, write_zip
+from collect_manifest import MANIFEST_FILE_NAME, CollectManifest, CollectPlan
+from log_time_window import TimeWindow, find_window, time_argument
+
+# 最多收集的应用日志文件数（按修改时间取最新）
+MAX_LOG_FILES = 20
+
+INDEX_FILE_NAME = "collect_index.json"
+
+
+@dataclass
+class CollectedFile:
+    """一个待输出的收集项：source 为源文件，或 data 为生成的内容
+
+    plan 不为 None 时只输出 source 中 plan 指定的字节范围，写出后记入收集清单
+    （按时间窗口收集时不记录）。
+    """
+    name: str
+    source: Optional[Path] = None
+    data: Optional[bytes] = None
+    note: str = ""
+    duplicates: List[Path] = field(default_factory=list)
+    plan: Optional[CollectPlan] = None
+
+    @property
+    def size(self) -> int:
+        if self.data is not None:
+            return len(self.data)
+        if self.plan is not None:
+            return self.plan.length
+        return self.source.stat().st_size
+
+
+class NameAllocator:
+    """生成不冲突的输出文件名。"""
+
+    def __init__(self):
+        self._used: set = set()
+
+    def allocate(self, file_name: str) -> str:
+        candidate = file_name
+        stem = Path(file_name).stem
+        suffix = Path(file_name).suffix
+        index = 1
+        while candidate in self._used:
+            candidate = f"{stem}_{index}{suffix}"
+            index += 1
+        self._used.add(candidate)
+        return candidate
 
 
 def get_project_root() -> Path:
@@ -34,73 +104,63 @@ def get_project_root() -> Path:
     return Path(__file__).parent.resolve().parent
 
 
-def create_log_directory(project_root: Path) -> Path:
-    """创建日志收集目录。"""
-    logs_dir = project_root / "logs"
-    logs_dir.mkdir(exist_ok=True)
-
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    log_dir = logs_dir / f"app_{timestamp}"
-    log_dir.mkdir(exist_ok=True)
-    return log_dir
-
-
-def get_app_support_roots() -> List[Path]:
-    """获取当前平台实际使用的应用支持根目录。"""
-    system = platform.system()
-
-    if system == 'Windows':
-        appdata = os.getenv('APPDATA')
-        return [Path(appdata) / 'SvnAutoMerge'] if appdata else []
-    if system == 'Darwin':
-        return [
-            Path.home()
-            / 'Library'
-            / 'Application Support'
-            / 'com.example.svnautomerge'
-        ]
-    if system == 'Linux':
-        return [Path.home() / '.local' / 'share' / 'SvnAutoMerge']
-    return []
-
-
-def get_runtime_log_dirs() -> List[Path]:
-    """获取当前平台实际使用的运行时日志目录。"""
-    return [root / 'logs' for root in get_app_support_roots()]
+def get_output_name() -> str:
+    """收集结果的目录名 / 压缩包名（不含扩展名）。"""
+    return f"app_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
 
-def get_user_config_dirs() -> List[Path]:
-    """获取当前平台实际使用的用户配置目录。"""
-    return [root / 'config' for root in get_app_support_roots()]
+def hash_file(path: Path) -> str:
+    """流式计算文件的 SHA-256。"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
 
 
-def list_log_files(directory: Path) -> List[Path]:
-    """列出目录中的日志文件，包含 latest.log 和历史归档。"""
-    files: List[Path] = []
-    for pattern in LOG_PATTERNS:
-        files.extend(directory.glob(pattern))
-    files.sort(key=lambda file: file.stat().st_mtime, reverse=True)
-    return files
+def deduplicate(files: List[Path]) -> Tuple[List[Path], Dict[Path, List[Path]]]:
+    """按内容去重：只对大小相同的文件并行计算 SHA-256，保留每组中的第一个。
 
-
-def make_unique_dest(log_dir: Path, file_name: str) -> Path:
-    """生成不冲突的目标文件名。"""
-    candidate = log_dir / file_name
-    if not candidate.exists():
-        return candidate
-
-    stem = Path(file_name).stem
-    suffix = Path(file_name).suffix
-    index = 1
-    while True:
-        candidate = log_dir / f"{stem}_{index}{suffix}"
-        if not candidate.exists():
-            return candidate
-        index += 1
-
-
-def collect_log_files(project_root: Path, log_dir: Path) -> int:
-    """收集应用日志文件（从所有可能的位置）。"""
+    Returns:
+        (去重后的文件列表, {保留的文件: 内容相同的其他文件})
+    """
+    sizes: Dict[Path, int] = {}
+    for path in files:
+        try:
+            sizes[path] = path.stat().st_size
+        except OSError:
+            continue
+
+    size_counts = Counter(sizes.values())
+    candidates = [path for path, size in sizes.items() if size_counts[size] > 1]
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="hash") as pool:
+        digests = dict(zip(candidates, pool.map(hash_file, candidates)))
+
+    kept: Dict[str, Path] = {}
+    unique: List[Path] = []
+    duplicates: Dict[Path, List[Path]] = {}
+    for path in sizes:
+        digest = digests.get(path)
+        first = kept.setdefault(digest, path) if digest else path
+        if first is path:
+            unique.append(path)
+        else:
+            duplicates.setdefault(first, []).append(path)
+    return unique, duplicates
+
+
+def collect_log_files(
+    project_root: Path,
+    names: NameAllocator,
+    manifest: CollectManifest,
+    incremental: bool = False,
+    window: Optional[TimeWindow] = None,
+) -> List[CollectedFile]:
+    """收集应用日志文件（从所有可能的位置，内容相同的只保留一份）。
+
+    incremental 为 True 时按收集清单只收集新增内容；
+    window 不为 None 时只收集时间窗口内的片段。
+    """
     print("\n收集应用日志文件...")
 
     checked_paths: List[tuple[str, Path]] = []
@@ -126,7 +186,7 @@ def collect_log_files(project_root: Path, log_dir: Path) -> int:
 
     exe_dir_logs: Optional[Path] = None
     exe_dir: Optional[Path] = None
-    exe_path = project_root / 'build' / 'windows' / 'x64' / 'runner' / 'Debug' / 'SvnAutoMerge.exe'
+    exe_path = get_exe_dir(project_root) / 'SvnAutoMerge.exe'
     if exe_path.exists():
         exe_dir = exe_path.parent
         exe_dir_logs = exe_dir / 'logs'
@@ -161,7 +221,22 @@ def collect_log_files(project_root: Path, log_dir: Path) -> int:
         collected.values(),
         key=lambda file: file.stat().st_mtime,
         reverse=True,
-    )[:20]
+    )
+    all_log_files, duplicates = deduplicate(all_log_files)
+    ranges: Dict[Path, Tuple[int, int]] = {}
+    if window is not None:
+        # 先按时间窗口筛选再取最新的文件，窗口落在较早的归档中时也能收集到
+        for log_file in all_log_files:
+            try:
+                found = find_window(log_file, window)
+            except OSError as error:
+                print(f"  [ERROR] 读取日志失败 {log_file}: {error}")
+                continue
+            if found is not None:
+                ranges[log_file] = found
+        print(f"  [信息] 时间窗口 {window.describe()}: {len(ranges)} 个日志文件有匹配内容")
+        all_log_files = [log_file for log_file in all_log_files if log_file in ranges]
+    all_log_files = all_log_files[:MAX_LOG_FILES]
 
     if not all_log_files:
         print("  [警告] 未找到应用日志文件")
@@ -175,101 +250,113 @@ def collect_log_files(project_root: Path, log_dir: Path) -> int:
         print("    1. 程序是否已运行并生成日志")
         print("    2. 程序运行时的工作目录（Directory.current）")
         print("    3. 是否有其他位置的日志文件")
-        return 0
+        return []
 
     print(f"  [信息] 共收集到 {len(all_log_files)} 个候选日志文件")
+    duplicate_count = sum(len(paths) for paths in duplicates.values())
+    if duplicate_count:
+        print(f"  [信息] {duplicate_count} 个文件与其他位置的日志内容相同，已去重")
 
-    count = 0
+    items: List[CollectedFile] = []
+    skipped = 0
     for log_file in all_log_files:
         try:
-            if log_file.parent == project_logs_dir:
-                source = 'project'
-            elif exe_dir_logs is not None and log_file.parent == exe_dir_logs:
-                source = 'exe_logs'
-            elif exe_dir is not None and log_file.parent == exe_dir:
-                source = 'exe_dir'
-            elif log_file.parent == current_logs:
-                source = 'cwd'
-            else:
-                source = 'app_support'
-
-            dest_file = make_unique_dest(log_dir, f"{source}_{log_file.name}")
-            shutil.copy2(log_file, dest_file)
-            print(f"  [OK] {dest_file.name} (来源: {log_file.parent})")
-            count += 1
-        except Exception as error:
-            print(f"  [ERROR] 复制日志失败 {log_file}: {error}")
+            plan = manifest.plan(log_file, incremental)
+        except OSError as error:
+            print(f"  [ERROR] 读取日志失败 {log_file}: {error}")
+            continue
+        if plan is None:
+            skipped += 1
+            continue
+        if log_file in ranges:
+            offset, end = ranges[log_file]
+            plan = replace(plan, offset=offset, end=end)
+
+        if log_file.parent == project_logs_dir:
+            source = 'project'
+        elif exe_dir_logs is not None and log_file.parent == exe_dir_logs:
+            source = 'exe_logs'
+        elif exe_dir is not None and log_file.parent == exe_dir:
+            source = 'exe_dir'
+        elif log_file.parent == current_logs:
+            source = 'cwd'
+        else:
+            source = 'app_support'
+
+        file_name = f"{source}_{log_file.name}"
+        note = f"来源: {log_file.parent}"
+        if window is not None:
+            file_name = f"{source}_{log_file.stem}.window{log_file.suffix}"
+            note += f"，时间窗口内 {plan.length} 字节（偏移 {plan.offset}）"
+        elif plan.is_partial:
+            file_name = f"{source}_{log_file.stem}.from_{plan.offset}{log_file.suffix}"
+            note += f"，新增 {plan.length} 字节"
+        items.append(
+            CollectedFile(
+                names.allocate(file_name),
+                source=log_file,
+                note=note,
+                duplicates=duplicates.get(log_file, []),
+                plan=plan,
+            )
+        )
 
-    return count
+    if incremental:
+        print(f"  [信息] 增量收集: {len(items)} 个文件有新内容，{skipped} 个文件自上次收集后没有变化")
+    return items
 
 
-def collect_flutter_logs(project_root: Path, log_dir: Path) -> int:
+def collect_flutter_logs(project_root: Path, names: NameAllocator) -> List[CollectedFile]:
     """收集 Flutter 输出日志。"""
     print("\n收集 Flutter 输出日志...")
-    count = 0
+    items: List[CollectedFile] = []
     for pattern in ('flutter*.log', '*.flutter.log'):
         for log_file in sorted(project_root.glob(pattern), key=lambda file: file.stat().st_mtime, reverse=True)[:10]:
-            try:
-                dest_file = make_unique_dest(log_dir, f"flutter_{log_file.name}")
-                shutil.copy2(log_file, dest_file)
-                print(f"  [OK] {dest_file.name}")
-                count += 1
-            except Exception as error:
-                print(f"  [ERROR] 复制 Flutter 日志失败 {log_file}: {error}")
-    return count
+            items.append(CollectedFile(names.allocate(f"flutter_{log_file.name}"), source=log_file))
+    return items
 
 
-def collect_config_files(project_root: Path, log_dir: Path) -> int:
+def collect_config_files(project_root: Path, names: NameAllocator) -> List[CollectedFile]:
     """收集配置文件快照。"""
     print("\n收集配置文件...")
-    count = 0
+    items: List[CollectedFile] = []
 
     repo_config = project_root / 'config' / 'source_urls.json'
     if repo_config.exists():
-        dest_file = make_unique_dest(log_dir, 'repo_source_urls.json')
-        shutil.copy2(repo_config, dest_file)
-        print(f"  [OK] {dest_file.name}")
-        count += 1
+        items.append(CollectedFile(names.allocate('repo_source_urls.json'), source=repo_config))
 
     asset_config = project_root / 'assets' / 'config' / 'source_urls.json'
     if asset_config.exists():
-        dest_file = make_unique_dest(log_dir, 'asset_source_urls.json')
-        shutil.copy2(asset_config, dest_file)
-        print(f"  [OK] {dest_file.name}")
-        count += 1
+        items.append(CollectedFile(names.allocate('asset_source_urls.json'), source=asset_config))
 
     for config_dir in get_user_config_dirs():
         user_config = config_dir / 'source_urls.json'
         if user_config.exists():
-            dest_file = make_unique_dest(log_dir, 'user_source_urls.json')
-            shutil.copy2(user_config, dest_file)
-            print(f"  [OK] {dest_file.name} ({user_config})")
-            count += 1
+            items.append(CollectedFile(names.allocate('user_source_urls.json'), source=user_config, note=str(user_config)))
 
-    return count
+    return items
 
 
-def collect_system_info(log_dir: Path) -> bool:
+def collect_system_info(names: NameAllocator) -> Optional[CollectedFile]:
     """收集系统信息。"""
     print("\n收集系统信息...")
     try:
-        info_file = log_dir / 'system_info.txt'
-        with info_file.open('w', encoding='utf-8') as file:
-            file.write(f"platform: {platform.platform()}\n")
-            file.write(f"system: {platform.system()}\n")
-            file.write(f"release: {platform.release()}\n")
-            file.write(f"version: {platform.version()}\n")
-            file.write(f"machine: {platform.machine()}\n")
-            file.write(f"python: {sys.version}\n")
-            file.write(f"cwd: {Path.cwd()}\n")
-        print(f"  [OK] {info_file.name}")
-        return True
+        lines = [
+            f"platform: {platform.platform()}",
+            f"system: {platform.system()}",
+            f"release: {platform.release()}",
+            f"version: {platform.version()}",
+            f"machine: {platform.machine()}",
+            f"python: {sys.version}",
+            f"cwd: {Path.cwd()}",
+        ]
+        return CollectedFile(names.allocate('system_info.txt'), data=("\n".join(lines) + "\n").encode('utf-8'))
     except Exception as error:
         print(f"  [ERROR] 收集系统信息失败: {error}")
-        return False
+        return None
 
 
-def collect_flutter_doctor(log_dir: Path) -> bool:
+def collect_flutter_doctor(names: NameAllocator) -> Optional[CollectedFile]:
     """收集 flutter doctor 输出。"""
     print("\n收集 Flutter 环境信息...")
     try:
@@ -281,34 +368,197 @@ def collect_flutter_doctor(log_dir: Path) -> bool:
             errors='replace',
             check=False,
         )
-        output_file = log_dir / 'flutter_doctor.txt'
-        output_file.write_text(result.stdout + '\n' + result.stderr, encoding='utf-8')
-        print(f"  [OK] {output_file.name}")
-        return True
+        output = result.stdout + '\n' + result.stderr
+        return CollectedFile(names.allocate('flutter_doctor.txt'), data=output.encode('utf-8'))
     except Exception as error:
         print(f"  [ERROR] 收集 Flutter 环境信息失败: {error}")
-        return False
-
-
-def main() -> int:
+        return None
+
+
+def build_index(items: List[CollectedFile]) -> CollectedFile:
+    """生成收集清单：每个文件的来源、大小、修改时间，以及被去重的副本。"""
+    files = []
+    for item in items:
+        entry: Dict[str, object] = {"name": item.name, "size": item.size}
+        if item.source is not None:
+            entry["source"] = str(item.source)
+            entry["mtime"] = datetime.fromtimestamp(item.source.stat().st_mtime).isoformat(timespec="seconds")
+        if item.plan is not None and item.plan.is_partial:
+            entry["offset"] = item.plan.offset
+        if item.duplicates:
+            entry["duplicates"] = [str(path) for path in item.duplicates]
+        files.append(entry)
+    data = json.dumps({"created_at": datetime.now().isoformat(timespec="seconds"), "files": files}, ensure_ascii=False, indent=2)
+    return CollectedFile(INDEX_FILE_NAME, data=data.encode('utf-8'))
+
+
+def print_item(item: CollectedFile):
+    """输出一个已收集文件。"""
+    note = f" ({item.note})" if item.note else ""
+    print(f"  [OK] {item.name}{note}")
+    for duplicate in item.duplicates:
+        print(f"       内容相同，已去重: {duplicate}")
+
+
+def copy_range(source: Path, dest_file: Path, offset: int, length: int):
+    """流式复制 source 中 [offset, offset + length) 这一段。"""
+    with open(source, 'rb') as src, open(dest_file, 'wb') as dest:
+        src.seek(offset)
+        remaining = length
+        while remaining > 0:
+            chunk = src.read(min(1024 * 1024, remaining))
+            if not chunk:
+                break
+            dest.write(chunk)
+            remaining -= len(chunk)
+
+
+def write_directory(output_dir: Path, items: List[CollectedFile]) -> List[CollectedFile]:
+    """逐个写入输出目录，返回成功写入的收集项。"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    written: List[CollectedFile] = []
+    for item in items:
+        try:
+            dest_file = output_dir / item.name
+            if item.data is not None:
+                dest_file.write_bytes(item.data)
+            elif item.plan is not None:
+                copy_range(item.source, dest_file, item.plan.offset, item.plan.length)
+                shutil.copystat(item.source, dest_file)
+            else:
+                shutil.copy2(item.source, dest_file)
+            print_item(item)
+            written.append(item)
+        except Exception as error:
+            print(f"  [ERROR] 复制失败 {item.source or item.name}: {error}")
+    return written
+
+
+def write_archive(archive_path: Path, items: List[CollectedFile], archive_format: str, level: int) -> List[CollectedFile]:
+    """把所有收集项一次写入压缩包（源文件并行读取压缩），返回写入的收集项。"""
+    readable: List[CollectedFile] = []
+    for item in items:
+        if item.source is not None and not os.access(item.source, os.R_OK):
+            print(f"  [ERROR] 无法读取 {item.source}")
+            continue
+        readable.append(item)
+
+    root = archive_path.name[: -len(archive_suffix(archive_format))]
+    entries = [
+        ArchiveEntry(
+            f"{root}/{item.name}",
+            item.source,
+            data=item.data,
+            offset=item.plan.offset if item.plan else 0,
+            length=item.plan.length if item.plan else None,
+        )
+        for item in readable
+    ]
+    temp_path = archive_path.with_name(f"{archive_path.name}.{os.getpid()}.tmp")
+    try:
+        if archive_format == "zip":
+            write_zip(temp_path, entries, level)
+        else:
+            write_tar(temp_path, entries, archive_format, level)
+        os.replace(temp_path, archive_path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+    for item in readable:
+        print_item(item)
+    return readable
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """创建命令行参数解析器。"""
+    parser = argparse.ArgumentParser(description="收集 SVN 合并助手的日志、配置和环境信息")
+    parser.add_argument(
+        '--archive',
+        nargs='?',
+        const='zip',
+        choices=ARCHIVE_FORMATS,
+        help='直接输出为一个压缩包（默认 zip），不生成散文件目录',
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='只收集上次收集之后新增的日志内容（按 logs/collect_manifest.json）',
+    )
+    parser.add_argument(
+        '--since',
+        type=time_argument,
+        help='只收集此时间之后的日志，如 "2026-10-16 22:40"、"22:40" 或 "10m"（10 分钟前）',
+    )
+    parser.add_argument(
+        '--until',
+        type=time_argument,
+        help='只收集此时间之前的日志，格式同 --since',
+    )
+    parser.add_argument(
+        '--level',
+        type=int,
+        default=DEFAULT_COMPRESSION_LEVEL,
+        choices=range(0, 10),
+        metavar='0-9',
+        help=f'压缩级别，默认 {DEFAULT_COMPRESSION_LEVEL}',
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = create_parser()
+    args = parser.parse_args(argv)
+    window: Optional[TimeWindow] = None
+    if args.since or args.until:
+        if args.incremental:
+            parser.error("--since/--until 不能与 --incremental 同时使用")
+        if args.since and args.until and args.since > args.until:
+            parser.error("--since 不能晚于 --until")
+        window = TimeWindow(args.since, args.until)
     project_root = get_project_root()
-    log_dir = create_log_directory(project_root)
+    logs_dir = project_root / "logs"
+    logs_dir.mkdir(exist_ok=True)
+    output_name = get_output_name()
+    if args.archive:
+        output_path = logs_dir / f"{output_name}{archive_suffix(args.archive)}"
+    else:
+        output_path = logs_dir / output_name
 
     print("=" * 70)
     print("SVN 合并助手日志收集")
     print("=" * 70)
-    print(f"输出目录: {log_dir}")
-
-    total = 0
-    total += collect_log_files(project_root, log_dir)
-    total += collect_flutter_logs(project_root, log_dir)
-    total += collect_config_files(project_root, log_dir)
-    collect_system_info(log_dir)
-    collect_flutter_doctor(log_dir)
+    print(f"输出{'压缩包' if args.archive else '目录'}: {output_path}")
+
+    names = NameAllocator()
+    manifest = CollectManifest(logs_dir / MANIFEST_FILE_NAME)
+    items: List[CollectedFile] = []
+    items.extend(collect_log_files(project_root, names, manifest, args.incremental, window))
+    items.extend(collect_flutter_logs(project_root, names))
+    items.extend(collect_config_files(project_root, names))
+    for generated in (collect_system_info(names), collect_flutter_doctor(names)):
+        if generated is not None:
+            items.append(generated)
+    items.append(build_index(items))
+
+    print(f"\n写入 {len(items)} 个文件...")
+    if args.archive:
+        written = write_archive(output_path, items, args.archive, args.level)
+    else:
+        written = write_directory(output_path, items)
+
+    # 只记录实际写出的收集进度，下次 --incremental 从这里继续；
+    # 读取或复制失败的文件下次重新收集（时间窗口只是片段，不记录）
+    if window is None:
+        for item in written:
+            if item.plan is not None:
+                manifest.record(item.plan)
+        manifest.save()
 
     print("\n" + "=" * 70)
-    print(f"完成，共收集 {total} 个文件")
-    print(f"输出目录: {log_dir}")
+    print(f"完成，共收集 {len(written)} 个文件")
+    print(f"输出{'压缩包' if args.archive else '目录'}: {output_path}")
+    if args.archive:
+        print(f"压缩包大小: {output_path.stat().st_size / 1024:.1f} KB")
     print("=" * 70)
     return 0
 
@@ -8,6 +8,13 @@ SVN 合并助手 - 部署脚本（跨平台 Python 实现）
 - 检查 Flutter 环境
 - 构建应用
 - 启动应用
+- Flutter 命令输出写入日志，长时间无输出判定为停滞并终止，
+  超时按历史耗时推算（见 lib/build_history.py）
+- --incremental：跳过 flutter clean，依赖和构建产物按输入指纹复用（与 build.py 共用缓存）
+- Flutter 版本与设备列表并发探测，结果按 TTL 缓存（见 lib/env_probe.py，--refresh-env 重新探测）
+- --session：保持 flutter run --machine 会话，再次部署时热重启（见 lib/flutter_session.py）
+- --benchmark-startup N：构建后启动应用 N 次，跟随 latest.log 测量冷启动耗时
+  （见 lib/startup_benchmark.py），结果写入运行历史（history.py startup）
 
 路径处理规则：
 - 必须使用 pathlib.Path 处理所有路径
@@ -20,19 +27,44 @@ SVN 合并助手 - 部署脚本（跨平台 Python 实现）
 - 日志文件位置：logs/scripts/deploy_latest.log
 """
 
+import argparse
 import sys
 import subprocess
 import shutil
 import platform
+from datetime import datetime
 from pathlib import Path
 from typing import Optional, List, Tuple
 
 # 添加 lib 目录到路径
 sys.path.insert(0, str(Path(__file__).parent / 'lib'))
+from app_log_paths import LATEST_LOG_NAME, get_runtime_log_dirs
+from build_fingerprint import FingerprintCache, flutter_build_inputs, pub_get_inputs
+from build_history import HISTORY_FILE_NAME, adaptive_timeout, percentile, query_run_durations
+from command_stream import CommandStalled, stream_command
+from env_probe import EnvProbe
+from flutter_session import (
+    RESTART_TIMEOUT,
+    SESSION_LOG_FILE,
+    SessionError,
+    load_session,
+    send_request,
+    start_session,
+    stop_session,
+)
 from script_logger import ScriptLogger
+from version_manager import VersionManager
+from startup_benchmark import measure_startup, record_startup_runs, summarize
+
+# 命令连续多少秒没有输出视为停滞
+STALL_SECONDS = 300
+# 命令失败/停滞时记录的输出末尾行数
+FAILURE_TAIL_LINES = 40
 
 # 全局日志记录器
 logger: Optional[ScriptLogger] = None
+# 环境探测器（main 中按 --refresh-env 创建）
+env_probe: Optional[EnvProbe] = None
 
 
 def get_project_root() -> Path:
@@ -97,6 +129,14 @@ def kill_existing_processes():
             print(f"[WARNING] {msg}")
 
 
+def get_env_probe() -> EnvProbe:
+    """获取环境探测器"""
+    global env_probe
+    if env_probe is None:
+        env_probe = EnvProbe()
+    return env_probe
+
+
 def is_wsl() -> bool:
     """检测是否在 WSL 环境中"""
     try:
@@ -107,35 +147,6 @@ def is_wsl() -> bool:
         return False
 
 
-def find_command(cmd: str) -> Optional[str]:
-    """查找命令是否在 PATH 中"""
-    if platform.system() == 'Windows':
-        # 在 Windows 上，使用 where.exe 命令
-        # 注意：需要使用 shell=True 或完整路径，确保能访问系统 PATH
-        result = subprocess.run(
-            ['where.exe', cmd],
-            capture_output=True,
-            text=True,
-            check=False,
-            shell=False
-        )
-        if result.returncode == 0:
-            # where 可能返回多行，取第一行
-            path = result.stdout.strip().split('\n')[0].strip()
-            if path:
-                return path
-    else:
-        result = subprocess.run(
-            ['which', cmd],
-            capture_output=True,
-            text=True,
-            check=False
-        )
-        if result.returncode == 0:
-            return result.stdout.strip().split('\n')[0]
-    return None
-
-
 def check_flutter_environment() -> Tuple[Optional[str], Optional[str]]:
     """检查 Flutter 环境"""
     # 检查是否在 WSL 中
@@ -155,49 +166,23 @@ def check_flutter_environment() -> Tuple[Optional[str], Optional[str]]:
     else:
         print("Checking Flutter environment...")
     
-    # 查找系统 Flutter
-    flutter_cmd = find_command('flutter')
-    if flutter_cmd:
-        # 在 Windows 上，如果找到的是 .exe 文件，优先使用 .bat 文件
-        if platform.system() == 'Windows' and flutter_cmd.endswith('.exe'):
-            flutter_bat = flutter_cmd.replace('.exe', '.bat')
-            if Path(flutter_bat).exists():
-                flutter_cmd = flutter_bat
-        
-        try:
-            # 在 Windows 上，使用 shell=True 确保能访问系统 PATH
-            if platform.system() == 'Windows':
-                result = subprocess.run(
-                    'flutter --version',
-                    shell=True,
-                    capture_output=True,
-                    text=True,
-                    encoding='utf-8',
-                    errors='replace',
-                    timeout=10,
-                    check=False
-                )
-            else:
-                result = subprocess.run(
-                    [flutter_cmd, '--version'],
-                    capture_output=True,
-                    text=True,
-                    timeout=10,
-                    check=False
-                )
-            if result.returncode == 0:
-                version_line = result.stdout.split('\n')[0]
-                if logger:
-                    logger.info("Flutter 环境就绪")
-                    logger.info(f"版本: {version_line}")
-                else:
-                    print(f"[OK] Flutter environment is ready")
-                    print(f"  {version_line}")
-                return 'flutter', version_line
-        except Exception as e:
+    # 查找系统 Flutter（版本探测与设备探测并发执行，结果按 TTL 缓存）
+    probe = get_env_probe()
+    if probe.flutter_path:
+        probe.start(['flutter_version', 'devices'])
+        version = probe.get('flutter_version')
+        if version.ok:
+            version_line = version.value
+            source = "（缓存）" if version.cached else ""
             if logger:
-                logger.debug(f"Flutter 版本检查失败: {e}")
-            pass
+                logger.info("Flutter 环境就绪")
+                logger.info(f"版本: {version_line}{source}")
+            else:
+                print(f"[OK] Flutter environment is ready")
+                print(f"  {version_line}")
+            return 'flutter', version_line
+        if logger:
+            logger.debug("Flutter 版本检查失败")
     
     msg = "未找到 Flutter CLI"
     if logger:
@@ -216,47 +201,24 @@ def check_devices(flutter_cmd: str) -> Tuple[int, bool]:
     else:
         print("\nChecking available devices...")
     
-    try:
-        # 在 Windows 上，如果 flutter_cmd 是 'flutter'，使用 shell=True
-        if platform.system() == 'Windows' and flutter_cmd == 'flutter':
-            cmd_str = 'flutter devices --machine'
-            result = subprocess.run(
-                cmd_str,
-                shell=True,
-                capture_output=True,
-                text=True,
-                encoding='utf-8',
-                errors='replace',
-                timeout=10,
-                check=False
-            )
+    devices = get_env_probe().get('devices')
+    if devices.ok:
+        device_count = len(devices.value)
+        if device_count == 0:
+            msg = "未检测到可用设备（桌面平台无需设备，移动平台将仅构建）"
+            if logger:
+                logger.info(msg)
+            else:
+                print(f"[WARNING] {msg}")
+            return 0, True
         else:
-            result = subprocess.run(
-                flutter_cmd.split() + ['devices', '--machine'],
-                capture_output=True,
-                text=True,
-                timeout=10,
-                check=False
-            )
-        
-        if result.returncode == 0:
-            device_count = result.stdout.count('"deviceId"')
-            if device_count == 0:
-                msg = "未检测到可用设备（桌面平台无需设备，移动平台将仅构建）"
-                if logger:
-                    logger.info(msg)
-                else:
-                    print(f"[WARNING] {msg}")
-                return 0, True
+            source = "（缓存）" if devices.cached else ""
+            msg = f"检测到 {device_count} 个可用设备{source}"
+            if logger:
+                logger.info(msg)
             else:
-                msg = f"检测到 {device_count} 个可用设备"
-                if logger:
-                    logger.info(msg)
-                else:
-                    print(f"[OK] {msg}")
-                return device_count, False
-    except Exception:
-        pass
+                print(f"[OK] {msg}")
+            return device_count, False
     
     msg = "未检测到可用设备"
     if logger:
@@ -279,61 +241,24 @@ def detect_platform() -> str:
         return 'windows'  # 默认
 
 
-def sync_version(project_root: Path) -> bool:
-    """同步版本号"""
-    if logger:
-        logger.info("同步版本号...")
-    else:
-        print("\nSyncing version number...")
-    
-    script_dir = Path(__file__).parent
-    version_script = script_dir / 'version.bat' if platform.system() == 'Windows' else script_dir / 'version.sh'
-    
-    if not version_script.exists():
-        msg = "版本管理脚本不存在，跳过版本同步"
-        if logger:
-            logger.warn(msg)
-        else:
-            print(f"[WARNING] {msg}")
-        return False
-    
+def sync_version(project_root: Path) -> Optional[str]:
+    """同步版本号到 pubspec.yaml 及各平台 Runner 文件，返回版本字符串（失败时返回 None）
+
+    进程内完成，只读取一次 VERSION.yaml；内容未变化的文件不会被重写，
+    不会因 mtime 变化触发 Flutter 重新构建
+    """
+    logger.info("同步版本号...")
     try:
-        if platform.system() == 'Windows':
-            result = subprocess.run(
-                [str(version_script), 'sync', 'app'],
-                cwd=str(project_root),
-                capture_output=True,
-                check=False
-            )
-        else:
-            result = subprocess.run(
-                ['bash', str(version_script), 'sync', 'app'],
-                cwd=str(project_root),
-                capture_output=True,
-                check=False
-            )
-        
-        if result.returncode == 0:
-            msg = "版本同步完成"
-            if logger:
-                logger.info(msg)
-            else:
-                print(f"[OK] {msg}")
-            return True
-        else:
-            msg = "版本同步失败，继续执行"
-            if logger:
-                logger.warn(msg)
-            else:
-                print(f"[WARNING] {msg}")
-            return False
+        manager = VersionManager(project_root=project_root)
+        for result in manager.sync_all('app'):
+            if result.status == 'updated':
+                logger.info(f"已更新版本号: {result.path.relative_to(project_root)}")
+        version = manager.get_version('app')
     except Exception as e:
-        msg = f"版本同步失败: {e}，继续执行"
-        if logger:
-            logger.warn(msg)
-        else:
-            print(f"[WARNING] {msg}")
-        return False
+        logger.warn(f"版本同步失败: {e}，继续执行")
+        return None
+    logger.info(f"版本同步完成: {version}")
+    return version
 
 
 def copy_config_file(project_root: Path, platform_name: str) -> bool:
@@ -349,82 +274,387 @@ def copy_config_file(project_root: Path, platform_name: str) -> bool:
         print(f"[INFO] {msg}")
     return True
 
-def run_flutter_command(flutter_cmd: str, args: List[str], check: bool = True) -> bool:
-    """运行 Flutter 命令"""
+def flutter_step_timeout(default: int) -> float:
+    """按当前步骤的历史耗时推算超时（最近成功耗时 p95 × 3），历史不足时用默认值"""
+    if not logger:
+        return default
+    step_span = logger.trace.current("step")
+    if step_span is None:
+        return default
+    step = str(step_span.args.get("phase", step_span.name))
+    timeout, p95 = adaptive_timeout(
+        "deploy",
+        step,
+        default,
+        platform=logger.metadata.get("platform"),
+        db_path=logger.log_dir / HISTORY_FILE_NAME,
+    )
+    if p95 is not None:
+        logger.info(f"超时 {timeout:.0f} 秒（历史 p95 {p95:.1f} 秒 × 3）: {step}")
+    return timeout
+
+
+def run_flutter_command(
+    flutter_cmd: str,
+    args: List[str],
+    check: bool = True,
+    interactive: bool = False,
+) -> bool:
+    """运行 Flutter 命令
+    
+    非交互命令的输出逐行写入日志，连续 STALL_SECONDS 秒没有输出时判定为停滞并终止；
+    交互命令（flutter run）保持直接连接终端。
+    """
     cmd_str = f"flutter {' '.join(args)}"
     if logger:
         logger.command(cmd_str)
     
     # 在 Windows 上，如果 flutter_cmd 是 'flutter'，使用 shell=True
-    if platform.system() == 'Windows' and flutter_cmd == 'flutter':
-        try:
+    use_shell = platform.system() == 'Windows' and flutter_cmd == 'flutter'
+    cmd = cmd_str if use_shell else flutter_cmd.split() + args
+    display = cmd_str if use_shell else ' '.join(cmd)
+    
+    try:
+        if interactive:
             result = subprocess.run(
-                cmd_str,
-                shell=True,
+                cmd,
+                shell=use_shell,
                 check=check,
                 timeout=600,  # 10 分钟超时
                 encoding='utf-8',
                 errors='replace'
             )
             return result.returncode == 0
-        except subprocess.TimeoutExpired:
-            msg = f"命令超时: {cmd_str}"
-            if logger:
-                logger.error(msg)
-            else:
-                print(f"[ERROR] {msg}")
-            return False
-        except Exception as e:
-            msg = f"命令失败: {e}"
-            if logger:
-                logger.error(msg)
-            else:
-                print(f"[ERROR] {msg}")
-            return False
-    else:
-        cmd = flutter_cmd.split() + args
+        
+        stream_result = stream_command(
+            cmd,
+            cwd=Path.cwd(),
+            timeout_seconds=flutter_step_timeout(600),
+            on_line=logger.command_output_line if logger else print,
+            shell=use_shell,
+            stall_seconds=STALL_SECONDS,
+        )
+    except subprocess.TimeoutExpired as e:
+        reason = str(e) if isinstance(e, CommandStalled) else "命令超时"
+        msg = f"{reason}: {display}"
+        if logger:
+            logger.error(msg)
+            tail = (e.output or "").splitlines()[-FAILURE_TAIL_LINES:]
+            for line in tail:
+                logger.error(f"  | {line}")
+        else:
+            print(f"[ERROR] {msg}")
+        return False
+    except Exception as e:
+        msg = f"命令失败: {e}"
+        if logger:
+            logger.error(msg)
+        else:
+            print(f"[ERROR] {msg}")
+        return False
+    
+    if check and stream_result.returncode != 0:
+        msg = f"命令失败（exit {stream_result.returncode}）: {display}"
+        if logger:
+            logger.error(msg)
+        else:
+            print(f"[ERROR] {msg}")
+    return stream_result.returncode == 0
+
+
+def get_build_output_path(project_root: Path, platform_name: str) -> Path:
+    """Debug 构建产物路径"""
+    if platform_name == 'windows':
+        return project_root / 'build' / 'windows' / 'x64' / 'runner' / 'Debug' / 'SvnAutoMerge.exe'
+    if platform_name == 'macos':
+        return project_root / 'build' / 'macos' / 'Build' / 'Products' / 'Debug' / 'SvnAutoMerge.app'
+    return project_root / 'build' / 'linux' / 'x64' / 'debug' / 'bundle'
+
+
+def get_launch_executable(project_root: Path, platform_name: str) -> Path:
+    """Debug 构建产物中的可执行文件（macOS 为 .app 包内的二进制）"""
+    output_path = get_build_output_path(project_root, platform_name)
+    if platform_name == 'macos':
+        return output_path / 'Contents' / 'MacOS' / 'SvnAutoMerge'
+    if platform_name == 'linux':
+        return output_path / 'SvnAutoMerge'
+    return output_path
+
+
+def benchmark_startup(
+    project_root: Path,
+    platform_name: str,
+    version: Optional[str],
+    runs: int,
+    timeout: float,
+) -> bool:
+    """启动应用 runs 次，测量启动到各日志里程碑的耗时并输出 min / median / p95
+
+    Returns:
+        是否至少有一次启动测到了日志文件创建
+    """
+    executable = get_launch_executable(project_root, platform_name)
+    if not executable.exists():
+        logger.error(f"未找到可执行文件: {executable}")
+        return False
+    log_dirs = get_runtime_log_dirs()
+    if not log_dirs:
+        logger.error("无法确定应用日志目录")
+        return False
+    log_dir = log_dirs[0]
+    logger.info(f"启动耗时基准测试: {runs} 次，跟随 {log_dir / LATEST_LOG_NAME}")
+
+    results = []
+    for index in range(1, runs + 1):
+        result = measure_startup([str(executable)], log_dir, index, timeout=timeout, cwd=executable.parent)
+        results.append(result)
+        timings = "，".join(f"{name} {elapsed:.3f}s" for name, elapsed in result.timings.items())
+        if result.error:
+            logger.warn(f"第 {index}/{runs} 次: {result.error}" + (f"（{timings}）" if timings else ""))
+        else:
+            logger.info(f"第 {index}/{runs} 次: {timings}")
+
+    logger.info(f"{'里程碑':<10} {'次数':>4} {'min':>9} {'median':>9} {'p95':>9}")
+    for stats in summarize(results):
+        if not stats.count:
+            logger.info(f"{stats.milestone.description:<10} {0:>4}   （未出现）")
+            continue
+        missing = f"（{stats.missing} 次未出现）" if stats.missing else ""
+        logger.info(
+            f"{stats.milestone.description:<10} {stats.count:>4} {stats.minimum:>8.3f}s "
+            f"{stats.median:>8.3f}s {stats.p95:>8.3f}s{missing}"
+        )
+
+    try:
+        record_startup_runs(
+            results,
+            logger.log_dir / HISTORY_FILE_NAME,
+            version,
+            platform_name,
+            log=logger.log_file.name,
+        )
+        logger.info("启动耗时已写入运行历史，查看趋势: python scripts/history.py startup")
+    except Exception as e:
+        logger.warn(f"无法写入运行历史: {e}")
+    return any('header' in result.timings for result in results)
+
+
+def run_cached_flutter_step(
+    cache: FingerprintCache,
+    use_cache: bool,
+    step: str,
+    digest: str,
+    outputs: List[Path],
+    flutter_cmd: str,
+    args: List[str],
+) -> Tuple[bool, bool]:
+    """指纹未变化且产物存在时跳过 Flutter 命令（与 build.py 共用指纹缓存）
+
+    Returns:
+        (是否成功, 是否实际执行)
+    """
+    if use_cache and cache.is_fresh(step, digest, outputs):
+        logger.info(f"输入未变化且产物存在，跳过: flutter {' '.join(args)}")
+        mark_step_cached()
+        return True, False
+    if not run_flutter_command(flutter_cmd, args):
+        cache.invalidate(step)
+        cache.save()
+        return False, True
+    return True, True
+
+
+def mark_step_cached():
+    """标记当前步骤未实际执行，运行历史统计耗时时排除"""
+    step_span = logger.trace.current("step")
+    if step_span is not None:
+        step_span.args["cached"] = True
+
+
+def session_inputs_digest(cache: FingerprintCache, project_root: Path, platform_name: str, flutter_path: str) -> str:
+    """热重启无法生效的输入（依赖、原生工程、SDK）的指纹，变化时需要重建会话"""
+    return cache.fingerprint(
+        project_root,
+        pub_get_inputs(project_root, flutter_path) + [project_root / platform_name],
+        extra={"flutter": flutter_path, "platform": platform_name},
+    )
+
+
+def report_time_saved(platform_name: str, label: str):
+    """与完整部署（clean + 构建）的历史耗时比较，输出节省的时间"""
+    elapsed = (datetime.now() - logger.start_time).total_seconds()
+    durations = query_run_durations(
+        "deploy", platform=platform_name, mode="debug", db_path=logger.log_dir / HISTORY_FILE_NAME
+    )
+    if not durations:
+        logger.info(f"{label}耗时 {elapsed:.1f} 秒（没有完整部署的历史记录，无法估算节省的时间）")
+        return
+    baseline = percentile(durations, 50)
+    logger.info(
+        f"{label}耗时 {elapsed:.1f} 秒，完整部署（clean + 构建）最近 {len(durations)} 次 p50 "
+        f"{baseline:.1f} 秒，节省约 {baseline - elapsed:.1f} 秒"
+    )
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """创建命令行参数解析器"""
+    parser = argparse.ArgumentParser(description="构建并启动 SVN 合并助手桌面应用")
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='跳过 flutter clean，输入未变化时沿用已有的依赖和构建产物',
+    )
+    parser.add_argument(
+        '--session',
+        action='store_true',
+        help='保持 flutter run --machine 会话，再次部署时发送热重启而不是重新构建（隐含 --incremental，仅桌面平台）',
+    )
+    parser.add_argument(
+        '--refresh-env',
+        action='store_true',
+        help='忽略缓存的 Flutter 版本和设备列表，重新探测',
+    )
+    parser.add_argument(
+        '--stop-session',
+        action='store_true',
+        help='停止 --session 启动的会话后退出',
+    )
+    parser.add_argument(
+        '--benchmark-startup',
+        type=int,
+        metavar='N',
+        help='构建后启动应用 N 次，测量冷启动耗时（min / median / p95），每次测量后结束应用（仅桌面平台）',
+    )
+    parser.add_argument(
+        '--benchmark-timeout',
+        type=float,
+        default=60.0,
+        help='每次启动等待日志里程碑的秒数，默认 60',
+    )
+    return parser
+
+
+def deploy_with_session(
+    project_root: Path,
+    flutter_cmd: str,
+    platform_name: str,
+    current_step: int,
+    total_steps: int,
+):
+    """会话模式：已有会话且依赖/原生工程未变化时热重启，否则（重新）启动会话"""
+    flutter_path = shutil.which(flutter_cmd) or flutter_cmd
+    cache = FingerprintCache.for_project(project_root)
+    digest = session_inputs_digest(cache, project_root, platform_name, flutter_path)
+    cache.save()
+
+    session = load_session()
+    if session is not None:
         try:
-            result = subprocess.run(
-                cmd,
-                check=check,
-                timeout=600  # 10 分钟超时
-            )
-            return result.returncode == 0
-        except subprocess.TimeoutExpired:
-            msg = f"命令超时: {' '.join(cmd)}"
-            if logger:
-                logger.error(msg)
-            else:
-                print(f"[ERROR] {msg}")
-            return False
-        except Exception as e:
-            msg = f"命令失败: {e}"
-            if logger:
-                logger.error(msg)
-            else:
-                print(f"[ERROR] {msg}")
-            return False
+            send_request(session, "status")
+        except SessionError as e:
+            logger.info(f"已有会话不可用（{e}），重新启动会话")
+            session = None
+    if session is not None and (
+        session.get("device") != platform_name or session.get("inputs_digest") != digest
+    ):
+        logger.info("依赖、原生工程或目标平台有变化，热重启无法生效，重新启动会话")
+        stop_session()
+        session = None
+
+    # 步骤 5/6: 依赖和构建由 flutter run 会话负责
+    for description in ("获取依赖", "构建应用"):
+        current_step += 1
+        logger.step(current_step, total_steps, description)
+        logger.info("会话模式：由 flutter run 负责" if session is None else "会话模式：热重启无需重新构建")
+        mark_step_cached()
+        logger.step_done(current_step, total_steps)
 
+    current_step += 1
+    if session is not None:
+        logger.step(current_step, total_steps, "热重启应用")
+        try:
+            reply = send_request(session, "restart", timeout=RESTART_TIMEOUT + 10)
+        except SessionError as e:
+            logger.failed(f"热重启失败: {e}")
+            sys.exit(1)
+        logger.info(f"热重启完成（{reply.get('duration', 0):.1f} 秒），会话输出: {SESSION_LOG_FILE}")
+        logger.step_done(current_step, total_steps)
+        report_time_saved(platform_name, "热重启部署")
+        logger.success("部署完成（热重启）")
+        sys.exit(0)
 
-def main():
+    logger.step(current_step, total_steps, "启动 flutter run 会话")
+    kill_existing_processes()
+    try:
+        session = start_session(project_root, flutter_path, platform_name, digest)
+    except SessionError as e:
+        logger.failed(f"启动会话失败: {e}")
+        sys.exit(1)
+    logger.info(f"会话已启动（宿主 PID {session['pid']}），会话输出: {SESSION_LOG_FILE}")
+    logger.info("再次执行 deploy --session 将热重启应用；停止会话: deploy --stop-session")
+    logger.step_done(current_step, total_steps)
+    report_time_saved(platform_name, "会话部署")
+    logger.success("部署完成（会话已启动）")
+    sys.exit(0)
+
+
+def main(argv: Optional[List[str]] = None):
     """主函数"""
-    global logger
-    logger = ScriptLogger("deploy")
+    global logger, env_probe
+    logger = ScriptLogger("deploy", buffered=True)
     
+    try:
+        args = create_parser().parse_args(argv)
+    except SystemExit as exit_error:
+        code = int(exit_error.code or 0)
+        if code == 0:
+            logger.success("显示帮助完成")
+        else:
+            logger.failed("参数解析失败")
+        raise
+    if args.benchmark_startup is not None and args.benchmark_startup <= 0:
+        logger.failed("--benchmark-startup 必须为正数")
+        sys.exit(2)
+    if args.benchmark_startup and args.session:
+        logger.failed("--benchmark-startup 不能与 --session 同时使用")
+        sys.exit(2)
+    incremental = args.incremental or args.session
+    env_probe = EnvProbe(use_cache=not args.refresh_env)
+    try:
+        run_deploy(args, incremental)
+    finally:
+        # 出错提前退出时不等待用不到的探测（如后台的 flutter devices）执行完
+        env_probe.shutdown(cancel=True)
+
+
+def run_deploy(args: argparse.Namespace, incremental: bool):
+    """执行部署步骤"""
     project_root = get_project_root()
     
     # 切换到项目目录
     import os
     os.chdir(str(project_root))
     
+    if args.stop_session:
+        if stop_session():
+            logger.success("已停止 flutter run 会话")
+        else:
+            logger.success("没有运行中的 flutter run 会话")
+        sys.exit(0)
+    
     # 步骤计数
     total_steps = 7
     current_step = 0
     
     # 步骤 1: 杀掉所有正在运行的 SvnAutoMerge 进程
+    # 会话模式下应用由会话管理，热重启时不能停止
     current_step += 1
     logger.step(current_step, total_steps, "停止现有进程")
-    kill_existing_processes()
+    if args.session and load_session():
+        logger.info("会话模式：保留会话中运行的应用")
+        mark_step_cached()
+    else:
+        kill_existing_processes()
     logger.step_done(current_step, total_steps)
     
     # 步骤 2: 检查 Flutter 环境
@@ -445,54 +675,114 @@ def main():
     # 检测平台
     platform_name = detect_platform()
     logger.info(f"目标平台: {platform_name}")
+    # 完整部署记为 debug，增量/会话/基准测试部署单独记录，便于与完整部署的耗时比较
+    if args.session:
+        mode = "debug+session"
+    elif incremental:
+        mode = "debug+incremental"
+    else:
+        mode = "debug"
+    if args.benchmark_startup:
+        mode += "+benchmark"
+    logger.set_metadata(platform=platform_name, mode=mode)
+    is_desktop = platform_name in ('macos', 'windows', 'linux')
+    if args.benchmark_startup and not is_desktop:
+        logger.failed("启动耗时基准测试仅支持桌面平台")
+        sys.exit(1)
     
     # 步骤 4: 清理之前的构建
     current_step += 1
     logger.step(current_step, total_steps, "清理之前的构建")
-    if not run_flutter_command(flutter_cmd, ['clean'], check=False):
+    if incremental:
+        logger.info("增量模式：跳过 flutter clean")
+        mark_step_cached()
+    elif not run_flutter_command(flutter_cmd, ['clean'], check=False):
         logger.warn("清理失败，继续执行")
     logger.step_done(current_step, total_steps)
     
     # 同步版本号
-    sync_version(project_root)
+    version = sync_version(project_root)
+    if version:
+        logger.set_metadata(version=version)
+    
+    if args.session:
+        if platform_name not in ('macos', 'windows', 'linux'):
+            logger.failed("会话模式仅支持桌面平台")
+            sys.exit(1)
+        deploy_with_session(project_root, flutter_cmd, platform_name, current_step, total_steps)
+    
+    # flutter clean 会删除 .dart_tool，因此在清理之后再加载指纹缓存
+    flutter_path = shutil.which(flutter_cmd) or flutter_cmd
+    cache = FingerprintCache.for_project(project_root)
     
     # 步骤 5: 获取依赖
     current_step += 1
     logger.step(current_step, total_steps, "获取依赖")
-    if not run_flutter_command(flutter_cmd, ['pub', 'get']):
+    pub_inputs = pub_get_inputs(project_root, flutter_path)
+    ok, executed = run_cached_flutter_step(
+        cache,
+        incremental,
+        'pub_get',
+        cache.fingerprint(project_root, pub_inputs, extra={"flutter": flutter_path}),
+        [project_root / '.dart_tool' / 'package_config.json'],
+        flutter_cmd,
+        ['pub', 'get'],
+    )
+    if not ok:
         logger.failed("获取依赖失败")
         sys.exit(1)
+    if executed:
+        # pub get 可能更新 pubspec.lock，按执行后的内容记录指纹
+        cache.record('pub_get', cache.fingerprint(project_root, pub_inputs, extra={"flutter": flutter_path}))
+        cache.save()
     logger.step_done(current_step, total_steps)
     
     # 步骤 6: 构建应用
     current_step += 1
     logger.step(current_step, total_steps, "构建应用")
     build_args = ['build', platform_name, '--debug']
-    logger.command(f"flutter {' '.join(build_args)}")
-    if not run_flutter_command(flutter_cmd, build_args):
+    build_step = f"build_{platform_name}_debug"
+    build_digest = cache.fingerprint(
+        project_root,
+        flutter_build_inputs(project_root, platform_name, flutter_path),
+        extra={"flutter": flutter_path, "platform": platform_name, "mode": "debug"},
+    )
+    ok, executed = run_cached_flutter_step(
+        cache,
+        incremental,
+        build_step,
+        build_digest,
+        [get_build_output_path(project_root, platform_name)],
+        flutter_cmd,
+        build_args,
+    )
+    if not ok:
         logger.failed("构建失败")
         sys.exit(1)
+    if executed:
+        cache.record(build_step, build_digest)
+        cache.save()
     logger.step_done(current_step, total_steps)
     
     # 复制配置文件
     copy_config_file(project_root, platform_name)
     
     # 显示构建输出位置
-    if platform_name == 'windows':
-        exe_path = project_root / 'build' / 'windows' / 'x64' / 'runner' / 'Debug' / 'SvnAutoMerge.exe'
-        logger.info(f"应用位置: {exe_path}")
-    elif platform_name == 'macos':
-        app_bundle = project_root / 'build' / 'macos' / 'Build' / 'Products' / 'Debug' / 'SvnAutoMerge.app'
-        logger.info(f"应用位置: {app_bundle}")
-    else:
-        bundle_dir = project_root / 'build' / 'linux' / 'x64' / 'debug' / 'bundle'
-        logger.info(f"应用位置: {bundle_dir}")
+    logger.info(f"应用位置: {get_build_output_path(project_root, platform_name)}")
 
     # 步骤 7: 启动应用
     # 桌面平台（macOS / Windows / Linux）：无需设备，直接启动构建产物。
     # 移动平台（android / ios）：需要 device 才能 install / run。
     current_step += 1
-    is_desktop = platform_name in ('macos', 'windows', 'linux')
+
+    if args.benchmark_startup:
+        logger.step(current_step, total_steps, "启动耗时基准测试")
+        if not benchmark_startup(project_root, platform_name, version, args.benchmark_startup, args.benchmark_timeout):
+            logger.failed("启动耗时基准测试失败")
+            sys.exit(1)
+        logger.step_done(current_step, total_steps)
+        logger.success("启动耗时基准测试完成")
+        sys.exit(0)
 
     if is_desktop:
         logger.step(current_step, total_steps, "启动桌面应用")
@@ -533,6 +823,8 @@ def main():
                 except Exception as e:
                     logger.warn(f"启动应用失败: {e}")
         logger.step_done(current_step, total_steps)
+        if incremental:
+            report_time_saved(platform_name, "增量部署")
         logger.success("部署完成")
         sys.exit(0)
 
@@ -552,7 +844,7 @@ def main():
 
     # 启动应用
     logger.info("启动应用...")
-    if not run_flutter_command(flutter_cmd, ['run'], check=False):
+    if not run_flutter_command(flutter_cmd, ['run'], check=False, interactive=True):
         logger.warn("应用启动失败")
 
     logger.step_done(current_step, total_steps)
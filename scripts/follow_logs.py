@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SVN 合并助手 - 实时跟随应用日志
+
+类似 `tail -F latest.log | grep`，专门针对应用日志（见 lib/log_follow.py）：
+- 按字节偏移轮询，空闲时每轮只有一次 stat；日志量大时一次读出积压的全部行、批量输出，
+  应用每秒写几千行时 CPU 占用也很低（--stats 退出时输出读取量和 CPU 时间）
+- 应用重启时 latest.log 被归档为 app_*.log 并重新创建：按 inode 和 `# Log created at:`
+  header 识别，补读旧文件最后追加的行后切换到新文件
+- 过滤语法与 search_logs.py 相同：`tag:svn`（可重复，任一匹配）、`level:warn`（该级别及以上），
+  其余词需全部出现在消息中（子串匹配，不区分大小写）；--regex / --exclude 按正则匹配消息；
+  堆栈等续行跟随所属的日志
+
+默认跟随各日志位置（见 check_log_paths.py）中最近写入的 latest.log，按 Ctrl+C 退出。
+
+使用示例：
+```bash
+python scripts/follow_logs.py                          # 最近 10 行开始跟随
+python scripts/follow_logs.py tag:svn level:warn       # 只看 SVN 的警告和错误
+python scripts/follow_logs.py tag:merge --regex "r\\d+ 处理完成" -n 0
+python scripts/follow_logs.py --path logs/ --exclude 心跳 --stats
+```
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent / "lib"))
+from app_log_paths import LATEST_LOG_NAME
+from log_follow import LineFilter, LogFollower, Rotation, find_latest_log
+from log_index import parse_query
+
+# 空闲时的默认轮询间隔（秒）
+DEFAULT_INTERVAL = 0.25
+
+
+def resolve_target(path: Optional[Path]) -> Path:
+    """跟随的文件：给出目录时为其中的 latest.log"""
+    if path is None:
+        return find_latest_log(Path(__file__).parent.parent)
+    return path / LATEST_LOG_NAME if path.is_dir() else path
+
+
+def describe_rotation(rotation: Rotation) -> str:
+    created = rotation.header or "未知时间"
+    archived = f"，旧文件已归档为 {rotation.archived.name}" if rotation.archived else ""
+    return f"==> 日志已轮转：新文件创建于 {created}{archived} <=="
+
+
+def _write(lines: List[str], line_filter: LineFilter) -> None:
+    kept = line_filter.apply(lines)
+    if kept:
+        sys.stdout.write("\n".join(kept) + "\n")
+        sys.stdout.flush()
+
+
+def follow(follower: LogFollower, line_filter: LineFilter, interval: float) -> None:
+    """轮询直到 Ctrl+C：每轮读出的行过滤后一次写出"""
+    while True:
+        lines: List[str] = []
+        for event in follower.poll():
+            if isinstance(event, Rotation):
+                _write(lines, line_filter)
+                lines = []
+                line_filter.reset()
+                print(describe_rotation(event), file=sys.stderr, flush=True)
+            else:
+                lines.append(event)
+        _write(lines, line_filter)
+        if not follower.pending:
+            time.sleep(interval)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="实时跟随应用日志（latest.log），支持过滤和轮转")
+    parser.add_argument("filters", nargs="*", help="过滤条件，如 tag:svn level:warn 合并")
+    parser.add_argument("--path", type=Path, help="日志文件或日志目录，默认为最近写入的 latest.log")
+    parser.add_argument("-n", "--lines", type=int, default=10, help="先输出已有内容的最后 N 行（过滤前），默认 10")
+    parser.add_argument("--from-start", action="store_true", help="从文件开头输出")
+    parser.add_argument("--regex", action="append", default=[], help="消息需匹配的正则，可重复（需全部匹配）")
+    parser.add_argument("--exclude", action="append", default=[], help="排除消息匹配该正则的日志，可重复")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help=f"轮询间隔（秒），默认 {DEFAULT_INTERVAL}")
+    parser.add_argument("--stats", action="store_true", help="退出时输出读取量、匹配行数和 CPU 时间")
+    args = parser.parse_args(argv)
+
+    if args.lines < 0 or args.interval <= 0:
+        parser.error("-n 不能为负数，--interval 必须为正数")
+    try:
+        line_filter = LineFilter(parse_query(args.filters), args.regex, args.exclude)
+    except ValueError as e:
+        parser.error(str(e))
+    except re.error as e:
+        parser.error(f"无效的正则表达式 {e.pattern!r}: {e}")
+
+    target = resolve_target(args.path)
+    follower = LogFollower(target, None if args.from_start else args.lines)
+    if target.exists():
+        print(f"==> 跟随 {target} <==", file=sys.stderr, flush=True)
+    else:
+        print(f"==> 等待 {target} 创建 <==", file=sys.stderr, flush=True)
+
+    started = time.monotonic()
+    cpu_started = time.process_time()
+    try:
+        follow(follower, line_filter, args.interval)
+    except KeyboardInterrupt:
+        pass
+    except BrokenPipeError:
+        # 下游（如 head）已退出，丢弃剩余输出
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    if args.stats:
+        wall = time.monotonic() - started
+        cpu = time.process_time() - cpu_started
+        print(
+            f"\n读取 {follower.bytes_read / 1024 / 1024:.1f} MB，输出 {line_filter.kept} 行，轮转 {follower.rotations} 次，"
+            f"运行 {wall:.1f}s，CPU {cpu:.2f}s（{cpu * 100 / wall if wall else 0:.1f}%）",
+            file=sys.stderr,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SVN 合并助手 - 构建历史趋势报告
+
+读取 logs/scripts/history.sqlite3（ScriptLogger 在每次运行结束时写入），
+按阶段输出各版本的耗时 p50/p95，并把最近几次的耗时与之前的滚动基线比较，
+标记变慢的阶段。按指纹缓存跳过的阶段不计入统计。
+
+使用示例：
+```bash
+python scripts/history.py                      # build 脚本所有阶段
+python scripts/history.py deploy
+python scripts/history.py --platform windows --step "flutter build windows --release"
+python scripts/history.py --json --fail-on-regression
+python scripts/history.py startup --min-delta 0.1   # deploy.py --benchmark-startup 的启动耗时
+```
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent / "lib"))
+from build_history import HISTORY_FILE_NAME, StepSample, get_default_history_file, percentile, query_step_samples
+
+# 阶段耗时增长小于该秒数时不视为回归，避免短阶段的百分比噪音
+MIN_REGRESSION_SECONDS = 1.0
+
+# 基线样本少于该数量时不做回归判断
+MIN_BASELINE_SAMPLES = 3
+
+
+@dataclass
+class VersionStats:
+    """某阶段在某版本下的耗时统计"""
+    version: str
+    count: int
+    p50: float
+    p95: float
+
+
+@dataclass
+class PhaseReport:
+    """某阶段的趋势与回归判断"""
+    name: str
+    versions: List[VersionStats]
+    recent_p50: float
+    baseline_p50: Optional[float]
+    regressed: bool
+
+    @property
+    def growth_percent(self) -> Optional[float]:
+        if not self.baseline_p50:
+            return None
+        return (self.recent_p50 - self.baseline_p50) * 100.0 / self.baseline_p50
+
+
+def build_phase_report(
+    name: str,
+    samples: List[StepSample],
+    recent: int,
+    baseline: int,
+    threshold_percent: float,
+    min_delta: float = MIN_REGRESSION_SECONDS,
+) -> PhaseReport:
+    """按版本统计耗时，并用最近 recent 次与之前 baseline 次的 p50 比较"""
+    by_version: Dict[str, List[float]] = {}
+    for sample in samples:
+        by_version.setdefault(sample.version or "unknown", []).append(sample.duration)
+    versions = [
+        VersionStats(version, len(values), percentile(values, 50), percentile(values, 95))
+        for version, values in by_version.items()
+    ]
+
+    durations = [sample.duration for sample in samples]
+    recent_values = durations[-recent:]
+    baseline_values = durations[-(recent + baseline):-recent] if len(durations) > recent else []
+    recent_p50 = percentile(recent_values, 50)
+
+    baseline_p50: Optional[float] = None
+    regressed = False
+    if len(baseline_values) >= MIN_BASELINE_SAMPLES:
+        baseline_p50 = percentile(baseline_values, 50)
+        growth = recent_p50 - baseline_p50
+        regressed = (
+            growth >= min_delta
+            and baseline_p50 > 0
+            and growth * 100.0 / baseline_p50 > threshold_percent
+        )
+
+    return PhaseReport(name, versions, recent_p50, baseline_p50, regressed)
+
+
+def print_report(script: str, reports: List[PhaseReport], recent: int, threshold_percent: float) -> None:
+    """输出文本报告"""
+    print(f"{script} 阶段耗时趋势（最近 {recent} 次与滚动基线比较，阈值 {threshold_percent:g}%）")
+    for report in reports:
+        print()
+        print(f"阶段: {report.name}")
+        print(f"  {'版本':<16} {'次数':>6} {'p50':>10} {'p95':>10}")
+        for stats in report.versions:
+            print(f"  {stats.version:<16} {stats.count:>6} {stats.p50:>9.1f}s {stats.p95:>9.1f}s")
+        if report.baseline_p50 is None:
+            print(f"  最近 p50 {report.recent_p50:.1f}s（基线样本不足 {MIN_BASELINE_SAMPLES} 次，不做比较）")
+            continue
+        flag = "  [回归]" if report.regressed else ""
+        print(
+            f"  最近 p50 {report.recent_p50:.1f}s，基线 p50 {report.baseline_p50:.1f}s"
+            f"（{report.growth_percent:+.1f}%）{flag}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="构建/部署阶段耗时趋势报告")
+    parser.add_argument("script", nargs="?", default="build", help="脚本名称，默认 build")
+    parser.add_argument("--platform", help="只统计该平台的运行")
+    parser.add_argument("--mode", help="只统计包含该构建模式的运行")
+    parser.add_argument("--step", help="只统计该阶段")
+    parser.add_argument("--recent", type=int, default=3, help="参与比较的最近运行次数，默认 3")
+    parser.add_argument("--baseline", type=int, default=10, help="滚动基线的运行次数，默认 10")
+    parser.add_argument("--threshold", type=float, default=20.0, help="p50 增长超过该百分比视为回归，默认 20")
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=MIN_REGRESSION_SECONDS,
+        help=f"p50 增长小于该秒数时不视为回归，默认 {MIN_REGRESSION_SECONDS:g}",
+    )
+    parser.add_argument("--log-dir", type=Path, help="日志目录，默认 logs/scripts/")
+    parser.add_argument("--json", action="store_true", help="以 JSON 格式输出")
+    parser.add_argument("--fail-on-regression", action="store_true", help="存在回归时以退出码 2 结束")
+    args = parser.parse_args(argv)
+
+    if args.recent <= 0 or args.baseline <= 0:
+        parser.error("--recent 和 --baseline 必须为正数")
+
+    db_path = args.log_dir / HISTORY_FILE_NAME if args.log_dir else get_default_history_file()
+    samples = query_step_samples(args.script, args.step, args.platform, args.mode, db_path=db_path)
+    reports = [
+        build_phase_report(name, items, args.recent, args.baseline, args.threshold, args.min_delta)
+        for name, items in samples.items()
+    ]
+
+    if args.json:
+        data = [dict(asdict(report), growth_percent=report.growth_percent) for report in reports]
+        print(json.dumps(data, ensure_ascii=False, indent=2))
+    elif not reports:
+        print(f"没有 {args.script} 的历史记录: {db_path}")
+    else:
+        print_report(args.script, reports, args.recent, args.threshold)
+
+    if args.fail_on_regression and any(report.regressed for report in reports):
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+应用日志格式解析
+
+与 lib/services/logger_service.dart 的格式契约一致：
+- latest.log 第一行为 `# Log created at: <文件时间戳>`（formatLogFileTimestamp，
+  形如 2026-10-16T22-46-35），其后是一行改名提示和一个空行
+- 日志行为 `[HH:MM:SS.mmm] [LEVEL] [TAG     ] message`，
+  level 右补空格至宽度 5，tag 右补空格至宽度 8；message 不转义、可含 `]`
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+HEADER_PREFIX = "# Log created at: "
+
+# 与 LogLevel 枚举顺序一致
+LEVELS = ("DEBUG", "INFO", "WARN", "ERROR")
+
+_LINE_PATTERN = re.compile(r"^\[(\d{2}:\d{2}:\d{2}\.\d{3})\] \[([A-Z]+) *\] \[([^\]]*?) *\] ?(.*)$")
+
+
+@dataclass
+class LogLine:
+    """一条解析后的应用日志"""
+    timestamp: str
+    level: str
+    tag: str
+    message: str
+
+    @property
+    def seconds(self) -> float:
+        """timestamp 对应的当日秒数"""
+        hours, minutes, rest = self.timestamp.split(":")
+        return int(hours) * 3600 + int(minutes) * 60 + float(rest)
+
+
+def is_header(line: str) -> bool:
+    """是否为 latest.log 的创建时间 header 行"""
+    return line.startswith(HEADER_PREFIX)
+
+
+def parse_header(line: str) -> Optional[str]:
+    """提取 header 中的文件时间戳，非 header 行返回 None"""
+    if not is_header(line):
+        return None
+    return line[len(HEADER_PREFIX):].strip()
+
+
+def parse_line(line: str) -> Optional[LogLine]:
+    """解析一条日志行，格式不符（header、堆栈续行等）时返回 None"""
+    match = _LINE_PATTERN.match(line.rstrip("\r\n"))
+    if not match:
+        return None
+    return LogLine(*match.groups())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+应用运行时目录定位
+
+与应用中 path_service（getApplicationSupportDirectory）一致：
+- Windows: %APPDATA%/SvnAutoMerge
+- macOS:   ~/Library/Application Support/com.example.svnautomerge
+- Linux:   ~/.local/share/SvnAutoMerge
+
+日志位于 <根目录>/logs（latest.log 与归档的 app_*.log），配置位于 <根目录>/config。
+开发环境下日志也可能位于项目 logs/、exe 所在目录或当前工作目录（find_log_files）。
+collect_logs.py、deploy.py、analyze_logs.py 等脚本共用。
+"""
+
+import os
+import platform
+from pathlib import Path
+from typing import Dict, List
+
+LATEST_LOG_NAME = "latest.log"
+LOG_PATTERNS = (LATEST_LOG_NAME, "app_*.log")
+
+
+def get_app_support_roots() -> List[Path]:
+    """获取当前平台实际使用的应用支持根目录。"""
+    system = platform.system()
+
+    if system == 'Windows':
+        appdata = os.getenv('APPDATA')
+        return [Path(appdata) / 'SvnAutoMerge'] if appdata else []
+    if system == 'Darwin':
+        return [
+            Path.home()
+            / 'Library'
+            / 'Application Support'
+            / 'com.example.svnautomerge'
+        ]
+    if system == 'Linux':
+        return [Path.home() / '.local' / 'share' / 'SvnAutoMerge']
+    return []
+
+
+def get_runtime_log_dirs() -> List[Path]:
+    """获取当前平台实际使用的运行时日志目录。"""
+    return [root / 'logs' for root in get_app_support_roots()]
+
+
+def get_user_config_dirs() -> List[Path]:
+    """获取当前平台实际使用的用户配置目录。"""
+    return [root / 'config' for root in get_app_support_roots()]
+
+
+def get_exe_dir(project_root: Path) -> Path:
+    """Windows Debug 构建产物所在目录（直接运行 exe 时日志可能写在这里）。"""
+    return project_root / 'build' / 'windows' / 'x64' / 'runner' / 'Debug'
+
+
+def list_log_files(directory: Path) -> List[Path]:
+    """列出目录中的日志文件，包含 latest.log 和历史归档（按修改时间从新到旧）。"""
+    files: List[Path] = []
+    for pattern in LOG_PATTERNS:
+        files.extend(directory.glob(pattern))
+    files.sort(key=lambda file: file.stat().st_mtime, reverse=True)
+    return files
+
+
+def find_log_files(project_root: Path) -> List[Path]:
+    """在 collect_logs.py 检查的所有位置查找日志文件（按修改时间从新到旧）。"""
+    directories = [project_root / 'logs', *get_runtime_log_dirs()]
+    exe_dir = get_exe_dir(project_root)
+    if (exe_dir / 'SvnAutoMerge.exe').exists():
+        directories.extend([exe_dir / 'logs', exe_dir])
+    directories.append(Path.cwd() / 'logs')
+
+    found: Dict[Path, Path] = {}
+    for directory in directories:
+        if directory.exists():
+            for log_file in list_log_files(directory):
+                found.setdefault(log_file.resolve(), log_file)
+    return sorted(found.values(), key=lambda file: file.stat().st_mtime, reverse=True)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+应用日志流式读取
+
+按行流式读取 latest.log / app_*.log，每条带时间戳的日志产出一个 LogRecord：
+- 行内只有一天内的时刻，日期由 header / 文件名确定（见 log_time_window.file_time_range），
+  之后时刻回退超过半天即视为跨过午夜
+- `  └─ Error:`、堆栈等没有时间戳的续行归入上一条日志（默认只计数，keep_details 时保留内容）
+- 同一时刻内存中最多只有一条日志，可处理任意大小的文件
+- 可指定字节范围 [start, end)，与 find_window() 配合只读时间窗口内的片段
+
+analyze_logs.py 等分析脚本共用。
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence
+
+from app_log_format import parse_line
+from app_log_paths import find_log_files, list_log_files
+from log_time_window import SECONDS_PER_DAY, LineClock, TimeWindow, file_time_range, find_window
+
+
+@dataclass
+class LogRecord:
+    """一条带时间戳的应用日志"""
+    path: Path
+    offset: int
+    time: datetime
+    level: str
+    tag: str
+    message: str
+    detail_lines: int = 0
+    details: Optional[List[str]] = None
+
+
+def file_clock(path: Path) -> LineClock:
+    """文件行内时刻的换算锚点：有 header 用开始时间，否则用结束时间"""
+    start, end, has_header = file_time_range(path)
+    return LineClock(start, anchor_is_end=False) if has_header else LineClock(end, anchor_is_end=True)
+
+
+def iter_records(
+    path: Path,
+    start: int = 0,
+    end: Optional[int] = None,
+    keep_details: bool = False,
+) -> Iterator[LogRecord]:
+    """流式产出 path 中 [start, end) 范围内的日志
+
+    start 应位于行首（0 或 find_window() 返回的偏移）。keep_details 时续行内容保存在
+    LogRecord.details 中。
+    """
+    clock = file_clock(path)
+    day_offset: Optional[float] = None
+    previous: Optional[float] = None
+    pending: Optional[LogRecord] = None
+
+    with open(path, "rb") as f:
+        f.seek(start)
+        offset = start
+        for raw in f:
+            if end is not None and offset >= end:
+                break
+            line_offset = offset
+            offset += len(raw)
+            line = raw.decode("utf-8", errors="replace")
+            parsed = parse_line(line)
+            if parsed is None:
+                if pending is not None:
+                    pending.detail_lines += 1
+                    if keep_details:
+                        pending.details.append(line.rstrip("\r\n"))
+                continue
+
+            seconds = parsed.seconds
+            if day_offset is None:
+                day_offset = clock.line_seconds(seconds) - seconds
+            elif seconds < previous - SECONDS_PER_DAY / 2:
+                day_offset += SECONDS_PER_DAY
+            previous = seconds
+
+            if pending is not None:
+                yield pending
+            pending = LogRecord(
+                path=path,
+                offset=line_offset,
+                time=clock.midnight + timedelta(seconds=seconds + day_offset),
+                level=parsed.level,
+                tag=parsed.tag,
+                message=parsed.message,
+                details=[] if keep_details else None,
+            )
+    if pending is not None:
+        yield pending
+
+
+def resolve_log_files(paths: Sequence[Path], project_root: Path) -> List[Path]:
+    """命令行给出的文件/目录展开为日志文件；未给出时查找所有默认位置
+
+    返回按修改时间从旧到新排列，依次读取即大致按时间顺序。
+    """
+    if not paths:
+        files = find_log_files(project_root)
+    else:
+        files = []
+        for path in paths:
+            files.extend(list_log_files(path) if path.is_dir() else [path])
+    return sorted(dict.fromkeys(files), key=lambda file: file.stat().st_mtime)
+
+
+def iter_log_records(files: Sequence[Path], window: Optional[TimeWindow] = None) -> Iterator[LogRecord]:
+    """依次流式读取多个日志文件；指定时间窗口时每个文件只读窗口内的片段"""
+    for path in files:
+        if window is None:
+            yield from iter_records(path)
+            continue
+        found = find_window(path, window)
+        if found is not None:
+            yield from iter_records(path, *found)
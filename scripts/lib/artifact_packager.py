@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+构建产物打包引擎
+
+- zip：条目在线程池中并行读取和 deflate 压缩（zlib 压缩期间释放 GIL，可用满多核），
+  主线程按顺序由 _ZipWriter 追加压缩好的数据并写中央目录（按 zip 规范自行写记录，
+  不依赖 zipfile 的内部接口）；已压缩格式（.so/.dll/图片等）和压缩无收益的文件直接存储
+- tar.gz / tar.xz：标准库 tarfile 单线程压缩，适合需要更高压缩率的场景
+
+并行度受在途字节数限制，内存占用不会随产物大小无限增长。
+
+产物可复现：条目按路径排序，时间戳固定（SOURCE_DATE_EPOCH，缺省为 1980-01-01），
+权限统一为 0644/0755，tar 的属主信息清空、gzip 头不含时间和文件名。
+每个归档旁边生成 <归档名>.manifest.json，记录每个文件的大小、权限和 SHA-256；
+清单与上次完全一致且归档仍在时跳过重新打包。
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import struct
+import tarfile
+import time
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Deque, Dict, List, Optional, Tuple
+
+ARCHIVE_FORMATS = ("zip", "tar.gz", "tar.xz")
+DEFAULT_COMPRESSION_LEVEL = 6
+
+# 已经压缩过（或压缩收益很低）的文件类型，zip 中以 STORED 方式存放
+STORED_SUFFIXES = frozenset({
+    ".so", ".dll", ".dylib",
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".ico", ".icns",
+    ".zip", ".gz", ".xz", ".bz2", ".7z", ".jar",
+    ".woff", ".woff2", ".mp3", ".mp4", ".ogg",
+})
+
+# 并行压缩时在途（已读入内存、尚未写入归档）的最大字节数
+MAX_IN_FLIGHT_BYTES = 256 * 1024 * 1024
+
+MANIFEST_SUFFIX = ".manifest.json"
+MANIFEST_FORMAT_VERSION = 1
+
+# zip 能表示的最早时间 1980-01-01 00:00:00（UTC）
+ZIP_EPOCH = 315532800
+
+
+def get_source_date_epoch() -> int:
+    """归档中使用的固定时间戳（遵循 SOURCE_DATE_EPOCH 约定）"""
+    value = os.environ.get("SOURCE_DATE_EPOCH")
+    if value and value.isdigit():
+        return max(int(value), ZIP_EPOCH)
+    return ZIP_EPOCH
+
+
+def normalize_mode(mode: int) -> int:
+    """统一文件权限：有任一执行位则 0755，否则 0644"""
+    return 0o755 if mode & 0o111 else 0o644
+
+
+@dataclass
+class ArchiveEntry:
+    """归档中的一个文件
+
+    data 不为 None 时条目内容取自内存（如生成的系统信息），不读取 source；
+    length 不为 None 时只取 source 中 [offset, offset + length) 这一段（如日志的增量部分）。
+    """
+    arcname: str
+    source: Optional[Path]
+    data: Optional[bytes] = None
+    offset: int = 0
+    length: Optional[int] = None
+
+
+def entry_size(entry: ArchiveEntry) -> int:
+    """条目内容的字节数"""
+    if entry.data is not None:
+        return len(entry.data)
+    if entry.length is not None:
+        return entry.length
+    return entry.source.stat().st_size
+
+
+def read_entry(entry: ArchiveEntry) -> bytes:
+    """读取条目内容"""
+    if entry.data is not None:
+        return entry.data
+    if entry.length is not None:
+        with open(entry.source, "rb") as f:
+            f.seek(entry.offset)
+            return f.read(entry.length)
+    return entry.source.read_bytes()
+
+
+def _entry_mode(entry: ArchiveEntry) -> int:
+    if entry.data is not None:
+        return 0o644
+    return normalize_mode(entry.source.stat().st_mode)
+
+
+@dataclass
+class PackageResult:
+    """打包结果"""
+    archive_path: Path
+    manifest_path: Path
+    reused: bool
+    file_count: int
+    total_bytes: int
+
+
+@dataclass
+class _CompressedEntry:
+    entry: ArchiveEntry
+    data: bytes
+    crc: int
+    size: int
+    compress_type: int
+    mode: int
+
+
+def collect_entries(source: Path, include_root: bool) -> List[ArchiveEntry]:
+    """收集目录（或单个文件）中需要打包的文件
+
+    Args:
+        source: 产物目录或文件
+        include_root: 归档路径是否包含 source 目录名本身（macOS .app 需要）
+    """
+    if not source.is_dir():
+        return [ArchiveEntry(source.name, source)]
+
+    base_dir = source.parent if include_root else source
+    entries = [
+        ArchiveEntry(file_path.relative_to(base_dir).as_posix(), file_path)
+        for file_path in source.rglob("*")
+        if file_path.is_file()
+    ]
+    entries.sort(key=lambda entry: entry.arcname)
+    return entries
+
+
+def _should_store(arcname: str, level: int) -> bool:
+    return level == 0 or Path(arcname).suffix.lower() in STORED_SUFFIXES
+
+
+def _compress_entry(entry: ArchiveEntry, level: int) -> _CompressedEntry:
+    """在工作线程中读取并压缩单个文件（raw deflate 流，CRC 与大小一并算好）"""
+    raw = read_entry(entry)
+    crc = zlib.crc32(raw)
+    mode = _entry_mode(entry)
+    if _should_store(entry.arcname, level):
+        return _CompressedEntry(entry, raw, crc, len(raw), zipfile.ZIP_STORED, mode)
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    data = compressor.compress(raw) + compressor.flush()
+    if len(data) >= len(raw):
+        # 压缩无收益时退化为存储
+        return _CompressedEntry(entry, raw, crc, len(raw), zipfile.ZIP_STORED, mode)
+    return _CompressedEntry(entry, data, crc, len(raw), zipfile.ZIP_DEFLATED, mode)
+
+
+# zip 记录格式（APPNOTE.TXT 4.3），与 zipfile 模块写出的一致
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_CENTRAL_HEADER = struct.Struct("<4s4B4HL2L5H2L")
+_END_RECORD = struct.Struct("<4s4H2LH")
+_ZIP64_END_RECORD = struct.Struct("<4sQ2H2L4Q")
+_ZIP64_END_LOCATOR = struct.Struct("<4sLQL")
+_ZIP64_EXTRA_ID = 0x0001
+_UTF8_FLAG = 0x800
+_UNIX_SYSTEM = 3
+_MAX_UINT32 = 0xFFFFFFFF
+_MAX_UINT16 = 0xFFFF
+
+
+class _ZipWriter:
+    """按顺序追加已压缩好的条目，最后写中央目录
+
+    zipfile 没有写入预压缩数据的公开接口，这里只写本归档需要的记录：本地文件头 + 数据、
+    中央目录和结束记录；大小、偏移或条目数超出 32/16 位时写 ZIP64 扩展字段和记录。
+    """
+
+    def __init__(self, fp: BinaryIO, date_time: Tuple[int, int, int, int, int, int]):
+        self.fp = fp
+        year, month, day, hour, minute, second = date_time
+        self.dos_date = (year - 1980) << 9 | month << 5 | day
+        self.dos_time = hour << 11 | minute << 5 | second // 2
+        self.central: List[bytes] = []
+
+    def add(self, item: _CompressedEntry):
+        """写入一个条目（权限统一、标记为 Unix 系统）"""
+        name = item.entry.arcname.encode("ascii", errors="ignore")
+        flags = 0
+        if name.decode("ascii") != item.entry.arcname:
+            name = item.entry.arcname.encode("utf-8")
+            flags |= _UTF8_FLAG
+        offset = self.fp.tell()
+        compress_size = len(item.data)
+
+        zip64_sizes = item.size >= _MAX_UINT32 or compress_size >= _MAX_UINT32
+        version = 45 if zip64_sizes or offset >= _MAX_UINT32 else 20
+        local_extra = struct.pack("<2H2Q", _ZIP64_EXTRA_ID, 16, item.size, compress_size) if zip64_sizes else b""
+        self.fp.write(_LOCAL_HEADER.pack(
+            b"PK\x03\x04", version, 0, flags, item.compress_type, self.dos_time, self.dos_date, item.crc,
+            _MAX_UINT32 if zip64_sizes else compress_size,
+            _MAX_UINT32 if zip64_sizes else item.size,
+            len(name), len(local_extra),
+        ))
+        self.fp.write(name)
+        self.fp.write(local_extra)
+        self.fp.write(item.data)
+
+        # 中央目录的 ZIP64 扩展字段只包含溢出的值，顺序固定为 原始大小、压缩大小、偏移
+        values = (item.size, compress_size, offset)
+        extra_values = [value for value in values if value >= _MAX_UINT32]
+        central_extra = (
+            struct.pack(f"<2H{len(extra_values)}Q", _ZIP64_EXTRA_ID, 8 * len(extra_values), *extra_values)
+            if extra_values else b""
+        )
+        file_size, packed_size, header_offset = (min(value, _MAX_UINT32) for value in values)
+        self.central.append(_CENTRAL_HEADER.pack(
+            b"PK\x01\x02", version, _UNIX_SYSTEM, version, 0, flags, item.compress_type,
+            self.dos_time, self.dos_date, item.crc, packed_size, file_size,
+            len(name), len(central_extra), 0, 0, 0, (0o100000 | item.mode) << 16, header_offset,
+        ) + name + central_extra)
+
+    def close(self):
+        """写出中央目录和结束记录"""
+        start = self.fp.tell()
+        for record in self.central:
+            self.fp.write(record)
+        end = self.fp.tell()
+        count = len(self.central)
+        size = end - start
+        if count >= _MAX_UINT16 or start >= _MAX_UINT32 or size >= _MAX_UINT32:
+            self.fp.write(_ZIP64_END_RECORD.pack(
+                b"PK\x06\x06", _ZIP64_END_RECORD.size - 12, 45, 45, 0, 0, count, count, size, start,
+            ))
+            self.fp.write(_ZIP64_END_LOCATOR.pack(b"PK\x06\x07", 0, end, 1))
+        self.fp.write(_END_RECORD.pack(
+            b"PK\x05\x06", 0, 0, min(count, _MAX_UINT16), min(count, _MAX_UINT16),
+            min(size, _MAX_UINT32), min(start, _MAX_UINT32), 0,
+        ))
+
+
+def _fixed_zip_date_time() -> Tuple[int, int, int, int, int, int]:
+    return tuple(time.gmtime(get_source_date_epoch())[:6])  # type: ignore[return-value]
+
+
+def write_zip(
+    archive_path: Path,
+    entries: List[ArchiveEntry],
+    level: int = DEFAULT_COMPRESSION_LEVEL,
+    workers: Optional[int] = None,
+):
+    """并行压缩并写出 zip
+
+    Args:
+        archive_path: 输出路径
+        entries: 归档条目（按此顺序写入）
+        level: deflate 压缩级别 0-9，0 表示全部存储
+        workers: 压缩线程数，默认 CPU 核数
+    """
+    workers = workers or os.cpu_count() or 1
+    pending: Deque[Tuple[Future, int]] = deque()
+    in_flight = 0
+
+    with open(archive_path, "wb") as fp, \
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="zip") as pool:
+        archive = _ZipWriter(fp, _fixed_zip_date_time())
+
+        def drain_one():
+            nonlocal in_flight
+            future, size = pending.popleft()
+            archive.add(future.result())
+            in_flight -= size
+
+        for entry in entries:
+            size = entry_size(entry)
+            while pending and (
+                in_flight + size > MAX_IN_FLIGHT_BYTES or len(pending) >= workers * 4
+            ):
+                drain_one()
+            pending.append((pool.submit(_compress_entry, entry, level), size))
+            in_flight += size
+
+        while pending:
+            drain_one()
+        archive.close()
+
+
+def write_tar(
+    archive_path: Path,
+    entries: List[ArchiveEntry],
+    archive_format: str,
+    level: int = DEFAULT_COMPRESSION_LEVEL,
+):
+    """写出 tar.gz / tar.xz（单线程，内容可复现）"""
+    mtime = get_source_date_epoch()
+
+    def normalize(info: tarfile.TarInfo) -> tarfile.TarInfo:
+        info.mtime = mtime
+        info.mode = normalize_mode(info.mode)
+        info.uid = info.gid = 0
+        info.uname = info.gname = ""
+        return info
+
+    with open(archive_path, "wb") as raw:
+        if archive_format == "tar.gz":
+            # 自行创建 GzipFile：gzip 头不写入文件名，时间固定为 0
+            compressed = gzip.GzipFile(
+                filename="", mode="wb", fileobj=raw, compresslevel=max(1, level), mtime=0
+            )
+            archive = tarfile.open(fileobj=compressed, mode="w", format=tarfile.PAX_FORMAT)
+        elif archive_format == "tar.xz":
+            compressed = None
+            archive = tarfile.open(fileobj=raw, mode="w:xz", preset=level, format=tarfile.PAX_FORMAT)
+        else:
+            raise ValueError(f"不支持的 tar 格式: {archive_format}")
+
+        with archive:
+            for entry in entries:
+                if entry.data is None and entry.length is None:
+                    archive.add(str(entry.source), arcname=entry.arcname, recursive=False, filter=normalize)
+                    continue
+                info = tarfile.TarInfo(entry.arcname)
+                info.size = entry_size(entry)
+                info.mode = 0o644
+                if entry.data is not None:
+                    archive.addfile(normalize(info), io.BytesIO(entry.data))
+                    continue
+                # 分段条目：tarfile 从当前位置流式读取 info.size 字节
+                with open(entry.source, "rb") as f:
+                    f.seek(entry.offset)
+                    archive.addfile(normalize(info), f)
+        if compressed is not None:
+            compressed.close()
+
+
+def _hash_entry(entry: ArchiveEntry) -> Dict[str, Any]:
+    digest = hashlib.sha256()
+    size = 0
+    with open(entry.source, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    return {
+        "path": entry.arcname,
+        "size": size,
+        "mode": oct(normalize_mode(entry.source.stat().st_mode)),
+        "sha256": digest.hexdigest(),
+    }
+
+
+def build_manifest(
+    entries: List[ArchiveEntry],
+    archive_format: str,
+    level: int,
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """并行计算所有条目的 SHA-256，生成打包清单（不含归档自身信息）"""
+    workers = workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hash") as pool:
+        files = list(pool.map(_hash_entry, entries))
+    return {
+        "version": MANIFEST_FORMAT_VERSION,
+        "format": archive_format,
+        "compression_level": level,
+        "source_date_epoch": get_source_date_epoch(),
+        "files": files,
+    }
+
+
+def get_manifest_path(archive_path: Path) -> Path:
+    """归档对应的清单路径"""
+    return archive_path.with_name(archive_path.name + MANIFEST_SUFFIX)
+
+
+def _load_manifest(manifest_path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        return json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def archive_suffix(archive_format: str) -> str:
+    """归档格式对应的文件扩展名"""
+    if archive_format not in ARCHIVE_FORMATS:
+        raise ValueError(f"不支持的归档格式: {archive_format}")
+    return f".{archive_format}"
+
+
+def create_archive(
+    archive_path: Path,
+    source: Path,
+    include_root: bool,
+    archive_format: str = "zip",
+    level: int = DEFAULT_COMPRESSION_LEVEL,
+    workers: Optional[int] = None,
+    force: bool = False,
+) -> PackageResult:
+    """把产物目录打包为指定格式的归档，并写出清单
+
+    Args:
+        archive_path: 输出路径
+        source: 产物目录或文件
+        include_root: 归档路径是否包含 source 目录名本身
+        archive_format: zip / tar.gz / tar.xz
+        level: 压缩级别 0-9
+        workers: 并行线程数
+        force: 清单未变化时也重新打包
+
+    Returns:
+        PackageResult（reused 表示清单未变化，沿用了已有归档）
+    """
+    if not 0 <= level <= 9:
+        raise ValueError(f"压缩级别必须在 0-9 之间: {level}")
+
+    entries = collect_entries(source, include_root)
+    manifest = build_manifest(entries, archive_format, level, workers)
+    manifest_path = get_manifest_path(archive_path)
+    total_bytes = sum(item["size"] for item in manifest["files"])
+
+    previous = _load_manifest(manifest_path)
+    if not force and previous is not None and archive_path.exists():
+        previous_archive = previous.pop("archive", {})
+        if previous == manifest and previous_archive.get("size") == archive_path.stat().st_size:
+            return PackageResult(archive_path, manifest_path, True, len(entries), total_bytes)
+
+    temp_path = archive_path.with_name(f"{archive_path.name}.{os.getpid()}.tmp")
+    try:
+        if archive_format == "zip":
+            write_zip(temp_path, entries, level, workers)
+        else:
+            write_tar(temp_path, entries, archive_format, level)
+        os.replace(temp_path, archive_path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+    manifest["archive"] = {
+        "name": archive_path.name,
+        "size": archive_path.stat().st_size,
+        "sha256": _hash_file(archive_path),
+    }
+    manifest_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    return PackageResult(archive_path, manifest_path, False, len(entries), total_bytes)
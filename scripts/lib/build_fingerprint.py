@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+构建步骤输入指纹缓存
+
+对构建步骤的输入文件计算 SHA-256 指纹并缓存到 .dart_tool 下：
+- 步骤的当前指纹与上次成功时记录的一致、且输出仍然存在时，可以跳过该步骤
+- 文件级哈希按 (大小, mtime) 缓存，未变化的文件不重复读取，
+  大目录的指纹计算也只需一次 stat 遍历
+- flutter clean 会删除 .dart_tool，缓存随之失效
+- 各步骤的输入（pub_get_inputs / flutter_build_inputs）在此统一定义，
+  build.py 与 deploy.py 共用同一份缓存记录
+
+使用示例：
+```python
+cache = FingerprintCache.for_project(project_root)
+digest = cache.fingerprint(project_root, [project_root / "pubspec.yaml"], extra={"mode": "release"})
+if cache.is_fresh("pub_get", digest, [project_root / ".dart_tool" / "package_config.json"]):
+    ...  # 跳过
+cache.record("pub_get", digest)
+cache.save()
+```
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+CACHE_RELATIVE_PATH = Path(".dart_tool") / "svn_merge_build" / "fingerprints.json"
+CACHE_FORMAT_VERSION = 1
+
+# 遍历目录时跳过的生成目录（构建过程中会变化，不属于输入）
+DEFAULT_EXCLUDED_DIRS = frozenset({
+    ".dart_tool",
+    "build",
+    "ephemeral",
+    "Pods",
+    ".symlinks",
+    "xcuserdata",
+})
+
+
+def flutter_sdk_inputs(flutter_cmd: str) -> List[Path]:
+    """Flutter SDK 版本文件，参与所有步骤的指纹，升级 SDK 后步骤重新执行"""
+    sdk_root = Path(flutter_cmd).resolve().parent.parent
+    return [sdk_root / "version", sdk_root / "bin" / "cache" / "flutter.version.json"]
+
+
+def pub_get_inputs(project_root: Path, flutter_cmd: str) -> List[Path]:
+    """flutter pub get 的输入"""
+    return [project_root / "pubspec.yaml", project_root / "pubspec.lock"] + flutter_sdk_inputs(flutter_cmd)
+
+
+def flutter_build_inputs(project_root: Path, target_platform: str, flutter_cmd: str) -> List[Path]:
+    """flutter build <平台> 的输入"""
+    return [
+        project_root / "lib",
+        project_root / "assets",
+        project_root / target_platform,
+        project_root / "pubspec.yaml",
+        project_root / "pubspec.lock",
+    ] + flutter_sdk_inputs(flutter_cmd)
+
+
+def hash_file(path: Path) -> str:
+    """计算文件内容的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def collect_files(
+    paths: Iterable[Path],
+    excluded_dirs: Iterable[str] = DEFAULT_EXCLUDED_DIRS,
+) -> List[Path]:
+    """展开文件/目录列表为排序后的文件列表（不存在的路径忽略）"""
+    excluded = set(excluded_dirs)
+    files: List[Path] = []
+    for path in paths:
+        if path.is_file():
+            files.append(path)
+        elif path.is_dir():
+            for dir_path, dir_names, file_names in os.walk(path):
+                dir_names[:] = sorted(name for name in dir_names if name not in excluded)
+                files.extend(Path(dir_path) / name for name in file_names)
+    return sorted(set(files))
+
+
+class FingerprintCache:
+    """步骤指纹缓存"""
+
+    def __init__(self, cache_file: Path):
+        self.cache_file = cache_file
+        self.steps: Dict[str, str] = {}
+        self._file_hashes: Dict[str, List[Any]] = {}
+        self._dirty = False
+        self._load()
+
+    @classmethod
+    def for_project(cls, project_root: Path) -> "FingerprintCache":
+        """项目默认缓存位置：.dart_tool/svn_merge_build/fingerprints.json"""
+        return cls(project_root / CACHE_RELATIVE_PATH)
+
+    def _load(self):
+        try:
+            data = json.loads(self.cache_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") != CACHE_FORMAT_VERSION:
+            return
+        self.steps = dict(data.get("steps", {}))
+        self._file_hashes = dict(data.get("files", {}))
+
+    def save(self):
+        """原子写入缓存文件（无变化时不写）"""
+        if not self._dirty:
+            return
+        # 丢弃已不存在文件的哈希，避免缓存无限增长
+        self._file_hashes = {
+            key: value for key, value in self._file_hashes.items() if os.path.exists(key)
+        }
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.cache_file.with_name(f"{self.cache_file.name}.{os.getpid()}.tmp")
+        temp_file.write_text(
+            json.dumps(
+                {"version": CACHE_FORMAT_VERSION, "steps": self.steps, "files": self._file_hashes},
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+        os.replace(temp_file, self.cache_file)
+        self._dirty = False
+
+    def _cached_file_hash(self, path: Path) -> str:
+        """按 (大小, mtime_ns) 复用文件哈希"""
+        stat = path.stat()
+        key = str(path)
+        cached = self._file_hashes.get(key)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = hash_file(path)
+        self._file_hashes[key] = [stat.st_size, stat.st_mtime_ns, digest]
+        self._dirty = True
+        return digest
+
+    def fingerprint(
+        self,
+        root: Path,
+        inputs: Sequence[Path],
+        extra: Optional[Dict[str, Any]] = None,
+        excluded_dirs: Iterable[str] = DEFAULT_EXCLUDED_DIRS,
+    ) -> str:
+        """计算一组输入的指纹
+
+        Args:
+            root: 相对路径的基准目录（指纹只与相对路径和内容有关）
+            inputs: 输入文件或目录
+            extra: 额外参与指纹的参数（平台、模式、工具版本等）
+            excluded_dirs: 遍历目录时跳过的目录名
+
+        Returns:
+            十六进制 SHA-256 指纹
+        """
+        digest = hashlib.sha256()
+        digest.update(json.dumps(extra or {}, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        for path in collect_files(inputs, excluded_dirs):
+            try:
+                relative = path.relative_to(root).as_posix()
+            except ValueError:
+                relative = path.as_posix()
+            digest.update(relative.encode("utf-8"))
+            digest.update(b"\0")
+            digest.update(self._cached_file_hash(path).encode("ascii"))
+            digest.update(b"\n")
+        return digest.hexdigest()
+
+    def is_fresh(self, step: str, digest: str, outputs: Iterable[Path]) -> bool:
+        """指纹与上次成功记录一致且所有输出存在时返回 True"""
+        if self.steps.get(step) != digest:
+            return False
+        return all(path.exists() for path in outputs)
+
+    def record(self, step: str, digest: str):
+        """记录步骤成功时的指纹"""
+        if self.steps.get(step) != digest:
+            self.steps[step] = digest
+            self._dirty = True
+
+    def invalidate(self, step: str):
+        """清除步骤的指纹记录"""
+        if self.steps.pop(step, None) is not None:
+            self._dirty = True
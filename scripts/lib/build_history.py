@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+构建运行历史数据库
+
+ScriptLogger 写入日志尾部时，把本次运行记录到 logs/scripts/history.sqlite3：
+- runs：脚本名、开始时间、结果、耗时、版本、平台、模式、产物字节数、日志文件名
+- steps：各 step 类别 span 的耗时（按指纹缓存跳过的步骤标记为 cached）
+
+与 runs.jsonl（只记录结果，用于快速查询最近 N 次）不同，历史库用于跨版本的
+耗时趋势分析（见 scripts/history.py）以及按历史耗时推算命令超时（adaptive_timeout）。
+"""
+
+import math
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+HISTORY_FILE_NAME = "history.sqlite3"
+
+# 超过该条数时删除最旧的运行记录
+MAX_RUNS = 5000
+
+# 自适应超时：最近 TIMEOUT_SAMPLE_RUNS 次成功耗时的 p95 × TIMEOUT_FACTOR，
+# 样本少于 TIMEOUT_MIN_SAMPLES 时使用调用方给出的默认值
+TIMEOUT_SAMPLE_RUNS = 20
+TIMEOUT_MIN_SAMPLES = 5
+TIMEOUT_FACTOR = 3.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    script TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    result TEXT NOT NULL,
+    reason TEXT NOT NULL DEFAULT '',
+    duration REAL NOT NULL,
+    version TEXT,
+    platform TEXT,
+    mode TEXT,
+    artifact_bytes INTEGER,
+    log TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_script_started ON runs (script, started_at);
+CREATE TABLE IF NOT EXISTS steps (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    depth INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    cached INTEGER NOT NULL DEFAULT 0,
+    unfinished INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS steps_name_run ON steps (name, run_id);
+"""
+
+
+@dataclass
+class StepTiming:
+    """一次运行中某个步骤的耗时"""
+    name: str
+    duration: float
+    depth: int = 0
+    cached: bool = False
+    unfinished: bool = False
+
+
+@dataclass
+class HistoryRun:
+    """一次脚本运行的历史记录"""
+    script: str
+    started_at: str
+    result: str
+    duration: float
+    reason: str = ""
+    version: Optional[str] = None
+    platform: Optional[str] = None
+    mode: Optional[str] = None
+    artifact_bytes: Optional[int] = None
+    log: Optional[str] = None
+    steps: List[StepTiming] = field(default_factory=list)
+
+
+@dataclass
+class StepSample:
+    """查询得到的一个步骤耗时样本"""
+    run_id: int
+    started_at: str
+    version: Optional[str]
+    result: str
+    duration: float
+
+
+def get_default_history_file() -> Path:
+    """默认历史库：项目根目录/logs/scripts/history.sqlite3"""
+    return Path(__file__).parent.parent.parent / "logs" / "scripts" / HISTORY_FILE_NAME
+
+
+def connect(db_path: Optional[Path] = None) -> sqlite3.Connection:
+    """打开历史库（不存在时创建表结构）"""
+    path = db_path or get_default_history_file()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(str(path), timeout=10)
+    connection.execute("PRAGMA foreign_keys = ON")
+    connection.executescript(_SCHEMA)
+    return connection
+
+
+def record_run(run: HistoryRun, db_path: Optional[Path] = None) -> int:
+    """写入一次运行及其步骤耗时，返回运行 ID"""
+    with closing(connect(db_path)) as connection, connection:
+        cursor = connection.execute(
+            "INSERT INTO runs (script, started_at, result, reason, duration, version, platform, mode,"
+            " artifact_bytes, log) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                run.script,
+                run.started_at,
+                run.result,
+                run.reason,
+                run.duration,
+                run.version,
+                run.platform,
+                run.mode,
+                run.artifact_bytes,
+                run.log,
+            ),
+        )
+        run_id = cursor.lastrowid
+        connection.executemany(
+            "INSERT INTO steps (run_id, name, depth, duration, cached, unfinished) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (run_id, step.name, step.depth, step.duration, int(step.cached), int(step.unfinished))
+                for step in run.steps
+            ],
+        )
+        connection.execute(
+            "DELETE FROM runs WHERE id <= (SELECT id FROM runs ORDER BY id DESC LIMIT 1 OFFSET ?)",
+            (MAX_RUNS,),
+        )
+    return run_id
+
+
+def query_step_samples(
+    script: str,
+    step: Optional[str] = None,
+    platform: Optional[str] = None,
+    mode: Optional[str] = None,
+    limit: Optional[int] = None,
+    successful_only: bool = True,
+    db_path: Optional[Path] = None,
+) -> Dict[str, List[StepSample]]:
+    """按步骤名分组查询耗时样本（按时间先后排序，不含缓存跳过和未完成的步骤）
+
+    Args:
+        script: 脚本名称
+        step: 只查询该步骤，None 表示所有步骤
+        platform: 按平台过滤
+        mode: 按模式过滤（多模式构建的 mode 为逗号分隔，按包含匹配）
+        limit: 每个步骤最多返回最近的样本数
+        successful_only: 只统计成功的运行
+        db_path: 历史库路径
+
+    Returns:
+        {步骤名: 样本列表}
+    """
+    path = db_path or get_default_history_file()
+    if not path.exists():
+        return {}
+
+    conditions = ["runs.script = ?", "steps.cached = 0", "steps.unfinished = 0"]
+    params: List[object] = [script]
+    if step is not None:
+        conditions.append("steps.name = ?")
+        params.append(step)
+    if platform is not None:
+        conditions.append("runs.platform = ?")
+        params.append(platform)
+    if mode is not None:
+        conditions.append("(',' || runs.mode || ',') LIKE ?")
+        params.append(f"%,{mode},%")
+    if successful_only:
+        conditions.append("runs.result = 'SUCCESS'")
+
+    sql = (
+        "SELECT steps.name, runs.id, runs.started_at, runs.version, runs.result, steps.duration"
+        " FROM steps JOIN runs ON runs.id = steps.run_id"
+        f" WHERE {' AND '.join(conditions)} ORDER BY runs.id"
+    )
+    samples: Dict[str, List[StepSample]] = {}
+    with closing(connect(path)) as connection:
+        for name, run_id, started_at, version, result, duration in connection.execute(sql, params):
+            samples.setdefault(name, []).append(StepSample(run_id, started_at, version, result, duration))
+
+    if limit is not None:
+        samples = {name: items[-limit:] for name, items in samples.items()}
+    return samples
+
+
+def query_run_durations(
+    script: str,
+    platform: Optional[str] = None,
+    mode: Optional[str] = None,
+    limit: int = 20,
+    db_path: Optional[Path] = None,
+) -> List[float]:
+    """查询最近 limit 次成功运行的总耗时（mode 精确匹配）"""
+    path = db_path or get_default_history_file()
+    if not path.exists():
+        return []
+
+    conditions = ["script = ?", "result = 'SUCCESS'"]
+    params: List[object] = [script]
+    if platform is not None:
+        conditions.append("platform = ?")
+        params.append(platform)
+    if mode is not None:
+        conditions.append("mode = ?")
+        params.append(mode)
+    params.append(limit)
+    sql = f"SELECT duration FROM runs WHERE {' AND '.join(conditions)} ORDER BY id DESC LIMIT ?"
+    with closing(connect(path)) as connection:
+        return [row[0] for row in connection.execute(sql, params)]
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    """线性插值百分位数（values 为空时返回 0）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * percent / 100.0
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    if lower == upper:
+        return ordered[lower]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def adaptive_timeout(
+    script: str,
+    step: str,
+    default: float,
+    minimum: float = 120.0,
+    maximum: Optional[float] = None,
+    platform: Optional[str] = None,
+    mode: Optional[str] = None,
+    db_path: Optional[Path] = None,
+) -> Tuple[float, Optional[float]]:
+    """按历史耗时推算步骤超时
+
+    Args:
+        script: 脚本名称
+        step: 步骤名
+        default: 历史样本不足时的超时
+        minimum: 推算结果的下限（避免短步骤偶发变慢即超时）
+        maximum: 推算结果的上限，None 表示取 default 的 2 倍
+        platform: 按平台过滤
+        mode: 按模式过滤
+        db_path: 历史库路径
+
+    Returns:
+        (超时秒数, 历史 p95；样本不足时为 None)
+    """
+    try:
+        samples = query_step_samples(
+            script, step, platform, mode, limit=TIMEOUT_SAMPLE_RUNS, db_path=db_path
+        ).get(step, [])
+    except sqlite3.Error:
+        samples = []
+    if len(samples) < TIMEOUT_MIN_SAMPLES:
+        return default, None
+
+    p95 = percentile([sample.duration for sample in samples], 95)
+    upper = maximum if maximum is not None else default * 2
+    return min(max(p95 * TIMEOUT_FACTOR, minimum), upper), p95
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+构建产物体积分析
+
+按类别统计 Flutter 桌面产物的字节数，并按版本记录历史，用于发现体积回归：
+- engine：Flutter 引擎（libflutter_*.so / flutter_windows.dll / FlutterMacOS.framework、icudtl.dat）
+- aot：Dart AOT 快照（libapp.so / app.so / App.framework）
+- flutter_assets：资源目录（字体、图片、NOTICES 等）
+- native_plugins：其他原生库（sqlite3 等插件）
+- runner：可执行文件本体
+- other：其余文件
+
+历史记录位于 logs/build_metrics/size_history.json，按 (版本, 平台, 模式) 唯一。
+
+使用示例：
+```bash
+python scripts/lib/bundle_size.py build/linux/x64/release/bundle
+```
+"""
+
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from version_manager import parse_version
+
+CATEGORIES = ("engine", "aot", "flutter_assets", "native_plugins", "runner", "other")
+HISTORY_FORMAT_VERSION = 1
+
+# 类别增长低于该字节数时不视为回归，避免小类别的百分比噪音
+MIN_REGRESSION_BYTES = 256 * 1024
+
+_NATIVE_SUFFIXES = (".so", ".dll", ".dylib")
+_ENGINE_NAMES = ("libflutter_linux_gtk.so", "flutter_windows.dll", "icudtl.dat")
+_AOT_NAMES = ("libapp.so", "app.so")
+
+
+@dataclass
+class SizeReport:
+    """一次产物体积统计"""
+    total_bytes: int
+    categories: Dict[str, int]
+    file_count: int
+
+
+@dataclass
+class SizeRegression:
+    """相对上一个版本的类别体积变化"""
+    category: str
+    previous_bytes: int
+    current_bytes: int
+    previous_version: str
+
+    @property
+    def growth_percent(self) -> float:
+        if self.previous_bytes == 0:
+            return float("inf") if self.current_bytes else 0.0
+        return (self.current_bytes - self.previous_bytes) * 100.0 / self.previous_bytes
+
+
+@dataclass
+class SizeComparison:
+    """与上一个版本的比较结果"""
+    previous_version: Optional[str]
+    regressions: List[SizeRegression] = field(default_factory=list)
+
+
+def classify(relative_path: str, app_name: str) -> str:
+    """根据产物内的相对路径判断类别"""
+    parts = relative_path.split("/")
+    name = parts[-1]
+
+    if "flutter_assets" in parts:
+        return "flutter_assets"
+    if "FlutterMacOS.framework" in parts or name in _ENGINE_NAMES:
+        return "engine"
+    if "App.framework" in parts or name in _AOT_NAMES:
+        return "aot"
+    if any(part.endswith(".framework") for part in parts) or name.lower().endswith(_NATIVE_SUFFIXES):
+        return "native_plugins"
+    if name in (app_name, f"{app_name}.exe"):
+        return "runner"
+    return "other"
+
+
+def analyze_bundle(output_path: Path, app_name: str = "SvnAutoMerge") -> SizeReport:
+    """统计产物目录各类别字节数"""
+    categories = {category: 0 for category in CATEGORIES}
+    file_count = 0
+
+    if output_path.is_file():
+        size = output_path.stat().st_size
+        categories[classify(output_path.name, app_name)] += size
+        return SizeReport(size, categories, 1)
+
+    for dir_path, _dir_names, file_names in os.walk(output_path):
+        for file_name in file_names:
+            file_path = Path(dir_path) / file_name
+            if file_path.is_symlink():
+                continue
+            relative = file_path.relative_to(output_path).as_posix()
+            categories[classify(relative, app_name)] += file_path.stat().st_size
+            file_count += 1
+
+    return SizeReport(sum(categories.values()), categories, file_count)
+
+
+def get_default_history_file() -> Path:
+    """默认历史文件：项目根目录/logs/build_metrics/size_history.json"""
+    return Path(__file__).parent.parent.parent / "logs" / "build_metrics" / "size_history.json"
+
+
+class SizeHistory:
+    """按版本记录的产物体积历史"""
+
+    def __init__(self, history_file: Optional[Path] = None):
+        self.history_file = history_file or get_default_history_file()
+        self.records: List[Dict] = []
+        try:
+            data = json.loads(self.history_file.read_text(encoding="utf-8"))
+            if data.get("version") == HISTORY_FORMAT_VERSION:
+                self.records = list(data.get("records", []))
+        except (OSError, ValueError):
+            pass
+
+    def previous(self, version: str, platform: str, mode: str) -> Optional[Dict]:
+        """同平台同模式、低于当前版本的最高版本记录
+
+        重新构建旧版本（如 hotfix 分支）时不会拿更新的版本作比较；
+        版本号无法解析时退回到最近一条其他版本的记录。
+        """
+        candidates = [
+            record for record in self.records
+            if record["platform"] == platform and record["mode"] == mode and record["app_version"] != version
+        ]
+        if not candidates:
+            return None
+        try:
+            current = parse_version(version)
+            keyed = [(parse_version(record["app_version"]), record) for record in candidates]
+        except ValueError:
+            return candidates[-1]
+        older = [item for item in keyed if item[0] < current]
+        if not older:
+            return None
+        return max(older, key=lambda item: item[0])[1]
+
+    def record(self, version: str, platform: str, mode: str, report: SizeReport):
+        """记录（或覆盖同版本的）体积统计，并写回文件"""
+        self.records = [
+            item for item in self.records
+            if not (item["app_version"] == version and item["platform"] == platform and item["mode"] == mode)
+        ]
+        self.records.append({
+            "app_version": version,
+            "platform": platform,
+            "mode": mode,
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+            "total_bytes": report.total_bytes,
+            "file_count": report.file_count,
+            "categories": report.categories,
+        })
+        self.history_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.history_file.with_name(f"{self.history_file.name}.{os.getpid()}.tmp")
+        temp_file.write_text(
+            json.dumps({"version": HISTORY_FORMAT_VERSION, "records": self.records}, ensure_ascii=False, indent=2),
+            encoding="utf-8",
+        )
+        os.replace(temp_file, self.history_file)
+
+
+def compare_with_previous(
+    history: SizeHistory,
+    version: str,
+    platform: str,
+    mode: str,
+    report: SizeReport,
+    threshold_percent: float,
+) -> SizeComparison:
+    """找出相对上一个版本增长超过阈值的类别（含总量，类别名为 total）"""
+    previous = history.previous(version, platform, mode)
+    if previous is None:
+        return SizeComparison(previous_version=None)
+
+    comparison = SizeComparison(previous_version=previous["app_version"])
+    current = dict(report.categories, total=report.total_bytes)
+    before = dict(previous.get("categories", {}), total=previous.get("total_bytes", 0))
+    for category, current_bytes in current.items():
+        previous_bytes = before.get(category, 0)
+        growth = current_bytes - previous_bytes
+        if growth < MIN_REGRESSION_BYTES:
+            continue
+        regression = SizeRegression(category, previous_bytes, current_bytes, previous["app_version"])
+        if regression.growth_percent > threshold_percent:
+            comparison.regressions.append(regression)
+    return comparison
+
+
+def format_bytes(size: int) -> str:
+    """格式化字节数"""
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f} MB"
+    return f"{size / 1024:.1f} KB"
+
+
+def main() -> int:
+    """命令行入口：输出产物体积分类统计"""
+    if len(sys.argv) != 2:
+        print("用法: python bundle_size.py <构建产物目录>", file=sys.stderr)
+        return 1
+    output_path = Path(sys.argv[1])
+    if not output_path.exists():
+        print(f"产物不存在: {output_path}", file=sys.stderr)
+        return 1
+
+    report = analyze_bundle(output_path)
+    print(f"产物: {output_path}（{report.file_count} 个文件，共 {format_bytes(report.total_bytes)}）")
+    for category in CATEGORIES:
+        size = report.categories[category]
+        share = size * 100.0 / report.total_bytes if report.total_bytes else 0.0
+        print(f"  {category:<15} {format_bytes(size):>10}  {share:5.1f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
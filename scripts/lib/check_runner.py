@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+带依赖关系的并发检查执行器
+
+verify_build.py 使用：每项检查声明它依赖的检查，依赖全部完成后即可开始，
+相互独立的检查（CMake 查找、flutter doctor、flutter devices、dry-run 构建等）并发执行。
+
+- 依赖失败（status=fail）的检查标记为 skipped，不再执行
+- 声明了 cache_key / fingerprint 的检查，输入指纹与上次成功时一致且 outputs 仍存在时
+  直接沿用上次结果（指纹记录在 build_fingerprint.FingerprintCache 中，与 build.py /
+  deploy.py 共用，例如 pub_get）
+- 每项检查记录开始时间（相对执行器启动）和耗时，report() 生成可序列化的报告
+
+使用示例：
+```python
+runner = CheckRunner([
+    Check("flutter", "检查 Flutter", check_flutter),
+    Check("pub_get", "获取依赖", run_pub_get, deps=["flutter"], cache_key="pub_get", fingerprint=pub_digest),
+])
+results = runner.run(on_result=print_result)
+report = runner.report()
+```
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from build_fingerprint import FingerprintCache
+
+STATUS_OK = "ok"
+STATUS_WARN = "warn"
+STATUS_FAIL = "fail"
+STATUS_SKIPPED = "skipped"
+
+
+@dataclass
+class CheckOutcome:
+    """检查函数的返回值"""
+    status: str
+    message: str
+    details: List[str] = field(default_factory=list)
+    cached: bool = False
+
+
+@dataclass
+class Check:
+    """一项检查
+
+    Attributes:
+        name: 唯一名称（依赖、报告中引用）
+        description: 显示名称
+        run: 执行检查，返回 CheckOutcome；抛出异常视为 fail
+        deps: 依赖的检查名称
+        cache_key: 指纹缓存中的步骤名，None 表示不缓存
+        fingerprint: 计算输入指纹（执行成功后会重新计算一次再记录，以包含检查本身对输入的修改）
+        outputs: 沿用缓存结果时必须存在的产物
+    """
+    name: str
+    description: str
+    run: Callable[[], CheckOutcome]
+    deps: Sequence[str] = ()
+    cache_key: Optional[str] = None
+    fingerprint: Optional[Callable[[], str]] = None
+    outputs: Callable[[], List[Path]] = lambda: []
+
+
+@dataclass
+class CheckResult:
+    """一项检查的结果"""
+    name: str
+    description: str
+    status: str
+    message: str
+    details: List[str]
+    deps: List[str]
+    started: float
+    duration: float
+    cached: bool
+
+
+class CheckRunner:
+    """按依赖关系并发执行检查"""
+
+    def __init__(
+        self,
+        checks: Sequence[Check],
+        cache: Optional[FingerprintCache] = None,
+        max_workers: int = 4,
+    ):
+        """初始化
+
+        Args:
+            checks: 检查列表（报告按此顺序输出）
+            cache: 指纹缓存，None 表示不沿用也不记录结果
+            max_workers: 最大并发数
+
+        Raises:
+            ValueError: 名称重复、依赖不存在或存在循环依赖
+        """
+        self.checks = list(checks)
+        self.cache = cache
+        self.max_workers = max_workers
+        self.results: Dict[str, CheckResult] = {}
+        self.started_at: Optional[datetime] = None
+        self.duration = 0.0
+        self._cache_lock = threading.Lock()
+        self._validate()
+
+    def _validate(self):
+        names = [check.name for check in self.checks]
+        if len(set(names)) != len(names):
+            raise ValueError("检查名称重复")
+        by_name = {check.name: check for check in self.checks}
+        for check in self.checks:
+            for dep in check.deps:
+                if dep not in by_name:
+                    raise ValueError(f"检查 {check.name} 依赖不存在的检查: {dep}")
+
+        # 深度优先检测循环依赖
+        state: Dict[str, int] = {}
+
+        def visit(name: str, path: List[str]):
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"存在循环依赖: {' -> '.join(path + [name])}")
+            state[name] = 1
+            for dep in by_name[name].deps:
+                visit(dep, path + [name])
+            state[name] = 2
+
+        for name in names:
+            visit(name, [])
+
+    def run(self, on_result: Optional[Callable[[CheckResult], None]] = None) -> List[CheckResult]:
+        """执行全部检查，返回按声明顺序排列的结果
+
+        Args:
+            on_result: 每项检查完成时在主线程中回调（按完成顺序）
+        """
+        self.started_at = datetime.now()
+        origin = time.monotonic()
+        pending = list(self.checks)
+        running: Dict[Future, Check] = {}
+
+        def finish(result: CheckResult):
+            self.results[result.name] = result
+            if on_result:
+                on_result(result)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="check") as executor:
+            while pending or running:
+                for check in list(pending):
+                    dep_results = [self.results.get(dep) for dep in check.deps]
+                    if any(result is None for result in dep_results):
+                        continue
+                    pending.remove(check)
+                    failed = [result.name for result in dep_results if result.status in (STATUS_FAIL, STATUS_SKIPPED)]
+                    if failed:
+                        finish(
+                            CheckResult(
+                                check.name,
+                                check.description,
+                                STATUS_SKIPPED,
+                                f"依赖未通过: {', '.join(failed)}",
+                                [],
+                                list(check.deps),
+                                round(time.monotonic() - origin, 3),
+                                0.0,
+                                False,
+                            )
+                        )
+                        continue
+                    running[executor.submit(self._execute, check, origin)] = check
+
+                if not running:
+                    continue
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    running.pop(future)
+                    finish(future.result())
+
+        self.duration = time.monotonic() - origin
+        if self.cache is not None:
+            self.cache.save()
+        return [self.results[check.name] for check in self.checks]
+
+    def _execute(self, check: Check, origin: float) -> CheckResult:
+        started = time.monotonic()
+        cacheable = self.cache is not None and check.cache_key is not None and check.fingerprint is not None
+        try:
+            digest = self._fingerprint(check) if cacheable else None
+            if digest is not None and self._is_fresh(check, digest):
+                outcome = CheckOutcome(STATUS_OK, "输入未变化，沿用上次成功结果", cached=True)
+            else:
+                outcome = check.run()
+                if digest is not None and outcome.status == STATUS_OK:
+                    self._record(check, self._fingerprint(check))
+        except Exception as e:
+            outcome = CheckOutcome(STATUS_FAIL, f"检查异常: {e}")
+        return CheckResult(
+            check.name,
+            check.description,
+            outcome.status,
+            outcome.message,
+            list(outcome.details),
+            list(check.deps),
+            round(started - origin, 3),
+            round(time.monotonic() - started, 3),
+            outcome.cached,
+        )
+
+    def _fingerprint(self, check: Check) -> str:
+        # 指纹计算会更新缓存中的文件哈希表，与记录操作一起串行化
+        with self._cache_lock:
+            return check.fingerprint()
+
+    def _is_fresh(self, check: Check, digest: str) -> bool:
+        with self._cache_lock:
+            return self.cache.is_fresh(check.cache_key, digest, check.outputs())
+
+    def _record(self, check: Check, digest: str):
+        with self._cache_lock:
+            self.cache.record(check.cache_key, digest)
+
+    @property
+    def failed(self) -> bool:
+        """是否有检查失败"""
+        return any(result.status == STATUS_FAIL for result in self.results.values())
+
+    def report(self) -> Dict[str, Any]:
+        """可序列化为 JSON 的执行报告"""
+        results = [self.results[check.name] for check in self.checks if check.name in self.results]
+        return {
+            "started_at": self.started_at.isoformat(timespec="seconds") if self.started_at else None,
+            "duration": round(self.duration, 3),
+            "serial_duration": round(sum(result.duration for result in results), 3),
+            "result": STATUS_FAIL if self.failed else STATUS_OK,
+            "checks": [asdict(result) for result in results],
+        }
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日志收集清单（增量收集）
+
+collect_logs.py 每次收集后把各日志文件的收集进度写入 logs/collect_manifest.json：
+路径、大小、mtime、文件头部的 SHA-256（head_sha256 / head_length）以及已收集到的字节偏移。
+
+--incremental 时：
+- 大小和 mtime 都没变的文件直接跳过（归档的 app_*.log 不再变化，只收集一次）
+- 文件头部与清单一致且变大了（latest.log 追加写入）：只收集 [offset, size) 这一段
+- 应用启动时 latest.log 会被改名为 app_<时间>.log：新路径按头部哈希匹配到旧记录，
+  同样只收集改名前尚未收集的尾部
+- 头部不一致或文件变小（已轮转/被截断）：完整收集
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+MANIFEST_FILE_NAME = "collect_manifest.json"
+MANIFEST_FORMAT_VERSION = 1
+
+# 用于识别"同一个文件"的头部字节数（latest.log 的头部含创建时间 header）
+HEAD_BYTES = 64 * 1024
+
+
+@dataclass
+class CollectPlan:
+    """某个文件本次需要收集的字节范围"""
+    path: Path
+    offset: int
+    end: int
+    mtime_ns: int
+    head_sha256: str
+    head_length: int
+
+    @property
+    def length(self) -> int:
+        return self.end - self.offset
+
+    @property
+    def is_partial(self) -> bool:
+        return self.offset > 0
+
+
+def hash_head(path: Path, length: int) -> str:
+    """文件前 length 字节的 SHA-256"""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read(length)).hexdigest()
+
+
+class CollectManifest:
+    """收集清单"""
+
+    def __init__(self, manifest_file: Path):
+        self.manifest_file = manifest_file
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    def _load(self):
+        try:
+            data = json.loads(self.manifest_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") == MANIFEST_FORMAT_VERSION:
+            self.entries = data.get("files", {})
+
+    def save(self):
+        """原子写入清单（去掉已不存在的文件）"""
+        self.entries = {path: entry for path, entry in self.entries.items() if Path(path).exists()}
+        self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.manifest_file.with_name(f"{self.manifest_file.name}.{os.getpid()}.tmp")
+        temp_file.write_text(
+            json.dumps({"version": MANIFEST_FORMAT_VERSION, "files": self.entries}, ensure_ascii=False, indent=2),
+            encoding="utf-8",
+        )
+        os.replace(temp_file, self.manifest_file)
+
+    def _find_previous(self, path: Path, size: int) -> Optional[Dict[str, Any]]:
+        """按路径查找记录；路径没有记录时按头部哈希查找（latest.log 被改名归档的情况）"""
+        entry = self.entries.get(str(path))
+        if entry is not None:
+            return entry
+        head_hashes: Dict[int, str] = {}
+        for candidate in self.entries.values():
+            head_length = candidate.get("head_length", 0)
+            if 0 < head_length <= size and candidate.get("offset", 0) <= size:
+                if head_length not in head_hashes:
+                    head_hashes[head_length] = hash_head(path, head_length)
+                if head_hashes[head_length] == candidate.get("head_sha256"):
+                    return candidate
+        return None
+
+    def plan(self, path: Path, incremental: bool) -> Optional[CollectPlan]:
+        """计算本次收集范围，没有新内容时返回 None"""
+        stat = path.stat()
+        size = stat.st_size
+        head_length = min(size, HEAD_BYTES)
+        offset = 0
+        if incremental:
+            entry = self.entries.get(str(path))
+            if entry is not None and entry.get("size") == size and entry.get("mtime_ns") == stat.st_mtime_ns:
+                return None
+            previous = self._find_previous(path, size)
+            if previous is not None:
+                previous_head = previous.get("head_length", 0)
+                if (
+                    previous.get("offset", 0) <= size
+                    and 0 < previous_head <= size
+                    and hash_head(path, previous_head) == previous.get("head_sha256")
+                ):
+                    offset = previous["offset"]
+            if offset >= size:
+                self.record(CollectPlan(path, offset, size, stat.st_mtime_ns, hash_head(path, head_length), head_length))
+                return None
+        return CollectPlan(path, offset, size, stat.st_mtime_ns, hash_head(path, head_length), head_length)
+
+    def record(self, plan: CollectPlan):
+        """记录文件已收集到 plan.end"""
+        self.entries[str(plan.path)] = {
+            "size": plan.end,
+            "mtime_ns": plan.mtime_ns,
+            "head_sha256": plan.head_sha256,
+            "head_length": plan.head_length,
+            "offset": plan.end,
+        }
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令输出流式采集工具
+
+子进程的 stdout/stderr 合并后按行实时读取：
+- 每行立即回调（通常写入脚本日志），命令运行期间日志即可看到进度
+- 完整输出写入 gzip 压缩的旁路文件，便于事后排查
+- 内存中只保留有界的头部/尾部行（HeadTailBuffer），
+  长输出末尾的错误信息不会因为截断而丢失
+- 可选的停滞检测：连续 stall_seconds 秒没有任何输出时终止整个进程树，
+  卡住的 pub get 等命令不必等到总超时
+"""
+
+import gzip
+import os
+import queue
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Deque, List, Optional, Union
+
+
+class HeadTailBuffer:
+    """保留前 head_size 行和最后 tail_size 行的有界缓冲区"""
+
+    def __init__(self, head_size: int = 100, tail_size: int = 100):
+        self.head_size = head_size
+        self.tail_size = tail_size
+        self.head: List[str] = []
+        self.tail: Deque[str] = deque(maxlen=tail_size)
+        self.total_lines = 0
+
+    def append(self, line: str):
+        """追加一行"""
+        self.total_lines += 1
+        if len(self.head) < self.head_size:
+            self.head.append(line)
+        else:
+            self.tail.append(line)
+
+    @property
+    def omitted_lines(self) -> int:
+        """头尾之间被丢弃的行数"""
+        return self.total_lines - len(self.head) - len(self.tail)
+
+    def lines(self) -> List[str]:
+        """返回保留的全部行（头部 + 尾部）"""
+        return self.head + list(self.tail)
+
+    def last_lines(self, count: int) -> List[str]:
+        """返回最后 count 行（尾部不足时从头部补齐）"""
+        return self.lines()[-count:] if count > 0 else []
+
+    def text(self) -> str:
+        """以文本形式返回保留的行"""
+        return "\n".join(self.lines())
+
+
+@dataclass
+class StreamResult:
+    """流式执行结果"""
+    returncode: int
+    output: HeadTailBuffer
+    spill_file: Optional[Path]
+    duration: float
+
+
+class CommandStalled(subprocess.TimeoutExpired):
+    """命令连续 stall_seconds 秒没有输出，已被终止"""
+
+    def __init__(self, cmd, stall_seconds: float, elapsed: float, output: HeadTailBuffer):
+        super().__init__(cmd, elapsed, output=output.text())
+        self.stall_seconds = stall_seconds
+        self.buffer = output
+
+    def __str__(self):
+        return (
+            f"命令 {self.stall_seconds:.0f} 秒没有输出，判定为停滞"
+            f"（已运行 {self.timeout:.0f} 秒）"
+        )
+
+
+_EOF = object()
+
+
+def _pump_lines(stream, lines: "queue.Queue[object]"):
+    """后台线程：逐行读取子进程输出"""
+    try:
+        for line in stream:
+            lines.put(line.rstrip("\r\n"))
+    except Exception:
+        pass
+    finally:
+        lines.put(_EOF)
+
+
+def _kill_process_tree(process: subprocess.Popen):
+    """终止进程及其子进程（flutter 会派生 dart 等子进程，只杀父进程会残留）"""
+    if process.poll() is not None:
+        return
+    try:
+        if os.name == "nt":
+            subprocess.run(
+                ["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check=False,
+            )
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except OSError:
+        pass
+    if process.poll() is None:
+        process.kill()
+    process.wait()
+
+
+def stream_command(
+    command: Union[List[str], str],
+    cwd: Path,
+    timeout_seconds: Optional[float],
+    on_line: Optional[Callable[[str], None]] = None,
+    spill_file: Optional[Path] = None,
+    shell: bool = False,
+    head_size: int = 100,
+    tail_size: int = 100,
+    stall_seconds: Optional[float] = None,
+) -> StreamResult:
+    """流式执行命令
+
+    Args:
+        command: 命令（列表或 shell 字符串）
+        cwd: 工作目录
+        timeout_seconds: 总超时秒数，None 表示不限
+        on_line: 每读取一行调用一次
+        spill_file: 完整输出的 gzip 旁路文件路径，None 表示不落盘
+        shell: 是否通过 shell 执行
+        head_size: 内存中保留的头部行数
+        tail_size: 内存中保留的尾部行数
+        stall_seconds: 连续多少秒没有输出视为停滞，None 或 0 表示不检测
+
+    Returns:
+        StreamResult
+
+    Raises:
+        CommandStalled: 输出停滞（进程树已被终止）
+        subprocess.TimeoutExpired: 超时（进程树已被终止）
+    """
+    start = time.monotonic()
+    buffer = HeadTailBuffer(head_size=head_size, tail_size=tail_size)
+    spill = None
+    if spill_file is not None:
+        spill_file.parent.mkdir(parents=True, exist_ok=True)
+        spill = gzip.open(spill_file, "wt", encoding="utf-8", compresslevel=6)
+
+    process = subprocess.Popen(
+        command,
+        cwd=str(cwd),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        stdin=subprocess.DEVNULL,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        bufsize=1,
+        shell=shell,
+        # 独立进程组，超时/停滞时可以终止整个进程树
+        start_new_session=os.name != "nt",
+    )
+    lines: "queue.Queue[object]" = queue.Queue()
+    reader = threading.Thread(target=_pump_lines, args=(process.stdout, lines), daemon=True)
+    reader.start()
+
+    deadline = start + timeout_seconds if timeout_seconds else None
+    last_output = start
+    try:
+        while True:
+            wait = 0.5
+            if deadline is not None:
+                wait = min(wait, max(0.0, deadline - time.monotonic()))
+            try:
+                item = lines.get(timeout=wait)
+            except queue.Empty:
+                item = None
+
+            if item is _EOF:
+                break
+            now = time.monotonic()
+            if isinstance(item, str):
+                last_output = now
+                buffer.append(item)
+                if spill is not None:
+                    spill.write(item + "\n")
+                if on_line is not None:
+                    on_line(item)
+
+            if deadline is not None and now >= deadline:
+                _kill_process_tree(process)
+                raise subprocess.TimeoutExpired(
+                    command, timeout_seconds, output=buffer.text()
+                )
+            if stall_seconds and now - last_output >= stall_seconds:
+                _kill_process_tree(process)
+                raise CommandStalled(command, stall_seconds, now - start, buffer)
+
+        returncode = process.wait()
+    finally:
+        _kill_process_tree(process)
+        if process.stdout is not None:
+            process.stdout.close()
+        if spill is not None:
+            spill.close()
+            # 没有任何输出时不保留空的旁路文件
+            if buffer.total_lines == 0 and spill_file is not None:
+                spill_file.unlink(missing_ok=True)
+                spill_file = None
+
+    return StreamResult(
+        returncode=returncode,
+        output=buffer,
+        spill_file=spill_file,
+        duration=time.monotonic() - start,
+    )
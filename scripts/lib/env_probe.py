@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+构建环境探测（并发执行 + TTL 缓存）
+
+deploy.py / verify_build.py 共用：
+- 命令查找在进程内完成（shutil.which），不再启动 which / where.exe 子进程
+- 相互独立的探测（flutter --version、flutter devices、flutter doctor 等）并发执行，
+  每次 Flutter 调用都要启动 Dart VM，串行执行会累积数秒到数十秒
+- 成功的探测结果写入 scripts/temp/env_probe_cache.json，按 TTL 过期；
+  缓存键包含 PATH 和 Flutter SDK 版本文件的 mtime，切换或升级 SDK 后自动失效
+
+使用示例：
+```python
+probe = EnvProbe()
+probe.start(["flutter_version", "devices"])   # 后台并发执行
+version = probe.get("flutter_version")        # 等待结果（命中缓存时立即返回）
+devices = probe.get("devices")
+```
+"""
+
+import hashlib
+import json
+import os
+import platform
+import shutil
+import signal
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+CACHE_FILE = Path(__file__).parent.parent / "temp" / "env_probe_cache.json"
+CACHE_FORMAT_VERSION = 1
+
+# 各探测结果的有效期（秒）
+PROBE_TTL = {
+    "flutter_version": 24 * 3600,
+    "doctor": 3600,
+    "devices": 600,
+    "cmake": 24 * 3600,
+}
+
+
+@dataclass
+class ProbeResult:
+    """一次探测的结果"""
+    name: str
+    value: Any
+    ok: bool
+    cached: bool
+    duration: float
+
+
+def which(command: str) -> Optional[str]:
+    """在 PATH 中查找命令（Windows 下 flutter 优先使用 .bat 入口）"""
+    path = shutil.which(command)
+    if path and platform.system() == "Windows" and path.lower().endswith(".exe"):
+        batch = Path(path).with_suffix(".bat")
+        if batch.exists():
+            return str(batch)
+    return path
+
+
+def flutter_sdk_stamp(flutter_path: Optional[str]) -> str:
+    """Flutter SDK 版本文件的 mtime（SDK 升级或切换后变化）"""
+    if not flutter_path:
+        return ""
+    sdk_root = Path(flutter_path).resolve().parent.parent
+    for candidate in (sdk_root / "bin" / "cache" / "flutter.version.json", sdk_root / "version", sdk_root):
+        try:
+            return f"{candidate}:{candidate.stat().st_mtime_ns}"
+        except OSError:
+            continue
+    return ""
+
+
+def _start_tool(command: List[str]) -> subprocess.Popen:
+    """启动工具命令（Windows 下 .bat/.cmd 通过 shell 执行），放在独立进程组中便于整体结束"""
+    use_shell = os.name == "nt" and Path(command[0]).suffix.lower() in (".bat", ".cmd")
+    kwargs: Dict[str, Any] = {}
+    if os.name == "nt":
+        kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    return subprocess.Popen(
+        subprocess.list2cmdline(command) if use_shell else command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        shell=use_shell,
+        **kwargs,
+    )
+
+
+def _kill_tool(process: subprocess.Popen):
+    """强制结束工具进程及其子进程（flutter 脚本会再启动 Dart VM）"""
+    if process.poll() is not None:
+        return
+    try:
+        if os.name == "nt":
+            subprocess.run(
+                ["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check=False,
+            )
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except OSError:
+        process.kill()
+
+
+def _wait_tool(process: subprocess.Popen, timeout: float) -> subprocess.CompletedProcess:
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except BaseException:
+        # 超时或 Ctrl+C：独立进程组收不到终端的中断信号，需要主动结束
+        _kill_tool(process)
+        process.communicate()
+        raise
+    return subprocess.CompletedProcess(process.args, process.returncode, stdout, stderr)
+
+
+def run_tool(command: List[str], timeout: float) -> subprocess.CompletedProcess:
+    """执行工具命令并捕获输出（Windows 下 .bat/.cmd 通过 shell 执行）"""
+    return _wait_tool(_start_tool(command), timeout)
+
+
+def parse_devices(output: str) -> List[Dict[str, Any]]:
+    """解析 flutter devices --machine 的输出（JSON 数组之前可能有提示行）"""
+    start = output.find("[")
+    if start < 0:
+        return []
+    try:
+        devices = json.loads(output[start:])
+    except ValueError:
+        return [{"id": None} for _ in range(output.count('"deviceId"'))]
+    return [
+        {
+            "id": device.get("id"),
+            "name": device.get("name"),
+            "targetPlatform": device.get("targetPlatform"),
+        }
+        for device in devices
+        if isinstance(device, dict)
+    ]
+
+
+class EnvProbe:
+    """环境探测器"""
+
+    def __init__(self, use_cache: bool = True, cache_file: Optional[Path] = None, max_workers: int = 4):
+        """初始化
+
+        Args:
+            use_cache: 是否读取缓存（为 False 时仍写入新结果）
+            cache_file: 缓存文件路径
+            max_workers: 并发探测数
+        """
+        self.use_cache = use_cache
+        self.cache_file = cache_file or CACHE_FILE
+        self.flutter_path = which("flutter")
+        self._cache_key = hashlib.sha256(
+            (os.environ.get("PATH", "") + "\0" + flutter_sdk_stamp(self.flutter_path)).encode("utf-8")
+        ).hexdigest()[:16]
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="probe")
+        self._futures: Dict[str, Future] = {}
+        self._cache_lock = threading.Lock()
+        self._process_lock = threading.Lock()
+        self._processes: List[subprocess.Popen] = []
+        self._cancelled = False
+        self._probes: Dict[str, Callable[[], Any]] = {
+            "flutter_version": self._probe_flutter_version,
+            "doctor": self._probe_doctor,
+            "devices": self._probe_devices,
+            "cmake": lambda: which("cmake"),
+        }
+
+    def start(self, names: Iterable[str]):
+        """在后台并发启动探测（已启动的不重复执行）"""
+        for name in names:
+            if name not in self._futures:
+                self._futures[name] = self._executor.submit(self._run, name)
+
+    def get(self, name: str) -> ProbeResult:
+        """获取探测结果（未启动时立即启动并等待）"""
+        self.start([name])
+        return self._futures[name].result()
+
+    def shutdown(self, cancel: bool = False):
+        """释放后台线程
+
+        Args:
+            cancel: 为 True 时取消尚未开始的探测并结束正在运行的探测命令，
+                出错提前退出时不必等待用不到的结果（如 flutter devices）；否则等待全部探测完成
+        """
+        if cancel:
+            with self._process_lock:
+                self._cancelled = True
+                processes = list(self._processes)
+            for future in self._futures.values():
+                future.cancel()
+            for process in processes:
+                _kill_tool(process)
+        self._executor.shutdown(wait=True)
+
+    def _run_tool(self, command: List[str], timeout: float) -> subprocess.CompletedProcess:
+        """执行探测命令，登记进程以便 shutdown(cancel=True) 时结束"""
+        with self._process_lock:
+            if self._cancelled:
+                raise RuntimeError("环境探测已取消")
+            process = _start_tool(command)
+            self._processes.append(process)
+        try:
+            return _wait_tool(process, timeout)
+        finally:
+            with self._process_lock:
+                self._processes.remove(process)
+
+    def _run(self, name: str) -> ProbeResult:
+        start = time.monotonic()
+        if self.use_cache:
+            cached = self._read_cache(name)
+            if cached is not None:
+                return ProbeResult(name, cached, True, True, time.monotonic() - start)
+
+        try:
+            value = self._probes[name]()
+        except Exception:
+            value = None
+        ok = value is not None
+        if ok:
+            self._write_cache(name, value)
+        return ProbeResult(name, value, ok, False, time.monotonic() - start)
+
+    def _probe_flutter_version(self) -> Optional[str]:
+        if not self.flutter_path:
+            return None
+        result = self._run_tool([self.flutter_path, "--version"], timeout=60)
+        if result.returncode != 0:
+            return None
+        return result.stdout.split("\n")[0].strip()
+
+    def _probe_doctor(self) -> Optional[Dict[str, Any]]:
+        if not self.flutter_path:
+            return None
+        result = self._run_tool([self.flutter_path, "doctor"], timeout=180)
+        issues = [line.strip() for line in result.stdout.splitlines() if line.lstrip().startswith(("[✗]", "[!]"))]
+        return {"returncode": result.returncode, "issues": issues}
+
+    def _probe_devices(self) -> Optional[List[Dict[str, Any]]]:
+        if not self.flutter_path:
+            return None
+        result = self._run_tool([self.flutter_path, "devices", "--machine"], timeout=60)
+        if result.returncode != 0:
+            return None
+        return parse_devices(result.stdout)
+
+    def _load_cache(self) -> Dict[str, Any]:
+        try:
+            data = json.loads(self.cache_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != CACHE_FORMAT_VERSION:
+            return {}
+        return data.get("entries", {})
+
+    def _read_cache(self, name: str) -> Any:
+        entry = self._load_cache().get(f"{self._cache_key}:{name}")
+        if not entry or entry.get("expires", 0) < time.time():
+            return None
+        return entry.get("value")
+
+    def _write_cache(self, name: str, value: Any):
+        """合并写入缓存（只保留未过期条目，原子替换）"""
+        with self._cache_lock:
+            now = time.time()
+            entries = {
+                key: entry for key, entry in self._load_cache().items() if entry.get("expires", 0) >= now
+            }
+            entries[f"{self._cache_key}:{name}"] = {"value": value, "expires": now + PROBE_TTL.get(name, 600)}
+            try:
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+                temp_file = self.cache_file.with_name(f"{self.cache_file.name}.{os.getpid()}.tmp")
+                temp_file.write_text(
+                    json.dumps({"version": CACHE_FORMAT_VERSION, "entries": entries}, ensure_ascii=False),
+                    encoding="utf-8",
+                )
+                os.replace(temp_file, self.cache_file)
+            except OSError:
+                pass
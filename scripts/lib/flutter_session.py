@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+flutter run --machine 常驻会话
+
+deploy.py --session 使用：第一次部署时在后台启动一个会话宿主进程，
+由它运行 `flutter run -d <平台> --machine` 并保持 stdin 打开；之后的部署
+通过本机 TCP 连接请求宿主发送 app.restart（热重启），不必重新构建。
+
+- 会话信息写入 scripts/temp/flutter_session.json（端口、令牌、设备、输入指纹等）
+- 宿主输出（flutter run 的全部输出）写入 scripts/temp/flutter_session.log
+- flutter run 进程退出（应用被关闭）时宿主随之退出并删除会话文件
+
+协议：客户端发送一行 JSON {"token": ..., "command": "status" | "restart" | "stop"}，
+宿主回复一行 JSON {"ok": bool, ...}。
+
+使用示例：
+```python
+session = load_session()
+if session and session.get("device") == "linux":
+    reply = send_request(session, "restart")
+else:
+    session = start_session(project_root, flutter_cmd, "linux", inputs_digest="...")
+```
+"""
+
+import argparse
+import json
+import os
+import secrets
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+SESSION_DIR = Path(__file__).parent.parent / "temp"
+SESSION_FILE = SESSION_DIR / "flutter_session.json"
+SESSION_LOG_FILE = SESSION_DIR / "flutter_session.log"
+
+# 等待 app.restart 响应的秒数
+RESTART_TIMEOUT = 120
+
+
+class SessionError(Exception):
+    """会话请求失败"""
+
+
+def load_session() -> Optional[Dict[str, Any]]:
+    """读取会话文件（不存在或损坏时返回 None）"""
+    try:
+        return json.loads(SESSION_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _write_session(data: Dict[str, Any]):
+    SESSION_DIR.mkdir(parents=True, exist_ok=True)
+    temp_file = SESSION_FILE.with_name(f"{SESSION_FILE.name}.{os.getpid()}.tmp")
+    temp_file.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(temp_file, SESSION_FILE)
+
+
+def _remove_session(pid: int):
+    """只删除本进程写入的会话文件（避免误删新会话）"""
+    session = load_session()
+    if session and session.get("pid") == pid:
+        SESSION_FILE.unlink(missing_ok=True)
+
+
+def send_request(session: Dict[str, Any], command: str, timeout: float = 10.0) -> Dict[str, Any]:
+    """向会话宿主发送请求
+
+    Raises:
+        SessionError: 宿主不可达或请求失败
+    """
+    payload = json.dumps({"token": session.get("token"), "command": command}) + "\n"
+    try:
+        with socket.create_connection(("127.0.0.1", int(session["port"])), timeout=timeout) as connection:
+            connection.sendall(payload.encode("utf-8"))
+            reply = connection.makefile("r", encoding="utf-8").readline()
+    except (OSError, KeyError, ValueError) as e:
+        raise SessionError(f"无法连接会话宿主: {e}") from e
+    try:
+        data = json.loads(reply)
+    except ValueError as e:
+        raise SessionError(f"会话宿主响应无效: {reply!r}") from e
+    if not data.get("ok"):
+        raise SessionError(data.get("error") or f"{command} 请求失败")
+    return data
+
+
+def start_session(
+    project_root: Path,
+    flutter_cmd: str,
+    device: str,
+    inputs_digest: str,
+    timeout: float = 900.0,
+) -> Dict[str, Any]:
+    """在后台启动会话宿主，等待应用启动完成
+
+    Args:
+        project_root: 项目根目录
+        flutter_cmd: Flutter CLI 路径
+        device: flutter run -d 的设备（桌面平台名）
+        inputs_digest: 需要完整重建的输入（依赖、原生工程）的指纹，记录在会话文件中
+        timeout: 等待应用启动的秒数（包含首次构建）
+
+    Returns:
+        会话信息
+
+    Raises:
+        SessionError: 宿主启动失败或超时
+    """
+    SESSION_DIR.mkdir(parents=True, exist_ok=True)
+    SESSION_FILE.unlink(missing_ok=True)
+    command = [
+        sys.executable,
+        str(Path(__file__).resolve()),
+        "serve",
+        "--project",
+        str(project_root),
+        "--flutter",
+        flutter_cmd,
+        "--device",
+        device,
+        "--inputs-digest",
+        inputs_digest,
+    ]
+    kwargs: Dict[str, Any] = {}
+    if os.name == "nt":
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    host = subprocess.Popen(
+        command,
+        cwd=str(project_root),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        **kwargs,
+    )
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        session = load_session()
+        if session and session.get("pid") == host.pid:
+            if session.get("state") == "running":
+                return session
+            if session.get("state") == "failed":
+                raise SessionError(session.get("error") or "flutter run 启动失败")
+        if host.poll() is not None:
+            raise SessionError(f"会话宿主已退出（exit {host.returncode}），详见 {SESSION_LOG_FILE}")
+        time.sleep(0.5)
+
+    stop_host(host.pid)
+    raise SessionError(f"等待应用启动超过 {timeout:.0f} 秒，详见 {SESSION_LOG_FILE}")
+
+
+def stop_host(pid: int):
+    """强制结束会话宿主进程（flutter run 进程组随之结束）"""
+    try:
+        if os.name == "nt":
+            subprocess.run(
+                ["taskkill", "/F", "/T", "/PID", str(pid)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check=False,
+            )
+        else:
+            os.killpg(pid, signal.SIGTERM)
+    except OSError:
+        pass
+
+
+def stop_session(timeout: float = 15.0) -> bool:
+    """停止当前会话，返回是否存在会话"""
+    session = load_session()
+    if not session:
+        return False
+    try:
+        send_request(session, "stop", timeout=timeout)
+    except SessionError:
+        pid = int(session.get("pid") or 0)
+        if pid > 0:
+            stop_host(pid)
+    SESSION_FILE.unlink(missing_ok=True)
+    return True
+
+
+class _FlutterMachine:
+    """flutter run --machine 子进程及其 JSON-RPC 通信"""
+
+    def __init__(self, command: List[str], cwd: Path, log_file: Path):
+        self._log = open(log_file, "w", encoding="utf-8")
+        self.process = subprocess.Popen(
+            command,
+            cwd=str(cwd),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1,
+        )
+        self.app_id: Optional[str] = None
+        self.started = threading.Event()
+        self.exited = threading.Event()
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._responses: Dict[int, Dict[str, Any]] = {}
+        self._response_ready = threading.Condition(self._lock)
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        assert self.process.stdout is not None
+        for line in self.process.stdout:
+            self._log.write(line)
+            self._log.flush()
+            text = line.strip()
+            if not (text.startswith("[{") and text.endswith("}]")):
+                continue
+            try:
+                messages = json.loads(text)
+            except ValueError:
+                continue
+            for message in messages:
+                self._handle(message)
+        self.process.wait()
+        self.exited.set()
+        self.started.set()
+        with self._lock:
+            self._response_ready.notify_all()
+
+    def _handle(self, message: Dict[str, Any]):
+        event = message.get("event")
+        params = message.get("params") or {}
+        if event == "app.start":
+            self.app_id = params.get("appId")
+        elif event == "app.started":
+            self.started.set()
+        elif "id" in message:
+            with self._lock:
+                self._responses[message["id"]] = message
+                self._response_ready.notify_all()
+
+    def call(self, method: str, params: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """发送请求并等待响应"""
+        with self._lock:
+            request_id = self._next_id
+            self._next_id += 1
+        request = json.dumps([{"id": request_id, "method": method, "params": params}])
+        assert self.process.stdin is not None
+        self.process.stdin.write(request + "\n")
+        self.process.stdin.flush()
+
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while request_id not in self._responses:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self.exited.is_set():
+                    raise SessionError(f"{method} 未在 {timeout:.0f} 秒内响应")
+                self._response_ready.wait(remaining)
+            return self._responses.pop(request_id)
+
+
+def serve(project_root: Path, flutter_cmd: str, device: str, inputs_digest: str) -> int:
+    """会话宿主主循环"""
+    SESSION_DIR.mkdir(parents=True, exist_ok=True)
+    pid = os.getpid()
+    token = secrets.token_hex(16)
+    machine = _FlutterMachine([flutter_cmd, "run", "-d", device, "--machine"], project_root, SESSION_LOG_FILE)
+    stopping = threading.Event()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            try:
+                request = json.loads(self.rfile.readline())
+            except ValueError:
+                return
+            if request.get("token") != token:
+                reply: Dict[str, Any] = {"ok": False, "error": "令牌不匹配"}
+            else:
+                reply = handle_command(request.get("command"))
+            self.wfile.write((json.dumps(reply, ensure_ascii=False) + "\n").encode("utf-8"))
+
+    def handle_command(command: Optional[str]) -> Dict[str, Any]:
+        if command == "status":
+            return {"ok": True, "app_id": machine.app_id, "running": not machine.exited.is_set()}
+        if command == "restart":
+            start = time.monotonic()
+            try:
+                response = machine.call(
+                    "app.restart",
+                    {"appId": machine.app_id, "fullRestart": True, "pause": False, "reason": "deploy"},
+                    RESTART_TIMEOUT,
+                )
+            except SessionError as e:
+                return {"ok": False, "error": str(e)}
+            result = response.get("result") or {}
+            if "error" in response or result.get("code", 0) != 0:
+                return {"ok": False, "error": response.get("error") or result.get("message") or "热重启失败"}
+            return {"ok": True, "duration": time.monotonic() - start}
+        if command == "stop":
+            stopping.set()
+            return {"ok": True}
+        return {"ok": False, "error": f"未知命令: {command}"}
+
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    session = {
+        "pid": pid,
+        "port": server.server_address[1],
+        "token": token,
+        "device": device,
+        "project": str(project_root),
+        "inputs_digest": inputs_digest,
+        "state": "starting",
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    _write_session(session)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    machine.started.wait()
+    if machine.exited.is_set():
+        _write_session(dict(session, state="failed", error=f"flutter run 已退出，详见 {SESSION_LOG_FILE}"))
+        server.shutdown()
+        return 1
+    _write_session(dict(session, state="running", app_id=machine.app_id))
+
+    while not machine.exited.is_set() and not stopping.is_set():
+        stopping.wait(0.5)
+
+    if not machine.exited.is_set():
+        try:
+            machine.call("app.stop", {"appId": machine.app_id}, timeout=10)
+        except SessionError:
+            pass
+        if not machine.exited.wait(10):
+            machine.process.kill()
+    server.shutdown()
+    _remove_session(pid)
+    return 0
+
+
+def main() -> int:
+    """命令行入口（由 start_session 以后台进程方式调用）"""
+    parser = argparse.ArgumentParser(description="flutter run --machine 会话宿主")
+    subparsers = parser.add_subparsers(dest="action", required=True)
+    serve_parser = subparsers.add_parser("serve")
+    serve_parser.add_argument("--project", type=Path, required=True)
+    serve_parser.add_argument("--flutter", required=True)
+    serve_parser.add_argument("--device", required=True)
+    serve_parser.add_argument("--inputs-digest", default="")
+    subparsers.add_parser("stop")
+    args = parser.parse_args()
+
+    if args.action == "stop":
+        return 0 if stop_session() else 1
+    return serve(args.project, args.flutter, args.device, args.inputs_digest)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
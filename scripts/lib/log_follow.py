@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+实时跟随 latest.log（follow_logs.py 使用）
+
+- 按字节偏移轮询：每轮只 stat 一次，文件变大时才打开，从上次偏移读出新增部分后立即关闭。
+  不长期占用句柄：Windows 上打开中的 latest.log 无法改名，会让应用启动时的归档失败
+- 轮转检测：应用启动时把旧 latest.log 改名为 app_<header 时间>.log 再新建
+  （logger_service.dart 的 _initLogFile / _archiveLatestLog）。文件身份为设备号 + inode
+  及 `# Log created at:` header，任一变化或文件变小即视为新文件，从头读取；
+  旧文件在上次轮询之后追加的部分从同一 inode 的归档文件补读，不会丢行
+- 过滤表达式只编译一次：tag / 级别查集合，词和正则只作用于消息部分，
+  不带过滤条件时不解析日志行；堆栈等续行跟随所属日志的过滤结果
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence, Union
+
+from app_log_format import parse_header
+from app_log_paths import LATEST_LOG_NAME, find_log_files, get_runtime_log_dirs
+from log_index import Query
+
+# 每轮最多读取的字节数，积压较多时分多轮读完（期间不休眠），内存占用有上限
+MAX_READ_BYTES = 1024 * 1024
+
+# 读取 header 行最多需要的字节数
+_HEADER_MAX_BYTES = 256
+
+_TAIL_BLOCK_SIZE = 64 * 1024
+
+_RECORD_PATTERN = re.compile(r"\[\d{2}:\d{2}:\d{2}\.\d{3}\] \[([A-Z]+) *\] \[([^\]]*?) *\] ?")
+
+
+@dataclass
+class Rotation:
+    """latest.log 被替换为新文件"""
+    header: Optional[str]
+    archived: Optional[Path]
+
+
+def find_latest_log(project_root: Path) -> Path:
+    """最近写入的 latest.log；各位置都没有时返回运行时日志目录下的路径（等待应用创建）"""
+    for path in find_log_files(project_root):
+        if path.name == LATEST_LOG_NAME:
+            return path
+    directories = get_runtime_log_dirs() or [project_root / "logs"]
+    return directories[0] / LATEST_LOG_NAME
+
+
+def tail_offset(path: Path, size: int, lines: int) -> int:
+    """文件前 size 字节中最后 lines 行的起始偏移"""
+    if lines <= 0 or size <= 0:
+        return size
+    count = 0
+    position = size
+    with open(path, "rb") as f:
+        while position > 0:
+            read_size = min(_TAIL_BLOCK_SIZE, position)
+            position -= read_size
+            f.seek(position)
+            block = f.read(read_size)
+            index = len(block)
+            if position + read_size == size and block.endswith(b"\n"):
+                # 末尾的换行结束的是最后一行，不是新的一行
+                index -= 1
+            while True:
+                index = block.rfind(b"\n", 0, index)
+                if index < 0:
+                    break
+                count += 1
+                if count == lines:
+                    return position + index + 1
+    return 0
+
+
+def _read_header(f) -> Optional[str]:
+    f.seek(0)
+    first, newline, _ = f.read(_HEADER_MAX_BYTES).partition(b"\n")
+    if not newline:
+        return None
+    return parse_header(first.rstrip(b"\r").decode("utf-8", errors="replace"))
+
+
+class LogFollower:
+    """按偏移量轮询一个日志文件，处理轮转"""
+
+    def __init__(self, path: Path, initial_lines: Optional[int] = 10, max_read: int = MAX_READ_BYTES):
+        """
+        Args:
+            path: 跟随的文件（通常是 latest.log）
+            initial_lines: 启动时先输出已有内容的最后几行，None 表示从头输出；
+                启动时文件还不存在则之后出现的文件从头输出
+            max_read: 每轮最多读取的字节数
+        """
+        self.path = path
+        self.max_read = max_read
+        self.offset = 0
+        self.pending = False
+        self.rotations = 0
+        self.bytes_read = 0
+        self._initial_lines = initial_lines
+        self._started = False
+        self._device = 0
+        self._inode = 0
+        self._header: Optional[str] = None
+        self._known = False
+        self._partial = b""
+        self._rotation: Optional[Rotation] = None
+        self._archived: Optional[Path] = None
+
+    def poll(self) -> List[Union[str, Rotation]]:
+        """读取新增的完整行；轮转时依次产出旧文件剩余的行、Rotation 和新文件的行"""
+        try:
+            current = os.stat(self.path)
+        except OSError:
+            # 应用归档旧文件到新建 latest.log 之间文件短暂不存在，保留身份等下一轮处理
+            self._started = True
+            self.pending = False
+            return []
+
+        events: List[Union[str, Rotation]] = []
+        if not self._started:
+            self._started = True
+            if self._initial_lines is not None:
+                self.offset = tail_offset(self.path, current.st_size, self._initial_lines)
+        elif self._known and (current.st_dev, current.st_ino) != (self._device, self._inode) and current.st_ino:
+            events.extend(self._drain_archive())
+            self._restart(self._archived)
+        elif current.st_size < self.offset:
+            # 同一文件被截断重写（归档失败时应用以 FileMode.write 重新打开）
+            self._restart(None)
+
+        if not self._known:
+            self._remember(current)
+
+        if current.st_size == self.offset:
+            self.pending = False
+            return events
+        try:
+            with open(self.path, "rb") as f:
+                header = _read_header(f)
+                if header and self._header and header != self._header:
+                    # inode 不变但 header 变了：截断后又写到了上次的偏移之后
+                    self._restart(None)
+                    self._remember(current)
+                if self._header is None:
+                    self._header = header
+                if self._rotation is not None:
+                    self._rotation.header = header
+                    events.append(self._rotation)
+                    self._rotation = None
+                f.seek(self.offset)
+                data = f.read(min(current.st_size - self.offset, self.max_read))
+        except OSError:
+            self.pending = False
+            return events
+        self.offset += len(data)
+        self.bytes_read += len(data)
+        self.pending = self.offset < current.st_size
+        events.extend(self._split(data))
+        return events
+
+    def _remember(self, current: os.stat_result) -> None:
+        self._device, self._inode = current.st_dev, current.st_ino
+        self._known = True
+
+    def _drain_archive(self) -> List[str]:
+        """从归档后的旧文件读出上次轮询之后追加的部分"""
+        self._archived = None
+        for candidate in self.path.parent.glob("app_*.log"):
+            try:
+                stat = candidate.stat()
+            except OSError:
+                continue
+            if (stat.st_dev, stat.st_ino) != (self._device, self._inode):
+                continue
+            self._archived = candidate
+            if stat.st_size <= self.offset:
+                break
+            try:
+                with open(candidate, "rb") as f:
+                    f.seek(self.offset)
+                    data = f.read(stat.st_size - self.offset)
+            except OSError:
+                break
+            self.bytes_read += len(data)
+            # 旧文件不会再写入，最后的半行也是完整内容
+            return self._split(data + (b"" if data.endswith(b"\n") else b"\n"))
+        return []
+
+    def _restart(self, archived: Optional[Path]) -> None:
+        self.rotations += 1
+        self.offset = 0
+        self._partial = b""
+        self._known = False
+        self._header = None
+        self._rotation = Rotation(None, archived)
+
+    def _split(self, data: bytes) -> List[str]:
+        end = data.rfind(b"\n")
+        if end < 0:
+            self._partial += data
+            return []
+        text = (self._partial + data[:end]).decode("utf-8", errors="replace")
+        self._partial = data[end + 1:]
+        lines = text.split("\n")
+        if "\r" in text:
+            lines = [line.rstrip("\r") for line in lines]
+        return lines
+
+
+class LineFilter:
+    """编译后的过滤条件
+
+    与 search_logs.py 的查询语法相同（parse_query）：`tag:svn`（可重复，任一匹配）、
+    `level:warn`（该级别及以上），其余词需全部出现在消息中（按子串匹配，不区分大小写）；
+    另可给出需匹配的正则和需排除的正则。
+    """
+
+    def __init__(self, query: Query, patterns: Sequence[str] = (), excludes: Sequence[str] = ()):
+        self.tags = frozenset(query.tags) or None
+        self.levels = frozenset(query.levels) if query.levels else None
+        self.words = [term.text.lower() for term in query.terms]
+        self.patterns = [re.compile(pattern) for pattern in patterns]
+        self.excludes = [re.compile(pattern) for pattern in excludes]
+        self.active = bool(self.tags or self.levels or self.words or self.patterns or self.excludes)
+        self._matched = not self.active
+        self.kept = 0
+
+    def reset(self) -> None:
+        """新文件开头的非日志行（header 等）不属于任何日志"""
+        self._matched = not self.active
+
+    def apply(self, lines: List[str]) -> List[str]:
+        """返回通过过滤的行"""
+        if not self.active:
+            self.kept += len(lines)
+            return lines
+        kept = []
+        for line in lines:
+            match = _RECORD_PATTERN.match(line)
+            if match is not None:
+                self._matched = self._record_matches(match, line)
+            if self._matched:
+                kept.append(line)
+        self.kept += len(kept)
+        return kept
+
+    def _record_matches(self, match, line: str) -> bool:
+        if self.levels is not None and match.group(1) not in self.levels:
+            return False
+        if self.tags is not None and match.group(2).upper() not in self.tags:
+            return False
+        message = line[match.end():]
+        if self.words:
+            lowered = message.lower()
+            if not all(word in lowered for word in self.words):
+                return False
+        if not all(pattern.search(message) for pattern in self.patterns):
+            return False
+        return not any(pattern.search(message) for pattern in self.excludes)
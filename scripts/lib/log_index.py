@@ -0,0 +1,671 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+应用日志倒排索引
+
+把 latest.log / app_*.log（以及收集到的日志目录）建成磁盘上的倒排索引
+logs/log_index.sqlite3，查询时只读取命中的日志行，不再线性扫描全部日志：
+
+- 每个文件按已索引的字节范围分段（segment）：归档日志只有一段；latest.log 追加写入后
+  只索引新增部分，作为新的一段
+- 段内每条日志按顺序编号（ordinal），保存各条日志的字节偏移和时间（毫秒）
+- postings：词 → 段内包含该词的日志编号（差分编码后 zlib 压缩）
+- bitmaps：每段每个级别、每个 tag 一个位图，按级别/tag 过滤时与 postings 求交
+- 时间过滤：段内时间按写入顺序递增，二分查找得到编号范围
+
+分词（tokenize）：ASCII 字母数字串转小写为一个词（r12345 同时索引为 12345）；
+连续的中文按相邻两字（bigram）索引，单个汉字单独索引；查询单个汉字时合并以它开头或结尾的
+bigram，再按原文核对。日志的续行（`  └─ Error:`、堆栈）
+归入所属日志一起索引。
+
+增量更新与 collect_manifest.py 一致：按路径记录大小、mtime 和头部哈希；
+latest.log 改名为 app_<时间>.log 时按头部哈希识别为同一文件，只更新路径；
+头部不一致或文件变小（已轮转/被截断）时重新索引；文件已不存在时删除其索引。
+"""
+
+import fnmatch
+import hashlib
+import re
+import sqlite3
+import zlib
+from array import array
+from collections import defaultdict
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import accumulate
+from operator import sub
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from app_log_format import LEVELS, parse_line
+from app_log_paths import LOG_PATTERNS, find_log_files
+from app_log_reader import iter_records
+from log_time_window import TimeWindow
+
+INDEX_FILE_NAME = "log_index.sqlite3"
+INDEX_FORMAT_VERSION = 1
+
+# 收集到的日志目录中文件名带来源前缀（如 app_support_latest.log、project_app_xxx.from_123.log）
+INDEX_PATTERNS = LOG_PATTERNS + ("*_latest*.log", "*_app_*.log")
+
+# 用于识别"同一个文件"的头部字节数（与 collect_manifest.HEAD_BYTES 一致）
+HEAD_BYTES = 64 * 1024
+
+# 超过该长度的词（长哈希、base64 等）不索引
+MAX_TOKEN_LENGTH = 64
+
+# 输出一条日志时最多附带的续行数
+MAX_DETAIL_LINES = 50
+
+_WORD = re.compile(r"[0-9A-Za-z_]+|[\u3400-\u4dbf\u4e00-\u9fff]+")
+_REVISION = re.compile(r"r(\d+)")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS roots (
+    path TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    head_sha256 TEXT NOT NULL,
+    head_length INTEGER NOT NULL,
+    indexed_end INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_id INTEGER NOT NULL REFERENCES files (id) ON DELETE CASCADE,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL,
+    records INTEGER NOT NULL,
+    first_time INTEGER,
+    last_time INTEGER,
+    offsets BLOB NOT NULL,
+    times BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS segments_file ON segments (file_id);
+CREATE TABLE IF NOT EXISTS postings (
+    token TEXT NOT NULL,
+    segment_id INTEGER NOT NULL REFERENCES segments (id) ON DELETE CASCADE,
+    ordinals BLOB NOT NULL,
+    PRIMARY KEY (token, segment_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_segment ON postings (segment_id);
+CREATE TABLE IF NOT EXISTS bitmaps (
+    segment_id INTEGER NOT NULL REFERENCES segments (id) ON DELETE CASCADE,
+    field TEXT NOT NULL,
+    value TEXT NOT NULL,
+    bits BLOB NOT NULL,
+    PRIMARY KEY (segment_id, field, value)
+) WITHOUT ROWID;
+"""
+
+
+def get_default_index_file() -> Path:
+    """默认索引：项目根目录/logs/log_index.sqlite3"""
+    return Path(__file__).parent.parent.parent / "logs" / INDEX_FILE_NAME
+
+
+# 单词 → 索引词的缓存上限（日志中的固定文案词会反复出现）
+_WORD_CACHE_SIZE = 200000
+_word_cache: Dict[str, Tuple[str, ...]] = {}
+
+
+def _word_tokens(word: str) -> Tuple[str, ...]:
+    if word.isascii():
+        if len(word) > MAX_TOKEN_LENGTH:
+            return ()
+        word = word.lower()
+        revision = _REVISION.fullmatch(word)
+        return (word, revision.group(1)) if revision else (word,)
+    if len(word) == 1:
+        return (word,)
+    return tuple(word[i:i + 2] for i in range(len(word) - 1))
+
+
+def _is_single_han(token: str) -> bool:
+    """单个汉字：长串中的汉字只以 bigram 形式出现在索引中"""
+    return len(token) == 1 and not token.isascii()
+
+
+def tokenize(text: str) -> Set[str]:
+    """文本中的索引词"""
+    tokens: Set[str] = set()
+    for word in _WORD.findall(text):
+        cached = _word_cache.get(word)
+        if cached is None:
+            cached = _word_tokens(word)
+            if len(_word_cache) < _WORD_CACHE_SIZE:
+                _word_cache[word] = cached
+        tokens.update(cached)
+    return tokens
+
+
+# ===== 编码 =====
+
+
+def _encode_sorted(values: Sequence[int], typecode: str) -> bytes:
+    """递增整数序列：差分后 zlib 压缩"""
+    deltas = array(typecode, values[:1])
+    deltas.extend(map(sub, values[1:], values[:-1]))
+    return zlib.compress(deltas.tobytes(), 1)
+
+
+def _decode_sorted(blob: bytes, typecode: str) -> List[int]:
+    deltas = array(typecode)
+    deltas.frombytes(zlib.decompress(blob))
+    return list(accumulate(deltas))
+
+
+def _encode_bitmap(ordinals: Sequence[int], size: int) -> bytes:
+    bits = bytearray((size + 7) // 8)
+    for ordinal in ordinals:
+        bits[ordinal >> 3] |= 1 << (ordinal & 7)
+    return zlib.compress(bytes(bits), 1)
+
+
+def _decode_bitmap(blob: bytes) -> int:
+    return int.from_bytes(zlib.decompress(blob), "little")
+
+
+def _bitmap_ordinals(bits: int) -> Iterator[int]:
+    """位图中所有置位的编号（从小到大）"""
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    for index, byte in enumerate(data):
+        while byte:
+            low = byte & -byte
+            yield (index << 3) + low.bit_length() - 1
+            byte ^= low
+
+
+# ===== 建索引 =====
+
+
+@dataclass
+class SegmentData:
+    """一个文件字节范围的索引数据（在工作进程中生成）"""
+    start: int
+    end: int
+    records: int
+    first_time: Optional[int]
+    last_time: Optional[int]
+    offsets: bytes
+    times: bytes
+    postings: List[Tuple[str, bytes]]
+    bitmaps: List[Tuple[str, str, bytes]]
+
+
+def complete_end(path: Path, start: int, size: int) -> int:
+    """[start, size) 中最后一个完整行的结尾（latest.log 可能正在写入半行）"""
+    if size <= start:
+        return start
+    with open(path, "rb") as f:
+        position = size
+        while position > start:
+            step = min(4096, position - start)
+            f.seek(position - step)
+            chunk = f.read(step)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                return position - step + newline + 1
+            position -= step
+    return start
+
+
+def index_range(path: Path, start: int, end: int) -> SegmentData:
+    """索引 path 的 [start, end) 范围"""
+    offsets: List[int] = []
+    times: List[int] = []
+    postings: Dict[str, List[int]] = defaultdict(list)
+    levels: Dict[str, List[int]] = {}
+    tags: Dict[str, List[int]] = {}
+
+    for ordinal, record in enumerate(iter_records(path, start, end, keep_details=True)):
+        offsets.append(record.offset)
+        times.append(int(record.time.timestamp() * 1000))
+        levels.setdefault(record.level, []).append(ordinal)
+        tags.setdefault(record.tag.upper(), []).append(ordinal)
+        text = record.message
+        if record.details:
+            text = "\n".join([text, *record.details])
+        for token in tokenize(text):
+            postings[token].append(ordinal)
+
+    count = len(offsets)
+    # 系统时钟回拨时行内时间可能回退，编码前保证递增（时间过滤依赖二分查找）
+    times = list(accumulate(times, max))
+    return SegmentData(
+        start=start,
+        end=end,
+        records=count,
+        first_time=times[0] if times else None,
+        last_time=times[-1] if times else None,
+        offsets=_encode_sorted(offsets, "q"),
+        times=_encode_sorted(times, "q"),
+        postings=[(token, _encode_sorted(ordinals, "I")) for token, ordinals in postings.items()],
+        bitmaps=[("level", value, _encode_bitmap(ordinals, count)) for value, ordinals in levels.items()]
+        + [("tag", value, _encode_bitmap(ordinals, count)) for value, ordinals in tags.items()],
+    )
+
+
+def discover_files(directory: Path) -> List[Path]:
+    """递归查找目录中的应用日志（含收集到的日志目录中带来源前缀的文件）"""
+    return sorted(
+        path
+        for path in directory.rglob("*.log")
+        if path.is_file() and any(fnmatch.fnmatch(path.name, pattern) for pattern in INDEX_PATTERNS)
+    )
+
+
+def _hash_head(path: Path, length: int) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read(length)).hexdigest()
+
+
+@dataclass
+class IndexTask:
+    """一个需要索引的字节范围"""
+    file_id: int
+    path: Path
+    start: int
+    end: int
+
+
+# ===== 查询 =====
+
+
+@dataclass
+class QueryTerm:
+    """查询中的一个词或短语"""
+    text: str
+    tokens: Set[str]
+
+    @property
+    def needs_verify(self) -> bool:
+        """短语、中文等无法只靠索引词精确匹配，需读取原文核对"""
+        return self.tokens != {self.text.lower()} or any(_is_single_han(token) for token in self.tokens)
+
+
+@dataclass
+class Query:
+    """解析后的查询"""
+    terms: List[QueryTerm] = field(default_factory=list)
+    tags: Set[str] = field(default_factory=set)
+    min_level: Optional[str] = None
+
+    @property
+    def levels(self) -> Optional[List[str]]:
+        if self.min_level is None:
+            return None
+        return list(LEVELS[LEVELS.index(self.min_level):])
+
+
+def parse_query(words: Sequence[str]) -> Query:
+    """解析查询：`tag:svn`（可重复，任一匹配）、`level:warn`（该级别及以上），其余为需全部出现的词"""
+    query = Query()
+    for word in words:
+        key, _, value = word.partition(":")
+        if value and key.lower() == "tag":
+            query.tags.add(value.upper())
+        elif value and key.lower() == "level":
+            level = value.upper()
+            if level not in LEVELS:
+                raise ValueError(f"未知的级别: {value}（可用 {' / '.join(LEVELS)}）")
+            query.min_level = level
+        elif word.strip():
+            query.terms.append(QueryTerm(word, tokenize(word)))
+    return query
+
+
+@dataclass
+class SearchHit:
+    """一条命中的日志"""
+    path: Path
+    offset: int
+    time: datetime
+    text: str = ""
+
+
+def read_record(f, offset: int) -> str:
+    """读取 offset 处的一条日志（含续行）"""
+    f.seek(offset)
+    lines = [f.readline().decode("utf-8", errors="replace").rstrip("\r\n")]
+    while len(lines) <= MAX_DETAIL_LINES:
+        raw = f.readline()
+        if not raw:
+            break
+        line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+        if parse_line(line) is not None:
+            break
+        lines.append(line)
+    while len(lines) > 1 and not lines[-1].strip():
+        lines.pop()
+    return "\n".join(lines)
+
+
+class LogIndex:
+    """日志倒排索引库"""
+
+    def __init__(self, index_file: Optional[Path] = None):
+        self.index_file = index_file or get_default_index_file()
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.index_file), timeout=30)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.executescript(_SCHEMA)
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is not None and row[0] != str(INDEX_FORMAT_VERSION):
+            self._reset()
+        self.connection.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (str(INDEX_FORMAT_VERSION),)
+        )
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def _reset(self):
+        """索引格式变化：清空重建"""
+        with self.connection:
+            for table in ("bitmaps", "postings", "segments", "files", "roots"):
+                self.connection.execute(f"DELETE FROM {table}")
+
+    # ----- 文件与增量更新 -----
+
+    def add_roots(self, directories: Sequence[Path]):
+        """记录需要递归索引的目录，之后的更新会查找其中新出现的日志"""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO roots (path) VALUES (?)",
+                [(str(directory.resolve()),) for directory in directories],
+            )
+
+    def roots(self) -> List[Path]:
+        return [Path(row[0]) for row in self.connection.execute("SELECT path FROM roots ORDER BY path")]
+
+    def known_files(self) -> List[Path]:
+        return [Path(row[0]) for row in self.connection.execute("SELECT path FROM files ORDER BY path")]
+
+    def candidate_files(self, project_root: Path) -> List[Path]:
+        """默认日志位置、已记录目录中的日志，以及已索引的文件"""
+        found: Dict[Path, Path] = {}
+        files = list(find_log_files(project_root))
+        for root in self.roots():
+            if root.is_dir():
+                files.extend(discover_files(root))
+        files.extend(path for path in self.known_files() if path.exists())
+        for path in files:
+            found.setdefault(path.resolve(), path.resolve())
+        return sorted(found.values())
+
+    def _file_rows(self) -> Dict[str, tuple]:
+        return {
+            row[1]: row
+            for row in self.connection.execute(
+                "SELECT id, path, size, mtime_ns, head_sha256, head_length, indexed_end FROM files"
+            )
+        }
+
+    @staticmethod
+    def _is_current(row: tuple, path: Path, size: int) -> bool:
+        """记录是否仍对应 path 的内容（只在末尾追加，头部没变）"""
+        head_length = row[5]
+        return row[6] <= size and 0 < head_length <= size and _hash_head(path, head_length) == row[4]
+
+    def _follow_renames(self, files: Sequence[Path]) -> int:
+        """处理过期记录（文件已不存在，或内容已被轮转/截断），返回删除的记录数
+
+        latest.log 被改名为 app_<时间>.log、又创建了新的 latest.log 时，旧记录按头部哈希
+        移到新路径（保留已建的索引），新的 latest.log 作为新文件索引。
+        """
+        rows = self._file_rows()
+        stale: List[tuple] = []
+        for key, row in rows.items():
+            path = Path(key)
+            if not path.exists():
+                stale.append(row)
+                continue
+            stat = path.stat()
+            if (stat.st_size, stat.st_mtime_ns) != (row[2], row[3]) and not self._is_current(row, path, stat.st_size):
+                stale.append(row)
+        if not stale:
+            return 0
+
+        stale_paths = {row[1] for row in stale}
+        moves: Dict[str, tuple] = {}
+        for path in files:
+            key = str(path)
+            if key in rows and key not in stale_paths:
+                continue
+            size = path.stat().st_size
+            for row in stale:
+                if row[1] != key and self._is_current(row, path, size):
+                    moves[key] = row
+                    stale.remove(row)
+                    break
+
+        with self.connection:
+            # 先移到临时路径，避免与目标路径上的旧记录冲突
+            for key, row in moves.items():
+                self.connection.execute("UPDATE files SET path = ? WHERE id = ?", (f"{key}\0{row[0]}", row[0]))
+            self.connection.executemany("DELETE FROM files WHERE id = ?", [(row[0],) for row in stale])
+            for key, row in moves.items():
+                self.connection.execute("UPDATE files SET path = ? WHERE id = ?", (key, row[0]))
+        return len(stale)
+
+    def plan(self, files: Sequence[Path]) -> Tuple[List[IndexTask], int]:
+        """计算需要索引的范围（并更新文件记录），返回 (任务, 删除的记录数)"""
+        files = [path.resolve() for path in files]
+        dropped = self._follow_renames(files)
+        rows = self._file_rows()
+        tasks: List[IndexTask] = []
+        with self.connection:
+            for path in files:
+                stat = path.stat()
+                size = stat.st_size
+                row = rows.get(str(path))
+                if row is not None and row[2] == size and row[3] == stat.st_mtime_ns:
+                    continue
+                start = row[6] if row is not None else 0
+                head_length = min(size, HEAD_BYTES)
+                head = _hash_head(path, head_length)
+                if row is None:
+                    file_id = self.connection.execute(
+                        "INSERT INTO files (path, size, mtime_ns, head_sha256, head_length, indexed_end)"
+                        " VALUES (?, ?, ?, ?, ?, 0)",
+                        (str(path), size, stat.st_mtime_ns, head, head_length),
+                    ).lastrowid
+                else:
+                    file_id = row[0]
+                    self.connection.execute(
+                        "UPDATE files SET size = ?, mtime_ns = ?, head_sha256 = ?, head_length = ? WHERE id = ?",
+                        (size, stat.st_mtime_ns, head, head_length, file_id),
+                    )
+                end = complete_end(path, start, size)
+                if end > start:
+                    tasks.append(IndexTask(file_id, path, start, end))
+        return tasks, dropped
+
+    def store(self, task: IndexTask, segment: SegmentData):
+        """写入一段索引，并推进文件的已索引偏移"""
+        with self.connection:
+            segment_id = self.connection.execute(
+                "INSERT INTO segments (file_id, start, end, records, first_time, last_time, offsets, times)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    task.file_id,
+                    segment.start,
+                    segment.end,
+                    segment.records,
+                    segment.first_time,
+                    segment.last_time,
+                    segment.offsets,
+                    segment.times,
+                ),
+            ).lastrowid
+            self.connection.executemany(
+                "INSERT INTO postings (token, segment_id, ordinals) VALUES (?, ?, ?)",
+                [(token, segment_id, blob) for token, blob in segment.postings],
+            )
+            self.connection.executemany(
+                "INSERT INTO bitmaps (segment_id, field, value, bits) VALUES (?, ?, ?, ?)",
+                [(segment_id, name, value, blob) for name, value, blob in segment.bitmaps],
+            )
+            self.connection.execute("UPDATE files SET indexed_end = ? WHERE id = ?", (segment.end, task.file_id))
+
+    # ----- 查询 -----
+
+    def _bitmap(self, segment_id: int, name: str, values: Sequence[str]) -> int:
+        bits = 0
+        placeholders = ",".join("?" * len(values))
+        for (blob,) in self.connection.execute(
+            f"SELECT bits FROM bitmaps WHERE segment_id = ? AND field = ? AND value IN ({placeholders})",
+            (segment_id, name, *values),
+        ):
+            bits |= _decode_bitmap(blob)
+        return bits
+
+    def search(self, query: Query, window: Optional[TimeWindow] = None) -> List[SearchHit]:
+        """返回所有命中的日志（按时间排序，不含原文）"""
+        segments: Dict[int, tuple] = {
+            row[0]: row
+            for row in self.connection.execute(
+                "SELECT s.id, f.path, s.records, s.first_time, s.last_time FROM segments s JOIN files f ON f.id = s.file_id"
+            )
+        }
+        if window is not None:
+            since = int(window.since.timestamp() * 1000) if window.since else None
+            until = int(window.until.timestamp() * 1000) if window.until else None
+            segments = {
+                key: row
+                for key, row in segments.items()
+                if row[3] is not None
+                and (since is None or row[4] >= since)
+                and (until is None or row[3] <= until)
+            }
+
+        # 词按出现的段数从少到多求交，尽早缩小候选段
+        tokens = sorted({token for term in query.terms for token in term.tokens})
+        postings: List[Dict[int, bytes]] = []
+        for token in tokens:
+            found = self._postings(token, segments)
+            if not found:
+                return []
+            postings.append(found)
+        postings.sort(key=lambda item: sum(len(blob) for blob in item.values()))
+        candidates = set(segments)
+        for found in postings:
+            candidates &= found.keys()
+
+        hits: List[SearchHit] = []
+        for segment_id in candidates:
+            path, records = segments[segment_id][1], segments[segment_id][2]
+            ordinals: Optional[Set[int]] = None
+            for found in postings:
+                decoded = _decode_sorted(found[segment_id], "I")
+                ordinals = set(decoded) if ordinals is None else ordinals.intersection(decoded)
+                if not ordinals:
+                    break
+            if ordinals is not None and not ordinals:
+                continue
+
+            for name, values in (("level", query.levels), ("tag", sorted(query.tags) or None)):
+                if values is None:
+                    continue
+                bits = self._bitmap(segment_id, name, values)
+                if ordinals is None:
+                    ordinals = set(_bitmap_ordinals(bits))
+                else:
+                    ordinals = {ordinal for ordinal in ordinals if bits >> ordinal & 1}
+            if ordinals is None:
+                ordinals = set(range(records))
+            if not ordinals:
+                continue
+
+            offsets_blob, times_blob = self.connection.execute(
+                "SELECT offsets, times FROM segments WHERE id = ?", (segment_id,)
+            ).fetchone()
+            times = _decode_sorted(times_blob, "q")
+            if window is not None:
+                low = bisect_left(times, since) if since is not None else 0
+                high = bisect_right(times, until) if until is not None else len(times)
+                ordinals = {ordinal for ordinal in ordinals if low <= ordinal < high}
+            offsets = _decode_sorted(offsets_blob, "q")
+            file_path = Path(path)
+            hits.extend(
+                SearchHit(file_path, offsets[ordinal], datetime.fromtimestamp(times[ordinal] / 1000))
+                for ordinal in ordinals
+            )
+        hits.sort(key=lambda hit: (hit.time, hit.offset))
+        return hits
+
+    def _scalar(self, sql: str) -> int:
+        return self.connection.execute(sql).fetchone()[0] or 0
+
+    def _postings(self, token: str, segments: Dict[int, tuple]) -> Dict[int, bytes]:
+        """词在各段中的 postings（只保留 segments 中的段）"""
+        if not _is_single_han(token):
+            return {
+                segment_id: blob
+                for segment_id, blob in self.connection.execute(
+                    "SELECT segment_id, ordinals FROM postings WHERE token = ?", (token,)
+                )
+                if segment_id in segments
+            }
+        # 单个汉字：合并单字词和以它开头或结尾的 bigram，命中由 load_texts 按原文核对
+        merged: Dict[int, Set[int]] = defaultdict(set)
+        for segment_id, blob in self.connection.execute(
+            "SELECT segment_id, ordinals FROM postings "
+            "WHERE token BETWEEN ? AND ? OR (length(token) = 2 AND substr(token, 2) = ?)",
+            (token, token + "\U0010ffff", token),
+        ):
+            if segment_id in segments:
+                merged[segment_id].update(_decode_sorted(blob, "I"))
+        return {segment_id: _encode_sorted(sorted(ordinals), "I") for segment_id, ordinals in merged.items()}
+
+    def stats(self) -> Dict[str, int]:
+        """索引规模"""
+        return {
+            "files": self._scalar("SELECT COUNT(*) FROM files"),
+            "segments": self._scalar("SELECT COUNT(*) FROM segments"),
+            "records": self._scalar("SELECT SUM(records) FROM segments"),
+            "indexed_bytes": self._scalar("SELECT SUM(indexed_end) FROM files"),
+            "tokens": self._scalar("SELECT COUNT(DISTINCT token) FROM postings"),
+            "index_bytes": self._file_bytes(),
+        }
+
+    def _file_bytes(self) -> int:
+        """索引占用的磁盘空间（WAL 模式下刚写入的数据还在 -wal 文件中）"""
+        total = 0
+        for path in (self.index_file, Path(f"{self.index_file}-wal")):
+            try:
+                total += path.stat().st_size
+            except OSError:
+                pass
+        return total
+
+
+def load_texts(hits: Sequence[SearchHit], query: Query) -> List[SearchHit]:
+    """读取命中日志的原文；含短语/中文多字词时按原文核对，去掉只是分词命中的日志"""
+    verify = [term.text.lower() for term in query.terms if term.needs_verify]
+    by_path: Dict[Path, List[SearchHit]] = {}
+    for hit in hits:
+        by_path.setdefault(hit.path, []).append(hit)
+    for path, items in by_path.items():
+        try:
+            with open(path, "rb") as f:
+                for hit in items:
+                    hit.text = read_record(f, hit.offset)
+        except OSError:
+            continue
+    return [
+        hit
+        for hit in hits
+        if hit.text and all(text in hit.text.lower() for text in verify)
+    ]
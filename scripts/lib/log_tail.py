@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+从文件末尾向前按块读取行
+
+用于只关心文件尾部内容的场景（脚本执行结果、运行索引的最近记录等），
+读取开销只与扫描的字节数有关，与文件总大小无关。
+"""
+
+import os
+from pathlib import Path
+from typing import Iterator, Optional
+
+DEFAULT_BLOCK_SIZE = 64 * 1024
+
+
+def iter_lines_backward(
+    path: Path,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    max_bytes: Optional[int] = None,
+    encoding: str = "utf-8",
+) -> Iterator[str]:
+    """从文件末尾开始逆序逐行产出（不含换行符）
+
+    Args:
+        path: 文件路径
+        block_size: 每次向前读取的块大小
+        max_bytes: 最多从末尾扫描的字节数，None 表示不限（可一直读到文件开头）
+        encoding: 文本编码，无法解码的字节以替换字符表示
+
+    Yields:
+        从最后一行开始的各行内容。达到 max_bytes 限制时，
+        被截断的最前一行不会产出。
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        limit = 0 if max_bytes is None else max(0, position - max_bytes)
+        remainder = b""
+        first_block = True
+
+        while position > limit:
+            read_size = min(block_size, position - limit)
+            position -= read_size
+            f.seek(position)
+            data = f.read(read_size) + remainder
+            lines = data.split(b"\n")
+            # 第一段可能是不完整的行，留到下一块拼接
+            remainder = lines.pop(0)
+            if first_block and lines and lines[-1] == b"":
+                # 文件以换行结尾，末尾的空串不是一行
+                lines.pop()
+            first_block = False
+            for line in reversed(lines):
+                yield line.rstrip(b"\r").decode(encoding, errors="replace")
+
+        # 读到文件开头时 remainder 就是第一行；因 max_bytes 截断时丢弃不完整行
+        if position == 0 and remainder:
+            yield remainder.rstrip(b"\r").decode(encoding, errors="replace")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日志消息模板聚类
+
+把消息中的可变部分替换为占位符，相同模板的日志归为一类：
+- URL → <url>，本地路径 → <path>
+- SVN revision（r12345）→ r<rev>
+- 长十六进制串（哈希、UUID 片段）→ <hex>
+- 其余数字 → <n>
+
+例如 `合并 r123 到 /work/trunk 完成，耗时 35ms` → `合并 r<rev> 到 <path> 完成，耗时 <n>ms`。
+
+TemplateCounter 只为每个模板保存计数、首末出现时间和一条示例，模板数达到上限后新模板
+计入溢出计数，内存占用与日志量无关。
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# 默认最多保留的模板数
+DEFAULT_MAX_TEMPLATES = 10000
+
+# 示例消息最多保留的字符数
+EXAMPLE_MAX_CHARS = 300
+
+# 路径/URL 结束于空白、引号、括号和中文标点
+_STOP = r"""\s'"<>()\[\]{},;，。；：、）（】【"""
+
+def _mask_hex(match: "re.Match[str]") -> str:
+    """纯数字交给后面的数字规则，含字母的才视为十六进制串"""
+    text = match.group(0)
+    return text if text.isdigit() else "<hex>"
+
+
+# (必须出现的子串, 模式, 占位符)：消息中不含该子串时跳过对应的正则
+_MASKS = [
+    ("://", re.compile(rf"\b[a-zA-Z][a-zA-Z0-9+.-]*://[^{_STOP}]+"), "<url>"),
+    (":", re.compile(rf"(?<![A-Za-z0-9])[A-Za-z]:[\\/][^{_STOP}]*"), "<path>"),
+    ("/", re.compile(rf"(?<![\w.:/])(?:~|\.{{1,2}})?/(?:[^{_STOP}/]+/)+[^{_STOP}/]*"), "<path>"),
+    ("r", re.compile(r"(?<![A-Za-z0-9_])r\d+(?![A-Za-z0-9_])"), "r<rev>"),
+    ("", re.compile(r"(?<![A-Za-z0-9_])[0-9a-fA-F]{8,}(?:-[0-9a-fA-F]{4,})*(?![A-Za-z0-9_])"), _mask_hex),
+    ("", re.compile(r"(?<![A-Za-z_<])-?\d+(?:\.\d+)?"), "<n>"),
+]
+
+# 完全相同的消息（固定文案）直接命中缓存
+_TEMPLATE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=_TEMPLATE_CACHE_SIZE)
+def to_template(message: str) -> str:
+    """把消息中的可变部分替换为占位符"""
+    for required, pattern, replacement in _MASKS:
+        if required in message:
+            message = pattern.sub(replacement, message)
+    return message
+
+
+@dataclass
+class TemplateStats:
+    """一个模板的统计"""
+    level: str
+    tag: str
+    template: str
+    example: str
+    count: int
+    first_seen: datetime
+    last_seen: datetime
+
+
+class TemplateCounter:
+    """按 (level, tag, 模板) 聚合日志"""
+
+    def __init__(self, max_templates: int = DEFAULT_MAX_TEMPLATES):
+        self.max_templates = max_templates
+        self.templates: Dict[Tuple[str, str, str], TemplateStats] = {}
+        self.overflow = 0
+
+    def add(self, level: str, tag: str, message: str, time: datetime):
+        template = to_template(message)
+        key = (level, tag, template)
+        stats = self.templates.get(key)
+        if stats is None:
+            if len(self.templates) >= self.max_templates:
+                self.overflow += 1
+                return
+            self.templates[key] = TemplateStats(level, tag, template, message[:EXAMPLE_MAX_CHARS], 1, time, time)
+            return
+        stats.count += 1
+        if time < stats.first_seen:
+            stats.first_seen = time
+        if time > stats.last_seen:
+            stats.last_seen = time
+
+    def merge(self, other: "TemplateCounter"):
+        """合并另一个计数器（多进程分析各文件后汇总）"""
+        self.overflow += other.overflow
+        for key, stats in other.templates.items():
+            mine = self.templates.get(key)
+            if mine is None:
+                if len(self.templates) >= self.max_templates:
+                    self.overflow += stats.count
+                    continue
+                self.templates[key] = stats
+                continue
+            mine.count += stats.count
+            mine.first_seen = min(mine.first_seen, stats.first_seen)
+            mine.last_seen = max(mine.last_seen, stats.last_seen)
+
+    def top(self, limit: Optional[int] = None) -> List[TemplateStats]:
+        """按出现次数从多到少排列"""
+        ranked = sorted(self.templates.values(), key=lambda stats: (-stats.count, stats.first_seen))
+        return ranked if limit is None else ranked[:limit]
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按时间窗口截取应用日志
+
+日志行只带一天内的时刻 `[HH:MM:SS.mmm]`（formatLogTimestamp），日期来自：
+- latest.log / 归档日志开头的 `# Log created at: <时间>` header（文件创建时间）
+- 没有 header 时来自归档文件名 `app_<时间>.log`：此时应用用文件修改时间命名，
+  因此按"文件结束时间"对齐
+
+日志按时间顺序追加，find_window() 在文件中按字节偏移二分查找：每次探测从探测点对齐到
+下一行行首，只读出行首的时间戳（超长行按块跳过），O(log 文件大小) 次探测即可定位
+[since, until] 对应的字节范围。内存占用与文件大小无关。
+
+- 跨午夜的日志按锚点时刻判断是否进入下一天
+- 跨度超过一天的文件（时刻不再单调）退化为逐行流式扫描，同样只保留当前行
+- 堆栈等续行没有时间戳，跟随上一条带时间戳的日志
+"""
+
+import argparse
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import BinaryIO, Optional, Tuple
+
+from app_log_format import HEADER_PREFIX
+
+# formatLogFileTimestamp 的格式，例如 2026-10-16T22-46-35
+FILE_TIMESTAMP_FORMAT = "%Y-%m-%dT%H-%M-%S"
+
+_ARCHIVE_NAME_PATTERN = re.compile(r"^app_(\d{4}-\d{2}-\d{2}T\d{2}-\d{2}-\d{2})(?:_\d+)?\.log$")
+_LINE_TIME_PATTERN = re.compile(rb"^\[(\d{2}):(\d{2}):(\d{2})\.(\d{3})\]")
+_RELATIVE_PATTERN = re.compile(r"^(\d+)([smhd])$")
+
+# 行首时间戳 `[HH:MM:SS.mmm]` 的长度，也是每行最多需要读取的字节数
+_LINE_PREFIX_BYTES = 14
+_SKIP_CHUNK_BYTES = 64 * 1024
+_HEADER_MAX_BYTES = 256
+
+SECONDS_PER_DAY = 86400
+
+# 行时刻与锚点时刻相差多少秒以上才判定为跨天（容忍时钟回拨和 header 的秒级截断）
+_DAY_TOLERANCE = 60.0
+
+_RELATIVE_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}
+
+
+@dataclass
+class TimeWindow:
+    """时间窗口 [since, until]，None 表示不限"""
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+    def overlaps(self, start: Optional[datetime], end: Optional[datetime]) -> bool:
+        """与 [start, end] 是否可能有交集（未知的一端视为不限）"""
+        if self.since is not None and end is not None and end < self.since:
+            return False
+        if self.until is not None and start is not None and start > self.until:
+            return False
+        return True
+
+    def describe(self) -> str:
+        since = self.since.isoformat(sep=" ", timespec="seconds") if self.since else "不限"
+        until = self.until.isoformat(sep=" ", timespec="seconds") if self.until else "不限"
+        return f"{since} ~ {until}"
+
+
+def parse_time_argument(text: str, now: Optional[datetime] = None) -> datetime:
+    """解析命令行时间参数
+
+    支持：
+    - 完整时间：2026-10-16 22:40、2026-10-16T22:40:05
+    - 当天时刻：22:40、22:40:05
+    - 相对时间：30s、10m、2h、1d（距现在多久以前）
+
+    Raises:
+        ValueError: 格式无法识别
+    """
+    now = now or datetime.now()
+    text = text.strip()
+    match = _RELATIVE_PATTERN.match(text)
+    if match:
+        return now - timedelta(**{_RELATIVE_UNITS[match.group(2)]: int(match.group(1))})
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            pass
+    for fmt in ("%H:%M:%S", "%H:%M"):
+        try:
+            moment = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        return now.replace(hour=moment.hour, minute=moment.minute, second=moment.second, microsecond=0)
+    raise ValueError(f"无法识别的时间: {text}（示例: 2026-10-16 22:40、22:40、10m）")
+
+
+def time_argument(text: str) -> datetime:
+    """argparse 时间参数类型（--since / --until）"""
+    try:
+        return parse_time_argument(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def parse_file_timestamp(text: str) -> Optional[datetime]:
+    """解析 formatLogFileTimestamp 生成的时间字符串"""
+    try:
+        return datetime.strptime(text.strip(), FILE_TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+
+
+def read_header_time(path: Path) -> Optional[datetime]:
+    """读取文件第一行的 `# Log created at:` header"""
+    with open(path, "rb") as f:
+        first_line = f.readline(_HEADER_MAX_BYTES).decode("utf-8", errors="replace")
+    if not first_line.startswith(HEADER_PREFIX):
+        return None
+    return parse_file_timestamp(first_line[len(HEADER_PREFIX):])
+
+
+def archive_name_time(path: Path) -> Optional[datetime]:
+    """从归档文件名 app_<时间>.log（可能带 _序号）中解析时间"""
+    match = _ARCHIVE_NAME_PATTERN.match(path.name)
+    return parse_file_timestamp(match.group(1)) if match else None
+
+
+def _seconds_of_day(moment: datetime) -> float:
+    return moment.hour * 3600 + moment.minute * 60 + moment.second + moment.microsecond / 1e6
+
+
+class LineClock:
+    """把行内时刻换算为以锚点当天零点为原点的秒数
+
+    anchor_is_end 为 False 时锚点是文件开始时间，早于锚点时刻的行属于第二天；
+    为 True 时锚点是文件结束时间，晚于锚点时刻的行属于前一天。
+    """
+
+    def __init__(self, anchor: datetime, anchor_is_end: bool = False):
+        self.midnight = anchor.replace(hour=0, minute=0, second=0, microsecond=0)
+        self.anchor_seconds = _seconds_of_day(anchor)
+        self.anchor_is_end = anchor_is_end
+
+    def line_seconds(self, seconds_of_day: float) -> float:
+        if self.anchor_is_end:
+            if seconds_of_day > self.anchor_seconds + _DAY_TOLERANCE:
+                return seconds_of_day - SECONDS_PER_DAY
+        elif seconds_of_day < self.anchor_seconds - _DAY_TOLERANCE:
+            return seconds_of_day + SECONDS_PER_DAY
+        return seconds_of_day
+
+    def seconds(self, moment: datetime) -> float:
+        return (moment - self.midnight).total_seconds()
+
+
+def _read_line_time(f: BinaryIO) -> Tuple[bool, Optional[float]]:
+    """从当前位置读一行（只保留行首），返回 (是否读到行, 行首时刻秒数或 None)"""
+    prefix = f.readline(_LINE_PREFIX_BYTES)
+    if not prefix:
+        return False, None
+    if not prefix.endswith(b"\n"):
+        # 跳过本行剩余部分，不把整行读入内存
+        while True:
+            chunk = f.readline(_SKIP_CHUNK_BYTES)
+            if not chunk or chunk.endswith(b"\n"):
+                break
+    match = _LINE_TIME_PATTERN.match(prefix)
+    if not match:
+        return True, None
+    hours, minutes, seconds, millis = (int(group) for group in match.groups())
+    return True, hours * 3600 + minutes * 60 + seconds + millis / 1000
+
+
+def _next_timed_line(f: BinaryIO, position: int, size: int) -> Optional[Tuple[int, float]]:
+    """position 处或之后第一条带时间戳的日志：(行首偏移, 行内时刻秒数)"""
+    if position > 0:
+        # 从 position - 1 读到换行符，即对齐到 position 处或之后的第一个行首
+        f.seek(position - 1)
+        f.readline()
+    else:
+        f.seek(0)
+    while True:
+        offset = f.tell()
+        if offset >= size:
+            return None
+        has_line, seconds = _read_line_time(f)
+        if not has_line:
+            return None
+        if seconds is not None:
+            return offset, seconds
+
+
+def _lower_bound(f: BinaryIO, size: int, clock: LineClock, target: float, inclusive: bool) -> int:
+    """第一条时间 >= target（inclusive 为 False 时为 > target）的日志的行首偏移，没有则为 size"""
+    low, high = 0, size
+    while low < high:
+        middle = (low + high) // 2
+        found = _next_timed_line(f, middle, size)
+        if found is None:
+            high = middle
+            continue
+        line_offset, seconds = found
+        line_time = clock.line_seconds(seconds)
+        if line_time > target or (inclusive and line_time == target):
+            high = middle
+        else:
+            # middle 到 line_offset 之间没有带时间戳的行首，直接越过这条日志
+            low = line_offset + 1
+    found = _next_timed_line(f, low, size)
+    return found[0] if found else size
+
+
+def _scan_window(f: BinaryIO, size: int, since: Optional[datetime], until: Optional[datetime], start: datetime) -> Tuple[int, int]:
+    """逐行流式扫描（跨度超过一天的文件），按时刻回退判断跨天"""
+    midnight = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    since_seconds = (since - midnight).total_seconds() if since else None
+    until_seconds = (until - midnight).total_seconds() if until else None
+    begin: Optional[int] = None
+    day_offset = 0.0
+    previous: Optional[float] = None
+    f.seek(0)
+    while True:
+        offset = f.tell()
+        if offset >= size:
+            break
+        has_line, seconds = _read_line_time(f)
+        if not has_line:
+            break
+        if seconds is None:
+            continue
+        if previous is not None and seconds < previous - SECONDS_PER_DAY / 2:
+            day_offset += SECONDS_PER_DAY
+        previous = seconds
+        line_time = seconds + day_offset
+        if until_seconds is not None and line_time > until_seconds:
+            return (begin if begin is not None else offset), offset
+        if begin is None and (since_seconds is None or line_time >= since_seconds):
+            begin = offset
+    return (begin if begin is not None else size), size
+
+
+def file_time_range(path: Path) -> Tuple[Optional[datetime], Optional[datetime], bool]:
+    """文件覆盖的时间范围 (开始, 结束, 开始时间是否来自 header)"""
+    end = datetime.fromtimestamp(path.stat().st_mtime)
+    start = read_header_time(path)
+    if start is not None:
+        return start, end, True
+    named = archive_name_time(path)
+    # 没有 header 时应用用修改时间给归档命名，文件名时间即结束时间
+    return None, named or end, False
+
+
+def find_window(path: Path, window: TimeWindow) -> Optional[Tuple[int, int]]:
+    """文件中落在时间窗口内的字节范围 (offset, end)，没有匹配的日志时返回 None"""
+    start, end, has_header = file_time_range(path)
+    if not window.overlaps(start, end):
+        return None
+    size = path.stat().st_size
+    with open(path, "rb") as f:
+        if has_header and end - start > timedelta(days=1):
+            offset, stop = _scan_window(f, size, window.since, window.until, start)
+        else:
+            clock = LineClock(start, anchor_is_end=False) if has_header else LineClock(end, anchor_is_end=True)
+            offset = _lower_bound(f, size, clock, clock.seconds(window.since), True) if window.since else 0
+            if window.until is None:
+                stop = size
+            else:
+                stop = _lower_bound(f, size, clock, clock.seconds(window.until), False)
+    if stop <= offset:
+        return None
+    return offset, stop
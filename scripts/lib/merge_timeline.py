@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+从应用日志重建合并任务时间线
+
+与 lib/providers/merge_execution_state.dart 的日志契约一致（_appendLog 以 MERGE tag
+写入应用日志，消息自带 `[INFO] ` 等前缀）：
+
+任务
+- 开始：`开始执行任务 #<id>`（首次执行、继续执行和跳过 revision 后都会重新输出）
+- 结束：`任务 #<id> 执行成功` / `任务 #<id> 已恢复并完成` /
+  `任务 #<id> 已完成（部分 revision 被跳过）` / `任务 #<id> 已终止`
+
+revision 与步骤（准备 → 更新 → 合并 → 校验 → 提交）
+- revision 开始：`开始处理 revision r<rev> (<i>/<n>)...`，完成：`r<rev> 处理完成`
+- 步骤开始：`开始执行步骤: <步骤名>`，步骤在下一步骤开始、revision 完成或失败时结束
+- 失败：`<步骤名>失败: <原因>`；提交时工作副本过期重试：
+  `提交时检测到 out-of-date，准备进行第 i/n 次重试`（之后回到更新步骤）
+
+暂停
+- 暂停本身没有日志：任务失败后停止输出，直到 `继续执行暂停的任务 #<id>`、
+  `跳过 revision r<rev>` 或 `正在终止任务 #<id>`，期间记为等待人工处理
+- 应用重启时输出 `检测到暂停的任务 #<id>` 和 `  暂停原因: ...`，中途退出（崩溃/强制关闭）
+  的任务从最后一条日志起记为暂停
+
+时间线与 queue.json（任务 id、revision、状态）按任务 id 关联。
+"""
+
+import json
+import re
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app_log_paths import get_app_support_roots
+from app_log_reader import LogRecord
+
+MERGE_TAG = "MERGE"
+QUEUE_FILE_NAME = "queue.json"
+
+# 与 merge_execution_state.dart 中 steps 的顺序和标题一致
+STEPS = [
+    ("prepare", "准备"),
+    ("update", "更新"),
+    ("merge", "合并"),
+    ("validate", "校验"),
+    ("commit", "提交"),
+]
+STEP_IDS = {title: step_id for step_id, title in STEPS}
+
+# 与后台预加载/日志同步并发执行的只读查询，不计入合并步骤的 SVN 耗时
+BACKGROUND_OPERATIONS = ("head", "log", "log_probe")
+
+_PREFIX = re.compile(r"^\[(?:DEBUG|INFO|WARN|ERROR)\] ")
+_JOB_START = re.compile(r"^开始执行任务 #(\d+)$")
+_JOB_DONE = re.compile(r"^任务 #(\d+) (执行成功|已恢复并完成|已完成（部分 revision 被跳过）|已终止)$")
+_JOB_RESUME = re.compile(r"^继续执行暂停的任务 #(\d+)$")
+_JOB_CANCEL = re.compile(r"^正在终止任务 #(\d+)$")
+_CANCEL_REQUEST = re.compile(r"^已提交任务 #(\d+) 的终止请求")
+_JOB_PAUSED_ON_START = re.compile(r"^检测到暂停的任务 #(\d+)$")
+_PAUSE_REASON = "暂停原因: "
+_SOURCE_URL = "源 URL: "
+_REVISION_START = re.compile(r"^开始处理 revision r(\d+) \((\d+)/(\d+)\)")
+_REVISION_DONE = re.compile(r"^r(\d+) 处理完成$")
+_REVISION_SKIP = re.compile(r"^跳过 revision r(\d+)$")
+_STEP_START = re.compile(r"^开始执行步骤: (\S+)$")
+_STEP_FAILED = re.compile(r"^(" + "|".join(title for _, title in STEPS) + r")失败: (.*)$")
+_COMMIT_RETRY = re.compile(r"^提交时检测到 out-of-date，准备进行第 (\d+)/(\d+) 次重试")
+_COMMIT_EXHAUSTED = ("工作副本过期，已达到最大重试次数", "工作副本过期，当前任务未启用重试")
+
+_JOB_RESULTS = {
+    "执行成功": "done",
+    "已恢复并完成": "done",
+    "已完成（部分 revision 被跳过）": "done",
+    "已终止": "cancelled",
+}
+
+
+@dataclass
+class StepAttempt:
+    """一次步骤执行"""
+    step: str
+    title: str
+    attempt: int
+    started: datetime
+    ended: Optional[datetime] = None
+    result: str = "running"
+    error: str = ""
+    svn_seconds: float = 0.0
+
+    @property
+    def duration(self) -> float:
+        return (self.ended - self.started).total_seconds() if self.ended else 0.0
+
+
+@dataclass
+class RevisionRun:
+    """一次 revision 处理（继续执行暂停的任务时同一 revision 会再出现一次）"""
+    revision: int
+    index: int
+    total: int
+    started: datetime
+    ended: Optional[datetime] = None
+    result: str = "running"
+    retries: int = 0
+    steps: List[StepAttempt] = field(default_factory=list)
+
+
+@dataclass
+class PauseInterval:
+    """一段等待人工处理的时间，ended 为空表示日志结束时仍在暂停"""
+    started: datetime
+    ended: Optional[datetime] = None
+    revision: Optional[int] = None
+    reason: str = ""
+    resolution: str = ""
+
+
+@dataclass
+class JobTimeline:
+    """一个合并任务的时间线"""
+    job_id: int
+    started: datetime
+    ended: Optional[datetime] = None
+    result: str = "running"
+    source_url: str = ""
+    revisions: List[RevisionRun] = field(default_factory=list)
+    pauses: List[PauseInterval] = field(default_factory=list)
+    queue: Optional[Dict[str, Any]] = None
+    last_activity: Optional[datetime] = None
+
+    def steps(self) -> List[StepAttempt]:
+        return [step for run in self.revisions for step in run.steps]
+
+
+class MergeTimelineCollector:
+    """按时间顺序接收 MERGE tag 的日志，重建各任务的时间线
+
+    暂停和应用重启会跨越多个日志文件，所有文件的日志需按时间顺序交给同一个实例。
+    """
+
+    def __init__(self):
+        self.jobs: Dict[int, JobTimeline] = {}
+        self.last_time: Optional[datetime] = None
+        self._current: Optional[JobTimeline] = None
+        self._paused: Optional[JobTimeline] = None
+        self._cancel_requested: set = set()
+        self._attempts: Dict[Tuple[int, int, str], int] = {}
+
+    def add(self, record: LogRecord):
+        if record.tag != MERGE_TAG:
+            return
+        now = record.time
+        self.last_time = now
+        message = _PREFIX.sub("", record.message.strip())
+
+        match = _JOB_START.match(message)
+        if match:
+            self._start_job(int(match.group(1)), now)
+            return
+        match = _JOB_RESUME.match(message)
+        if match:
+            self._end_pause(int(match.group(1)), now, "resume")
+            return
+        match = _CANCEL_REQUEST.match(message)
+        if match:
+            self._cancel_requested.add(int(match.group(1)))
+            return
+        match = _JOB_CANCEL.match(message)
+        if match:
+            job_id = int(match.group(1))
+            if job_id in self._cancel_requested:
+                # 运行中的任务在步骤边界被终止，没有暂停
+                self._cancel_requested.discard(job_id)
+            else:
+                self._end_pause(job_id, now, "cancel")
+            return
+        match = _REVISION_SKIP.match(message)
+        if match:
+            job = self._paused or self._current
+            if job is not None:
+                self._end_pause(job.job_id, now, "skip")
+            return
+        match = _JOB_PAUSED_ON_START.match(message)
+        if match:
+            self._restarted_with_paused_job(int(match.group(1)), now)
+            return
+        if message.startswith(_PAUSE_REASON):
+            job = self._paused
+            if job is not None and job.pauses and job.pauses[-1].ended is None:
+                job.pauses[-1].reason = message[len(_PAUSE_REASON):]
+            return
+        match = _JOB_DONE.match(message)
+        if match:
+            self._finish_job(int(match.group(1)), now, _JOB_RESULTS[match.group(2)])
+            return
+
+        job = self._current
+        if job is None:
+            return
+        job.last_activity = now
+        if message.startswith(_SOURCE_URL):
+            job.source_url = message[len(_SOURCE_URL):]
+            return
+        match = _REVISION_START.match(message)
+        if match:
+            self._close_revision(job, now, "interrupted")
+            job.revisions.append(
+                RevisionRun(int(match.group(1)), int(match.group(2)), int(match.group(3)), now)
+            )
+            return
+        run = job.revisions[-1] if job.revisions and job.revisions[-1].ended is None else None
+        if run is None:
+            return
+        match = _STEP_START.match(message)
+        if match:
+            self._start_step(job, run, match.group(1), now)
+            return
+        running = run.steps[-1] if run.steps and run.steps[-1].ended is None else None
+        match = _STEP_FAILED.match(message)
+        if match and running is not None:
+            self._close_step(running, now, "failed", match.group(2))
+            return
+        match = _COMMIT_RETRY.match(message)
+        if match and running is not None:
+            self._close_step(running, now, "retry", f"out-of-date，第 {match.group(1)}/{match.group(2)} 次重试")
+            return
+        if message.startswith(_COMMIT_EXHAUSTED) and running is not None:
+            self._close_step(running, now, "failed", message)
+            return
+        if _REVISION_DONE.match(message):
+            self._close_revision(job, now, "done")
+
+    def _start_job(self, job_id: int, now: datetime):
+        if self._current is not None and self._current.job_id != job_id:
+            self._suspend(self._current, "interrupted")
+        job = self.jobs.get(job_id)
+        if job is None:
+            job = self.jobs[job_id] = JobTimeline(job_id, now)
+        elif job.pauses and job.pauses[-1].ended is None:
+            self._end_pause(job_id, now, "resume")
+        job.result = "running"
+        job.ended = None
+        job.last_activity = now
+        self._current = job
+
+    def _finish_job(self, job_id: int, now: datetime, result: str):
+        job = self.jobs.get(job_id)
+        if job is None:
+            return
+        if job.pauses and job.pauses[-1].ended is None:
+            # 恢复时核对到已提交，直接完成，没有重新开始执行
+            self._end_pause(job_id, now, "resume" if result == "done" else "cancel")
+        self._close_revision(job, now, "cancelled" if result == "cancelled" else "interrupted")
+        job.result = result
+        job.ended = now
+        if self._current is job:
+            self._current = None
+        if self._paused is job:
+            self._paused = None
+
+    def _restarted_with_paused_job(self, job_id: int, now: datetime):
+        """应用启动时检测到暂停的任务：上次运行中途退出的任务从最后一条日志起进入暂停"""
+        job = self.jobs.get(job_id)
+        if job is None:
+            # 暂停发生在已读取的日志之前，只能从本次启动开始计
+            job = self.jobs[job_id] = JobTimeline(job_id, now, ended=now, result="paused")
+            job.pauses.append(PauseInterval(now))
+        elif job.result == "running":
+            self._suspend(job, "interrupted")
+        if self._current is job:
+            self._current = None
+        self._paused = job
+
+    def _start_step(self, job: JobTimeline, run: RevisionRun, title: str, now: datetime):
+        previous = run.steps[-1] if run.steps else None
+        if previous is not None and previous.ended is None:
+            self._close_step(previous, now, "ok")
+        elif previous is not None and previous.result in ("failed", "retry"):
+            run.retries += 1
+        step_id = STEP_IDS.get(title, title)
+        key = (job.job_id, run.revision, step_id)
+        self._attempts[key] = self._attempts.get(key, 0) + 1
+        run.steps.append(StepAttempt(step_id, title, self._attempts[key], now))
+
+    @staticmethod
+    def _close_step(step: StepAttempt, now: datetime, result: str, error: str = ""):
+        step.ended = now
+        step.result = result
+        step.error = error
+
+    def _close_revision(self, job: JobTimeline, now: datetime, result: str):
+        run = job.revisions[-1] if job.revisions else None
+        if run is None or run.ended is not None:
+            return
+        if run.steps and run.steps[-1].ended is None:
+            self._close_step(run.steps[-1], now, "ok" if result == "done" else result)
+        run.ended = now
+        run.result = result
+
+    def _suspend(self, job: JobTimeline, result: str):
+        """任务停止输出但没有结束日志：从最后一条日志起进入暂停
+
+        最后一个步骤失败的是正常暂停，否则是中途退出或失去响应（result）。
+        """
+        stopped = job.last_activity or job.started
+        run = job.revisions[-1] if job.revisions else None
+        last_step = run.steps[-1] if run is not None and run.steps else None
+        failed = last_step is not None and last_step.result == "failed"
+        self._close_revision(job, stopped, "paused" if failed else result)
+        job.result = "paused"
+        job.ended = stopped
+        job.pauses.append(
+            PauseInterval(
+                stopped,
+                revision=run.revision if run is not None else None,
+                reason=last_step.error if failed else "",
+            )
+        )
+        if self._current is job:
+            self._current = None
+        self._paused = job
+
+    def _end_pause(self, job_id: int, now: datetime, resolution: str):
+        job = self.jobs.get(job_id)
+        if job is None:
+            return
+        if job.result == "running":
+            self._suspend(job, "interrupted")
+        if job.pauses and job.pauses[-1].ended is None:
+            job.pauses[-1].ended = now
+            job.pauses[-1].resolution = resolution
+        if self._paused is job:
+            self._paused = None
+
+    def finish(self):
+        """日志结束：最后一个步骤失败的任务视为暂停中，其余保持 running"""
+        job = self._current
+        if job is None:
+            return
+        run = job.revisions[-1] if job.revisions else None
+        if run is not None and run.steps and run.steps[-1].result == "failed":
+            self._suspend(job, "paused")
+
+
+def attribute_svn_time(jobs: List[JobTimeline], commands: List[Tuple[datetime, datetime]]):
+    """把 SVN 命令（开始, 结束）与步骤重叠的时长计入步骤的 svn_seconds"""
+    commands = sorted(commands)
+    starts = [started for started, _ in commands]
+    longest = max(((ended - started) for started, ended in commands), default=None)
+    if longest is None:
+        return
+    for job in jobs:
+        for step in job.steps():
+            if step.ended is None:
+                continue
+            index = bisect_left(starts, step.started - longest)
+            while index < len(commands) and commands[index][0] < step.ended:
+                started, ended = commands[index]
+                overlap = (min(ended, step.ended) - max(started, step.started)).total_seconds()
+                if overlap > 0:
+                    step.svn_seconds += overlap
+                index += 1
+
+
+@dataclass
+class TimeSplit:
+    """任务墙钟时间的拆分（秒）"""
+    wall: float
+    svn: float
+    step_other: float
+    waiting: float
+    idle: float
+    retries: int
+    ongoing_pause: bool
+
+
+def split_time(job: JobTimeline, log_end: Optional[datetime]) -> TimeSplit:
+    """墙钟时间 = SVN 命令 + 步骤内其他工作（校验脚本、本地处理）+ 等待人工 + 步骤之间的调度/刷新"""
+    end = job.ended or job.last_activity or job.started
+    ongoing = bool(job.pauses) and job.pauses[-1].ended is None
+    if ongoing and log_end is not None:
+        end = max(end, log_end)
+    wall = (end - job.started).total_seconds()
+    steps = job.steps()
+    step_time = sum(step.duration for step in steps)
+    svn = min(sum(step.svn_seconds for step in steps), step_time)
+    waiting = sum(((pause.ended or end) - pause.started).total_seconds() for pause in job.pauses)
+    return TimeSplit(
+        wall=wall,
+        svn=svn,
+        step_other=step_time - svn,
+        waiting=waiting,
+        idle=max(0.0, wall - step_time - waiting),
+        retries=sum(run.retries for run in job.revisions),
+        ongoing_pause=ongoing,
+    )
+
+
+def find_queue_file() -> Optional[Path]:
+    """应用支持目录中的 queue.json"""
+    for root in get_app_support_roots():
+        path = root / QUEUE_FILE_NAME
+        if path.exists():
+            return path
+    return None
+
+
+def load_queue(path: Path) -> Dict[int, Dict[str, Any]]:
+    """读取 queue.json（`{"jobs": [MergeJob.toJson()...]}`），按任务 id 索引"""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return {int(job["jobId"]): job for job in data.get("jobs", []) if "jobId" in job}
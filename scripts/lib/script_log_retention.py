@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+脚本日志保留策略
+
+与应用侧 logger_service.dart 的 app_*.log 清理策略对应（最多 10 个、总量 50MB），
+按"运行"为单位管理 logs/scripts/ 下的文件：
+
+- 一次运行 = 同一 {脚本名}_{时间戳} 前缀的所有文件
+  （.log / .log.gz / .trace.json / .cmdNN.txt.gz 等）
+- 阶段 1：每个脚本最多保留 MAX_RUNS_PER_SCRIPT 次运行
+- 阶段 2：所有运行总大小超过 MAX_TOTAL_BYTES 时，从最旧的运行开始删除
+- 阶段 3：每个脚本最新的 KEEP_UNCOMPRESSED 次运行之外，把 .log 压缩为 .log.gz
+
+受保护的运行（当前正在写入的日志、各脚本 *_latest.log 指向的日志）
+不会被删除或压缩，保证 get_latest_log / check_script_result 始终可用。
+决策（plan_retention）与执行（apply_retention）分离，决策是纯函数。
+"""
+
+import atexit
+import gzip
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+MAX_RUNS_PER_SCRIPT = 10
+MAX_TOTAL_BYTES = 50 * 1024 * 1024
+KEEP_UNCOMPRESSED = 2
+
+# 压缩中断留下的临时文件超过该时间后清理
+STALE_TEMP_SECONDS = 3600
+
+_RUN_FILE_PATTERN = re.compile(r"^(?P<script>.+)_(?P<stamp>\d{8}_\d{6})(?P<suffix>\..+)$")
+_TEMP_SUFFIX = ".tmp"
+
+
+@dataclass
+class RunFiles:
+    """一次运行对应的全部文件"""
+    script: str
+    stamp: str
+    files: List[Path] = field(default_factory=list)
+    size_bytes: int = 0
+
+    @property
+    def run_id(self) -> str:
+        return f"{self.script}_{self.stamp}"
+
+
+@dataclass
+class RetentionPlan:
+    """保留策略的决策结果"""
+    to_delete: List[Path]
+    to_compress: List[Path]
+    kept_runs: int
+    final_total_bytes: int
+
+
+def scan_runs(log_dir: Path) -> List[RunFiles]:
+    """扫描日志目录，按运行分组"""
+    runs: Dict[str, RunFiles] = {}
+    for entry in os.scandir(log_dir):
+        if not entry.is_file(follow_symlinks=False):
+            continue
+        match = _RUN_FILE_PATTERN.match(entry.name)
+        if not match or entry.name.endswith(_TEMP_SUFFIX):
+            continue
+        run_id = f"{match.group('script')}_{match.group('stamp')}"
+        run = runs.setdefault(run_id, RunFiles(match.group("script"), match.group("stamp")))
+        run.files.append(Path(entry.path))
+        run.size_bytes += entry.stat(follow_symlinks=False).st_size
+    return list(runs.values())
+
+
+def find_protected_runs(log_dir: Path, extra: Iterable[str] = ()) -> Set[str]:
+    """收集受保护的运行 ID：*_latest.log 指向的日志及调用方指定的运行"""
+    protected = set(extra)
+    for link in log_dir.glob("*_latest.log"):
+        try:
+            if link.is_symlink():
+                target_name = os.readlink(link)
+            else:
+                # Windows 下 latest 文件内容是实际日志文件名
+                target_name = link.read_text(encoding="utf-8").strip()
+        except OSError:
+            continue
+        match = _RUN_FILE_PATTERN.match(Path(target_name).name)
+        if match:
+            protected.add(f"{match.group('script')}_{match.group('stamp')}")
+    return protected
+
+
+def plan_retention(
+    runs: List[RunFiles],
+    protected: Set[str],
+    max_runs_per_script: int = MAX_RUNS_PER_SCRIPT,
+    max_total_bytes: int = MAX_TOTAL_BYTES,
+    keep_uncompressed: int = KEEP_UNCOMPRESSED,
+) -> RetentionPlan:
+    """计算需要删除和压缩的文件（纯函数）"""
+    by_script: Dict[str, List[RunFiles]] = defaultdict(list)
+    for run in runs:
+        by_script[run.script].append(run)
+    for script_runs in by_script.values():
+        script_runs.sort(key=lambda run: run.stamp, reverse=True)
+
+    deleted: Set[str] = set()
+
+    # 阶段 1：每个脚本保留最近 max_runs_per_script 次
+    for script_runs in by_script.values():
+        for run in script_runs[max_runs_per_script:]:
+            if run.run_id not in protected:
+                deleted.add(run.run_id)
+
+    # 阶段 2：总大小超限时从最旧的开始删除（每个脚本最新一次始终保留）
+    newest = {script_runs[0].run_id for script_runs in by_script.values() if script_runs}
+    remaining = [run for run in runs if run.run_id not in deleted]
+    total = sum(run.size_bytes for run in remaining)
+    for run in sorted(remaining, key=lambda item: item.stamp):
+        if total <= max_total_bytes:
+            break
+        if run.run_id in protected or run.run_id in newest:
+            continue
+        deleted.add(run.run_id)
+        total -= run.size_bytes
+
+    # 阶段 3：较旧运行的 .log 压缩为 .log.gz
+    to_compress: List[Path] = []
+    for script_runs in by_script.values():
+        for run in script_runs[keep_uncompressed:]:
+            if run.run_id in deleted or run.run_id in protected:
+                continue
+            to_compress.extend(path for path in run.files if path.name.endswith(".log"))
+
+    to_delete = [path for run in runs if run.run_id in deleted for path in run.files]
+    return RetentionPlan(
+        to_delete=to_delete,
+        to_compress=to_compress,
+        kept_runs=len(runs) - len(deleted),
+        final_total_bytes=total,
+    )
+
+
+def _gzip_file(path: Path):
+    """把文件压缩为同名 .gz（先写临时文件再原子替换），成功后删除原文件"""
+    target = path.with_name(path.name + ".gz")
+    temp = path.with_name(f"{target.name}.{os.getpid()}{_TEMP_SUFFIX}")
+    try:
+        with open(path, "rb") as source, gzip.open(temp, "wb", compresslevel=6) as dest:
+            shutil.copyfileobj(source, dest, 1024 * 1024)
+        shutil.copystat(path, temp)
+        os.replace(temp, target)
+        path.unlink()
+    finally:
+        if temp.exists():
+            temp.unlink()
+
+
+def _remove_stale_temp_files(log_dir: Path):
+    now = time.time()
+    for temp in log_dir.glob(f"*{_TEMP_SUFFIX}"):
+        try:
+            if now - temp.stat().st_mtime > STALE_TEMP_SECONDS:
+                temp.unlink()
+        except OSError:
+            pass
+
+
+def apply_retention(log_dir: Path, current_run: Optional[str] = None) -> RetentionPlan:
+    """执行保留策略
+
+    Args:
+        log_dir: 日志目录
+        current_run: 当前正在写入的运行 ID（{脚本名}_{时间戳}），始终受保护
+
+    Returns:
+        执行的计划
+    """
+    _remove_stale_temp_files(log_dir)
+    extra = [current_run] if current_run else []
+    plan = plan_retention(scan_runs(log_dir), find_protected_runs(log_dir, extra))
+
+    for path in plan.to_delete:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+    for path in plan.to_compress:
+        try:
+            _gzip_file(path)
+        except FileNotFoundError:
+            # 另一个并发脚本已处理
+            pass
+    return plan
+
+
+def start_background_retention(log_dir: Path, current_run: str, join_timeout: float = 10.0) -> threading.Thread:
+    """在后台线程中执行保留策略
+
+    解释器退出时最多等待 join_timeout 秒；未完成的压缩只会留下临时文件，
+    下次运行时清理。
+    """
+    def run():
+        try:
+            apply_retention(log_dir, current_run)
+        except Exception as e:
+            print(f"[WARN] 日志保留策略执行失败: {e}", file=sys.stderr)
+
+    thread = threading.Thread(target=run, name="log-retention", daemon=True)
+    thread.start()
+    atexit.register(thread.join, join_timeout)
+    return thread
@@ -8,13 +8,155 @@ AI 必须通过日志文件判断脚本执行结果，而非标准输出。
 
 日志文件位置：logs/scripts/{脚本名}_{时间戳}.log
 最新日志链接：logs/scripts/{脚本名}_latest.log
+计时追踪文件：logs/scripts/{脚本名}_{时间戳}.trace.json（Chrome trace-event 格式）
+运行索引：logs/scripts/runs.jsonl（每次运行结束追加一行，见 script_run_index.py）
+运行历史：logs/scripts/history.sqlite3（版本/平台/模式及各步骤耗时，见 build_history.py）
+保留策略：每个脚本最多保留 10 次运行、总量 50MB，较旧日志后台压缩为 .log.gz
+         （见 script_log_retention.py）
+
+写入模式：
+- 直写模式（默认）：每行打开、追加、关闭日志文件，适合短脚本
+- 缓冲模式（buffered=True）：保持单个文件句柄，由后台线程按批量/时间间隔刷盘，
+  适合会输出大量命令日志的构建脚本；写入尾部前和解释器退出时保证刷盘
 """
 
+import atexit
 import os
+import queue
 import sys
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from build_history import HISTORY_FILE_NAME, HistoryRun, StepTiming, record_run
+from log_tail import iter_lines_backward
+from script_log_retention import start_background_retention
+from script_run_index import RunRecord, append_run
+from script_trace import Span, TraceRecorder
+
+# check_script_result 最多从日志末尾向前扫描的字节数（尾部只有几十行，足够覆盖）
+RESULT_SCAN_BYTES = 256 * 1024
+
+
+class _DirectLogWriter:
+    """直写模式：每行单独打开、追加、关闭日志文件"""
+
+    def __init__(self, log_file: Path):
+        self.log_file = log_file
+
+    def write(self, line: str):
+        try:
+            with open(self.log_file, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except Exception as e:
+            print(f"[ERROR] 无法写入日志文件: {e}", file=sys.stderr)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class _BufferedLogWriter:
+    """缓冲模式：保持一个文件句柄，后台线程批量写入
+
+    日志行先进入队列，后台线程在累计 batch_size 行或距上次刷盘超过
+    flush_interval 秒时统一写入并 flush。flush() 会阻塞直到调用前入队的
+    所有行都已落盘；close() 在 atexit 中自动调用，保证进程退出前刷盘。
+    """
+
+    _CLOSE = object()
+
+    def __init__(self, log_file: Path, batch_size: int = 64, flush_interval: float = 0.5):
+        self.log_file = log_file
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Union[str, threading.Event, object]]" = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._file = open(log_file, "a", encoding="utf-8")
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"log-writer-{log_file.stem}",
+            daemon=True,
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, line: str):
+        with self._lock:
+            if not self._closed:
+                self._queue.put(line)
+                return
+        # 已关闭（例如 atexit 之后仍有输出）：退化为直写，保证不丢行
+        _DirectLogWriter(self.log_file).write(line)
+
+    def flush(self):
+        """阻塞直到此前入队的日志全部写入文件"""
+        event = threading.Event()
+        with self._lock:
+            if self._closed:
+                return
+            self._queue.put(event)
+        event.wait()
+
+    def close(self):
+        """刷盘并关闭文件句柄，可重复调用"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(self._CLOSE)
+        self._thread.join()
+
+    def _write_batch(self, pending: List[str]):
+        if not pending:
+            return
+        try:
+            self._file.write("\n".join(pending) + "\n")
+            self._file.flush()
+        except Exception as e:
+            print(f"[ERROR] 无法写入日志文件: {e}", file=sys.stderr)
+        pending.clear()
+
+    def _run(self):
+        pending: List[str] = []
+        last_flush = time.monotonic()
+        while True:
+            timeout = None
+            if pending:
+                timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is self._CLOSE:
+                self._write_batch(pending)
+                try:
+                    self._file.close()
+                except Exception:
+                    pass
+                return
+
+            if isinstance(item, threading.Event):
+                self._write_batch(pending)
+                last_flush = time.monotonic()
+                item.set()
+                continue
+
+            if isinstance(item, str):
+                pending.append(item)
+
+            if len(pending) >= self.batch_size or (
+                pending and time.monotonic() - last_flush >= self.flush_interval
+            ):
+                self._write_batch(pending)
+                last_flush = time.monotonic()
 
 
 class ScriptLogger:
@@ -30,17 +172,45 @@ class ScriptLogger:
     # ... 执行操作 ...
     logger.success()  # 或 logger.failed("原因")
     ```
+    
+    输出量大的脚本可使用缓冲模式，减少逐行打开/关闭文件的开销：
+    ```python
+    logger = ScriptLogger("build", buffered=True)
+    ```
+    
+    step()/step_done() 自动记录计时 span，也可用 span() 记录任意嵌套区间：
+    ```python
+    with logger.span("flutter pub get"):
+        ...
+    ```
+    脚本结束时尾部输出各步骤耗时表，并导出 Chrome trace JSON。
+    
+    set_metadata() 记录的版本/平台/模式/产物大小随步骤耗时写入运行历史库：
+    ```python
+    logger.set_metadata(version="1.0.0+5", platform="windows", mode="release")
+    ```
     """
     
-    def __init__(self, script_name: str, log_dir: Optional[Path] = None):
+    def __init__(
+        self,
+        script_name: str,
+        log_dir: Optional[Path] = None,
+        buffered: bool = False,
+        retention: bool = True,
+    ):
         """初始化日志记录器
         
         Args:
             script_name: 脚本名称，用于生成日志文件名
             log_dir: 日志目录，默认为项目根目录下的 logs/scripts/
+            buffered: 是否使用缓冲写入模式（后台线程批量刷盘）
+            retention: 是否在后台执行日志保留策略（删除/压缩旧日志）
         """
         self.script_name = script_name
         self.start_time = datetime.now()
+        self.trace = TraceRecorder()
+        self._step_spans: Dict[int, Span] = {}
+        self.metadata: Dict[str, Any] = {}
         
         # 确定日志目录
         if log_dir:
@@ -57,11 +227,23 @@ class ScriptLogger:
         self.log_file = self.log_dir / f"{script_name}_{timestamp}.log"
         self.latest_link = self.log_dir / f"{script_name}_latest.log"
         
+        # 日志写入器
+        self._writer: Union[_DirectLogWriter, _BufferedLogWriter] = _DirectLogWriter(self.log_file)
+        if buffered:
+            try:
+                self._writer = _BufferedLogWriter(self.log_file)
+            except Exception as e:
+                print(f"[WARN] 无法启用缓冲日志写入，改用直写模式: {e}", file=sys.stderr)
+        
         # 更新最新日志链接（跨平台处理）
         self._update_latest_link()
         
         # 记录脚本开始
         self._write_header()
+        
+        # 清理旧日志（当前日志和各 latest 链接指向的日志受保护）
+        if retention:
+            start_background_retention(self.log_dir, self.log_file.stem)
     
     def _update_latest_link(self):
         """更新最新日志链接"""
@@ -111,11 +293,11 @@ class ScriptLogger:
             print(line)
         
         # 写入日志文件
-        try:
-            with open(self.log_file, "a", encoding="utf-8") as f:
-                f.write(line + "\n")
-        except Exception as e:
-            print(f"[ERROR] 无法写入日志文件: {e}", file=sys.stderr)
+        self._writer.write(line)
+    
+    def flush(self):
+        """确保已记录的日志全部写入文件"""
+        self._writer.flush()
     
     def info(self, message: str):
         """记录信息日志"""
@@ -142,10 +324,43 @@ class ScriptLogger:
             description: 步骤描述
         """
         self.info(f"步骤 {current}/{total}: {description}")
+        # 上一步未调用 step_done 时先结束它，保持步骤 span 互不重叠
+        for number, span in list(self._step_spans.items()):
+            self.trace.end(span)
+            del self._step_spans[number]
+        self._step_spans[current] = self.trace.begin(
+            f"步骤 {current}/{total}: {description}", "step", phase=description
+        )
     
     def step_done(self, current: int, total: int):
         """记录步骤完成"""
-        self.info(f"步骤 {current}/{total}: 完成")
+        span = self._step_spans.pop(current, None)
+        if span is not None:
+            self.trace.end(span)
+            self.info(f"步骤 {current}/{total}: 完成（{span.duration:.1f} 秒）")
+        else:
+            self.info(f"步骤 {current}/{total}: 完成")
+    
+    @contextmanager
+    def span(self, name: str, category: str = "step", quiet: bool = False, **args: Any) -> Iterator[Span]:
+        """记录一个可嵌套的计时区间
+        
+        Args:
+            name: 区间名称
+            category: 类别（step 计入尾部耗时表，command 等仅导出到 trace）
+            quiet: 是否不输出开始/结束日志
+            **args: 附加到 trace 事件的参数
+        """
+        if not quiet:
+            self.info(f"开始: {name}")
+        with self.trace.span(name, category, **args) as span:
+            yield span
+        if not quiet:
+            self.info(f"完成: {name}（{span.duration:.1f} 秒）")
+    
+    def set_metadata(self, **fields: Any):
+        """设置写入运行历史的字段（version / platform / mode / artifact_bytes）"""
+        self.metadata.update(fields)
     
     def command(self, cmd: str):
         """记录执行的命令"""
@@ -169,16 +384,39 @@ class ScriptLogger:
             for line in lines:
                 self._log("INFO", f"  | {line}")
     
+    def command_output_line(self, line: str):
+        """记录一行实时命令输出（流式采集时使用）"""
+        self._log("INFO", f"  | {line}")
+    
+    def _write_step_table(self):
+        """写入各步骤耗时表（仅 step 类别，按开始时间排序并按嵌套缩进）"""
+        spans = [span for span in self.trace.spans if span.category == "step"]
+        if not spans:
+            return
+        
+        self._log("INFO", "步骤耗时:")
+        name_width = max(len(span.name) + span.depth * 2 for span in spans)
+        for span in sorted(spans, key=lambda item: item.start):
+            label = ("  " * span.depth + span.name).ljust(name_width)
+            suffix = " (未完成)" if span.args.get("unfinished") else ""
+            self._log("INFO", f"  {label}  {span.duration:8.1f} 秒{suffix}")
+    
     def _write_footer(self, result: str, reason: str = ""):
         """写入日志尾部"""
+        # 先刷出缓冲中的日志，保证尾部一定位于所有输出之后
+        self._writer.flush()
         end_time = datetime.now()
         duration = (end_time - self.start_time).total_seconds()
         
+        self.trace.close_open_spans()
+        
         separator = "=" * 50
         self._log("INFO", separator)
         self._log("INFO", f"{self.script_name} 脚本执行完成")
         self._log("INFO", separator)
         
+        self._write_step_table()
+        
         if reason:
             self._log("INFO" if result == "SUCCESS" else "ERROR", f"结果: {result} - {reason}")
         else:
@@ -186,6 +424,67 @@ class ScriptLogger:
         
         self._log("INFO", f"耗时: {duration:.1f} 秒")
         self._log("INFO", f"日志文件: {self.log_file}")
+        
+        trace_file = self.get_artifact_path(".trace.json")
+        try:
+            self.trace.write_chrome_trace(trace_file, self.script_name)
+            self._log("INFO", f"计时追踪: {trace_file}")
+        except Exception as e:
+            self._log("WARN", f"无法写入计时追踪文件: {e}")
+        
+        # 尾部写完立即落盘，check_script_result 读取时结果行已在文件中
+        self._writer.flush()
+        
+        try:
+            append_run(
+                RunRecord(
+                    script=self.script_name,
+                    start=self.start_time.isoformat(timespec="seconds"),
+                    result=result,
+                    duration=round(duration, 3),
+                    log=self.log_file.name,
+                    reason=reason,
+                ),
+                self.log_dir,
+            )
+        except Exception as e:
+            print(f"[WARN] 无法更新运行索引: {e}", file=sys.stderr)
+        
+        self._record_history(result, reason, duration)
+    
+    def _record_history(self, result: str, reason: str, duration: float):
+        """把本次运行及各步骤耗时写入运行历史库"""
+        # 步骤名取 phase 参数（step() 的描述，不含编号），编号变化不影响趋势统计
+        steps = [
+            StepTiming(
+                name=str(span.args.get("phase", span.name)),
+                duration=round(span.duration, 3),
+                depth=span.depth,
+                cached=bool(span.args.get("cached")),
+                unfinished=bool(span.args.get("unfinished")),
+            )
+            for span in self.trace.spans
+            if span.category == "step"
+        ]
+        try:
+            record_run(
+                HistoryRun(
+                    script=self.script_name,
+                    started_at=self.start_time.isoformat(timespec="seconds"),
+                    result=result,
+                    reason=reason,
+                    duration=round(duration, 3),
+                    version=self.metadata.get("version"),
+                    platform=self.metadata.get("platform"),
+                    mode=self.metadata.get("mode"),
+                    artifact_bytes=self.metadata.get("artifact_bytes"),
+                    log=self.log_file.name,
+                    steps=steps,
+                ),
+                self.log_dir / HISTORY_FILE_NAME,
+            )
+        except Exception as e:
+            print(f"[WARN] 无法写入运行历史: {e}", file=sys.stderr)
     
     def success(self, message: str = ""):
         """记录脚本执行成功
@@ -210,6 +509,14 @@ class ScriptLogger:
     def get_latest_link(self) -> Path:
         """获取最新日志链接路径"""
         return self.latest_link
+    
+    def get_artifact_path(self, suffix: str) -> Path:
+        """获取与本次日志同名的附属文件路径
+        
+        例如日志为 build_20250101_120000.log，suffix 为 ".cmd01.txt.gz" 时
+        返回 build_20250101_120000.cmd01.txt.gz。
+        """
+        return self.log_dir / f"{self.log_file.stem}{suffix}"
 
 
 def get_latest_log(script_name: str, log_dir: Optional[Path] = None) -> Optional[Path]:
@@ -246,25 +553,38 @@ def get_latest_log(script_name: str, log_dir: Optional[Path] = None) -> Optional
         return latest_link
 
 
-def read_latest_log(script_name: str, log_dir: Optional[Path] = None) -> Optional[str]:
+def read_latest_log(
+    script_name: str,
+    log_dir: Optional[Path] = None,
+    max_bytes: Optional[int] = None,
+) -> Optional[str]:
     """读取指定脚本的最新日志内容
     
     Args:
         script_name: 脚本名称
         log_dir: 日志目录
+        max_bytes: 只读取末尾的字节数（按整行截断），None 表示读取全部
     
     Returns:
         日志内容，如果不存在则返回 None
     """
     log_file = get_latest_log(script_name, log_dir)
-    if log_file and log_file.exists():
+    if not log_file or not log_file.exists():
+        return None
+    if max_bytes is None:
         return log_file.read_text(encoding='utf-8')
-    return None
+    
+    lines = list(iter_lines_backward(log_file, max_bytes=max_bytes))
+    lines.reverse()
+    return '\n'.join(lines)
 
 
 def check_script_result(script_name: str, log_dir: Optional[Path] = None) -> tuple[bool, str]:
     """检查脚本执行结果
     
+    从最新日志末尾向前按块查找结果行，最多扫描 RESULT_SCAN_BYTES 字节，
+    开销与日志大小无关。
+    
     Args:
         script_name: 脚本名称
         log_dir: 日志目录
@@ -272,12 +592,12 @@ def check_script_result(script_name: str, log_dir: Optional[Path] = None) -> tup
     Returns:
         (是否成功, 结果消息)
     """
-    content = read_latest_log(script_name, log_dir)
-    if content is None:
+    log_file = get_latest_log(script_name, log_dir)
+    if not log_file or not log_file.exists():
         return False, "日志文件不存在"
     
     # 查找结果行
-    for line in reversed(content.split('\n')):
+    for line in iter_lines_backward(log_file, max_bytes=RESULT_SCAN_BYTES):
         if '结果: SUCCESS' in line:
             return True, line
         if '结果: FAILED' in line:
@@ -294,6 +614,9 @@ if __name__ == "__main__":
     logger.error("这是一条错误日志")
     logger.step(1, 3, "测试步骤")
     logger.step_done(1, 3)
+    with logger.span("嵌套区间"):
+        with logger.span("子区间", quiet=True):
+            pass
     logger.command("echo hello")
     logger.command_output("hello\nworld")
     logger.success("测试完成")
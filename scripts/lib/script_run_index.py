@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+脚本运行索引
+
+ScriptLogger 写入日志尾部时，向 logs/scripts/runs.jsonl 追加一行运行记录：
+脚本名、开始时间、结果、耗时、日志文件名。查询"某脚本最近 N 次结果"时
+只需从索引末尾向前读取，不必打开任何日志正文。
+
+使用示例：
+```bash
+python scripts/lib/script_run_index.py build -n 10
+python scripts/lib/script_run_index.py build -n 10 --json
+```
+"""
+
+import argparse
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from log_tail import iter_lines_backward
+
+INDEX_FILE_NAME = "runs.jsonl"
+
+# 索引超过该大小时压缩，只保留最近 COMPACT_KEEP_RECORDS 条记录
+COMPACT_THRESHOLD_BYTES = 1024 * 1024
+COMPACT_KEEP_RECORDS = 2000
+
+
+@dataclass
+class RunRecord:
+    """一次脚本运行的索引记录"""
+    script: str
+    start: str
+    result: str
+    duration: float
+    log: str
+    reason: str = ""
+
+
+def get_default_log_dir() -> Path:
+    """默认日志目录：项目根目录/logs/scripts/"""
+    return Path(__file__).parent.parent.parent / "logs" / "scripts"
+
+
+def get_index_file(log_dir: Optional[Path] = None) -> Path:
+    """获取运行索引文件路径"""
+    return (log_dir or get_default_log_dir()) / INDEX_FILE_NAME
+
+
+def append_run(record: RunRecord, log_dir: Optional[Path] = None):
+    """追加一条运行记录
+
+    单行以一次 write 追加，多个脚本并发写入时不会交错。
+    """
+    index_file = get_index_file(log_dir)
+    line = json.dumps(asdict(record), ensure_ascii=False) + "\n"
+    with open(index_file, "a", encoding="utf-8") as f:
+        f.write(line)
+
+    try:
+        if index_file.stat().st_size > COMPACT_THRESHOLD_BYTES:
+            compact_index(log_dir)
+    except OSError:
+        pass
+
+
+def compact_index(log_dir: Optional[Path] = None, keep: int = COMPACT_KEEP_RECORDS):
+    """只保留最近 keep 条记录（原子替换）"""
+    index_file = get_index_file(log_dir)
+    if not index_file.exists():
+        return
+
+    lines: List[str] = []
+    for line in iter_lines_backward(index_file):
+        if line.strip():
+            lines.append(line)
+            if len(lines) >= keep:
+                break
+    lines.reverse()
+
+    temp_file = index_file.with_name(f"{index_file.name}.{os.getpid()}.tmp")
+    temp_file.write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+    os.replace(temp_file, index_file)
+
+
+def query_runs(
+    script_name: Optional[str] = None,
+    limit: int = 10,
+    log_dir: Optional[Path] = None,
+) -> List[RunRecord]:
+    """查询最近的运行记录（最新的在前）
+
+    Args:
+        script_name: 脚本名称，None 表示所有脚本
+        limit: 最多返回的记录数
+        log_dir: 日志目录
+
+    Returns:
+        运行记录列表
+    """
+    index_file = get_index_file(log_dir)
+    if not index_file.exists() or limit <= 0:
+        return []
+
+    records: List[RunRecord] = []
+    for line in iter_lines_backward(index_file):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+            record = RunRecord(**data)
+        except (ValueError, TypeError):
+            continue
+        if script_name is not None and record.script != script_name:
+            continue
+        records.append(record)
+        if len(records) >= limit:
+            break
+    return records
+
+
+def main() -> int:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="查询脚本运行索引")
+    parser.add_argument("script", nargs="?", help="脚本名称，省略则查询所有脚本")
+    parser.add_argument("-n", "--limit", type=int, default=10, help="返回条数，默认 10")
+    parser.add_argument("--log-dir", type=Path, help="日志目录，默认 logs/scripts/")
+    parser.add_argument("--json", action="store_true", help="以 JSON 格式输出")
+    args = parser.parse_args()
+
+    records = query_runs(args.script, args.limit, args.log_dir)
+    if args.json:
+        print(json.dumps([asdict(record) for record in records], ensure_ascii=False, indent=2))
+        return 0
+
+    if not records:
+        print("没有运行记录")
+        return 0
+
+    for record in records:
+        reason = f" - {record.reason}" if record.reason else ""
+        print(
+            f"{record.start}  {record.script:<10} {record.result:<8} "
+            f"{record.duration:8.1f} 秒  {record.log}{reason}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
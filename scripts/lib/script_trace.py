@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+脚本计时 span 记录器
+
+记录可嵌套的计时区间（span），用于分析脚本各步骤/命令的耗时：
+- 每个线程维护独立的 span 栈，嵌套关系按线程区分
+- 可导出为 Chrome trace-event JSON（chrome://tracing 或 https://ui.perfetto.dev 打开）
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+
+@dataclass
+class Span:
+    """一个计时区间（时间为相对记录器起点的秒数）"""
+    name: str
+    category: str
+    start: float
+    thread_id: int
+    depth: int
+    end: Optional[float] = None
+    args: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        """耗时秒数，未结束的 span 返回 0"""
+        if self.end is None:
+            return 0.0
+        return self.end - self.start
+
+
+class TraceRecorder:
+    """span 记录器"""
+
+    def __init__(self):
+        self.origin = time.monotonic()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._thread_ids: Dict[int, int] = {}
+
+    def _now(self) -> float:
+        return time.monotonic() - self.origin
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = []
+            self._local.stack = stack
+        return stack
+
+    def _thread_id(self) -> int:
+        ident = threading.get_ident()
+        with self._lock:
+            if ident not in self._thread_ids:
+                self._thread_ids[ident] = len(self._thread_ids) + 1
+            return self._thread_ids[ident]
+
+    def begin(self, name: str, category: str = "step", **args: Any) -> Span:
+        """开始一个 span，嵌套在当前线程最近一个未结束的 span 之下"""
+        stack = self._stack()
+        span = Span(
+            name=name,
+            category=category,
+            start=self._now(),
+            thread_id=self._thread_id(),
+            depth=len(stack),
+            args=dict(args),
+        )
+        with self._lock:
+            self.spans.append(span)
+        stack.append(span)
+        return span
+
+    def end(self, span: Span, **args: Any):
+        """结束 span；其内部尚未结束的子 span 一并结束"""
+        stack = self._stack()
+        now = self._now()
+        if span in stack:
+            while stack:
+                top = stack.pop()
+                if top.end is None:
+                    top.end = now
+                if top is span:
+                    break
+        elif span.end is None:
+            span.end = now
+        span.args.update(args)
+
+    def current(self, category: Optional[str] = None) -> Optional[Span]:
+        """返回当前线程最近一个未结束的 span（可按类别过滤）"""
+        for span in reversed(self._stack()):
+            if category is None or span.category == category:
+                return span
+        return None
+
+    @contextmanager
+    def span(self, name: str, category: str = "step", **args: Any) -> Iterator[Span]:
+        """以上下文管理器形式记录 span，异常时标记 error"""
+        span = self.begin(name, category, **args)
+        try:
+            yield span
+        except BaseException as error:
+            self.end(span, error=str(error) or type(error).__name__)
+            raise
+        else:
+            self.end(span)
+
+    def close_open_spans(self):
+        """结束所有未结束的 span（脚本提前退出时调用），并标记 unfinished"""
+        now = self._now()
+        with self._lock:
+            for span in self.spans:
+                if span.end is None:
+                    span.end = now
+                    span.args["unfinished"] = True
+
+    def to_chrome_trace(self, process_name: str) -> Dict[str, Any]:
+        """转换为 Chrome trace-event 格式（时间单位：微秒）"""
+        pid = os.getpid()
+        events: List[Dict[str, Any]] = [
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": 0,
+                "args": {"name": process_name},
+            }
+        ]
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            end = span.end if span.end is not None else self._now()
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": round(span.start * 1_000_000),
+                    "dur": round((end - span.start) * 1_000_000),
+                    "pid": pid,
+                    "tid": span.thread_id,
+                    "args": span.args,
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: Path, process_name: str):
+        """写出 Chrome trace-event JSON 文件"""
+        path.write_text(
+            json.dumps(self.to_chrome_trace(process_name), ensure_ascii=False, indent=1),
+            encoding="utf-8",
+        )
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+桌面应用冷启动耗时基准测试
+
+deploy.py --benchmark-startup N 使用：把构建产物启动 N 次，每次跟随应用日志目录下的
+latest.log，记录从启动到以下里程碑的耗时，然后结束应用进程：
+
+- 日志文件创建：出现 `# Log created at:` header（LoggerService._initLogFile）
+- main 启动：`===== SVN 合并助手启动 =====`
+- 服务初始化：`存储服务初始化成功`（SvnService / StorageService 初始化之后）
+- runApp 完成：`应用已启动（runApp 完成）`
+- 日志缓存初始化：`日志缓存服务初始化成功`（主界面调用 PreloadService.init → LogCacheService.init）
+
+header 的耗时按轮询观察到的时间计算；日志行优先使用行内的 `[HH:MM:SS.mmm]` 时间戳
+（应用写日志时的本机时间），不受应用批量 flush 的延迟影响。
+
+每次启动作为一条 script=startup 的运行写入历史库，`python scripts/history.py startup`
+即可查看各版本的启动耗时趋势。
+"""
+
+import os
+import signal
+import subprocess
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from app_log_format import is_header, parse_line
+from app_log_paths import LATEST_LOG_NAME
+from build_history import HistoryRun, StepTiming, percentile, record_run
+
+# 轮询 latest.log 的间隔（秒），也是 header 耗时的分辨率
+POLL_INTERVAL = 0.02
+
+# 结束应用时等待正常退出的秒数，超时后强制结束
+TERMINATE_GRACE_SECONDS = 5.0
+
+HISTORY_SCRIPT_NAME = "startup"
+
+
+@dataclass
+class Milestone:
+    """启动里程碑：message 为 None 表示 latest.log 的 header 行"""
+    name: str
+    description: str
+    message: Optional[str] = None
+
+    def matches(self, line: str) -> bool:
+        if self.message is None:
+            return is_header(line)
+        parsed = parse_line(line)
+        return parsed is not None and parsed.message.startswith(self.message)
+
+
+DEFAULT_MILESTONES = [
+    Milestone("header", "日志文件创建"),
+    Milestone("main", "main 启动", "===== SVN 合并助手启动 ====="),
+    Milestone("services", "服务初始化", "存储服务初始化成功"),
+    Milestone("run_app", "runApp 完成", "应用已启动（runApp 完成）"),
+    Milestone("log_cache", "日志缓存初始化", "日志缓存服务初始化成功"),
+]
+
+
+@dataclass
+class StartupRun:
+    """一次启动的测量结果"""
+    index: int
+    started_at: str
+    timings: Dict[str, float] = field(default_factory=dict)
+    exit_code: Optional[int] = None
+    error: str = ""
+
+
+@dataclass
+class MilestoneStats:
+    """某里程碑在多次启动中的统计"""
+    milestone: Milestone
+    count: int
+    missing: int
+    minimum: float
+    median: float
+    p95: float
+
+
+class LatestLogFollower:
+    """跟随应用本次启动新建的 latest.log
+
+    创建时记录已有 latest.log 的身份（设备号 + inode），应用启动时会把旧文件归档为
+    app_*.log 并新建 latest.log；身份变化（或文件变小）即视为新文件，从头按偏移量读取。
+    """
+
+    def __init__(self, log_dir: Path):
+        self.path = log_dir / LATEST_LOG_NAME
+        self._baseline = self._stat()
+        self._offset = 0
+        self._partial = b""
+        self._following = False
+
+    def _stat(self) -> Optional[os.stat_result]:
+        try:
+            return self.path.stat()
+        except OSError:
+            return None
+
+    def _is_new_file(self, current: os.stat_result) -> bool:
+        if self._baseline is None:
+            return True
+        if (current.st_dev, current.st_ino) != (self._baseline.st_dev, self._baseline.st_ino):
+            return True
+        return current.st_size < self._baseline.st_size
+
+    def poll(self) -> List[str]:
+        """读取新增的完整行"""
+        current = self._stat()
+        if current is None:
+            return []
+        if not self._following:
+            if not self._is_new_file(current):
+                return []
+            self._following = True
+        if current.st_size <= self._offset:
+            return []
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read(current.st_size - self._offset)
+        except OSError:
+            return []
+        self._offset += len(data)
+        lines = (self._partial + data).split(b"\n")
+        self._partial = lines.pop()
+        return [line.rstrip(b"\r").decode("utf-8", errors="replace") for line in lines]
+
+
+def _seconds_of_day(moment: datetime) -> float:
+    return moment.hour * 3600 + moment.minute * 60 + moment.second + moment.microsecond / 1e6
+
+
+def _line_elapsed(line: str, launch_seconds: float, observed: float) -> float:
+    """日志行相对启动的耗时：优先用行内时间戳，解析失败或明显不合理时用观察时间"""
+    parsed = parse_line(line)
+    if parsed is None:
+        return observed
+    elapsed = (parsed.seconds - launch_seconds) % 86400
+    return elapsed if elapsed <= observed + 1.0 else observed
+
+
+def _popen_kwargs() -> Dict[str, object]:
+    if os.name == "nt":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def terminate_app(process: subprocess.Popen):
+    """结束应用进程及其子进程"""
+    if process.poll() is not None:
+        return
+    try:
+        if os.name == "nt":
+            subprocess.run(
+                ["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check=False,
+            )
+        else:
+            os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=TERMINATE_GRACE_SECONDS)
+    except subprocess.TimeoutExpired:
+        if os.name != "nt":
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except OSError:
+                pass
+        process.wait()
+    except OSError:
+        process.kill()
+        process.wait()
+
+
+def measure_startup(
+    command: Sequence[str],
+    log_dir: Path,
+    index: int = 1,
+    milestones: Sequence[Milestone] = tuple(DEFAULT_MILESTONES),
+    timeout: float = 60.0,
+    cwd: Optional[Path] = None,
+) -> StartupRun:
+    """启动一次应用并测量各里程碑耗时，结束后（或超时后）关闭应用"""
+    follower = LatestLogFollower(log_dir)
+    launched_at = datetime.now()
+    launch_seconds = _seconds_of_day(launched_at)
+    run = StartupRun(index=index, started_at=launched_at.isoformat(timespec="seconds"))
+    pending = list(milestones)
+
+    start = time.monotonic()
+    try:
+        process = subprocess.Popen(
+            list(command),
+            cwd=str(cwd) if cwd else None,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            **_popen_kwargs(),
+        )
+    except OSError as e:
+        run.error = f"启动失败: {e}"
+        return run
+
+    try:
+        while pending:
+            exited = process.poll() is not None
+            for line in follower.poll():
+                observed = time.monotonic() - start
+                for milestone in list(pending):
+                    if milestone.matches(line):
+                        elapsed = observed if milestone.message is None else _line_elapsed(
+                            line, launch_seconds, observed
+                        )
+                        run.timings[milestone.name] = round(elapsed, 3)
+                        pending.remove(milestone)
+            if not pending:
+                break
+            if exited:
+                run.exit_code = process.returncode
+                run.error = f"应用提前退出（exit {process.returncode}）"
+                break
+            if time.monotonic() - start >= timeout:
+                run.error = f"{timeout:.0f} 秒内未出现: {', '.join(m.description for m in pending)}"
+                break
+            time.sleep(POLL_INTERVAL)
+    finally:
+        terminate_app(process)
+    return run
+
+
+def summarize(runs: Sequence[StartupRun], milestones: Sequence[Milestone] = tuple(DEFAULT_MILESTONES)) -> List[MilestoneStats]:
+    """按里程碑统计 min / median / p95（只统计出现了该里程碑的启动）"""
+    stats = []
+    for milestone in milestones:
+        values = [run.timings[milestone.name] for run in runs if milestone.name in run.timings]
+        stats.append(
+            MilestoneStats(
+                milestone=milestone,
+                count=len(values),
+                missing=len(runs) - len(values),
+                minimum=min(values) if values else 0.0,
+                median=percentile(values, 50),
+                p95=percentile(values, 95),
+            )
+        )
+    return stats
+
+
+def record_startup_runs(
+    runs: Sequence[StartupRun],
+    db_path: Path,
+    version: Optional[str],
+    platform: Optional[str],
+    mode: Optional[str] = "debug",
+    milestones: Sequence[Milestone] = tuple(DEFAULT_MILESTONES),
+    log: Optional[str] = None,
+):
+    """把每次启动作为一条运行写入历史库（里程碑耗时记为步骤）"""
+    descriptions = {milestone.name: milestone.description for milestone in milestones}
+    for run in runs:
+        record_run(
+            HistoryRun(
+                script=HISTORY_SCRIPT_NAME,
+                started_at=run.started_at,
+                result="FAILED" if run.error else "SUCCESS",
+                reason=run.error,
+                duration=max(run.timings.values(), default=0.0),
+                version=version,
+                platform=platform,
+                mode=mode,
+                log=log,
+                steps=[
+                    StepTiming(name=descriptions.get(name, name), duration=elapsed)
+                    for name, elapsed in run.timings.items()
+                ],
+            ),
+            db_path,
+        )
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+从应用日志中提取 SVN 操作耗时
+
+与 lib/services/svn_service.dart、log_sync_service.dart 的日志契约一致：
+
+SVN 命令（_runSvnCommand）
+- 开始：`[SVN 命令执行] svn <参数>`（formatSvnCommandStartLine，可能带 ` [XML 输出]`、
+  ` (工作目录: ...)` 后缀）
+- 结束：`✓ SVN 命令执行成功 (退出码: 0, 耗时: 123ms)` / `✗ SVN 命令执行失败 (...)`
+  （formatSvnSuccessLine / formatSvnFailureLine）
+
+命令可能并发执行（预加载、多个源同步），结束行按"开始时间 + 耗时 ≈ 结束时间"匹配
+最接近的未结束开始行，再按参数分类：HEAD 查询（`log -l 1`）、svn log 批量获取、
+mergeinfo 读取、merge、commit、update 等。
+
+日志同步（syncFromHead / syncLogs）
+- 开始：`【从 HEAD 同步】开始` / `【步骤 1/5】初始化日志同步服务`
+- 阶段：`【步骤 i/n】<阶段名>`，阶段耗时为到下一阶段（或结束）的间隔
+- 条数：`获取到 N 条日志` / `解析完成，获得 N 条日志`（获取条数，用于计算每秒条数）
+- 结束：`✓ 从 HEAD 同步完成，新增 N 条` / `✓ 日志同步完成，新增 N 条`，
+  以及"没有新日志"等提前返回和失败日志
+"""
+
+import re
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from app_log_reader import LogRecord
+
+SVN_TAG = "SVN"
+
+# 操作分类：(键, 显示名称)，按报告顺序排列
+OPERATIONS = [
+    ("head", "HEAD 查询（svn log -l 1）"),
+    ("log", "svn log 批量获取"),
+    ("log_probe", "分支点/根尾查询（svn log -r 1:HEAD）"),
+    ("mergeinfo", "mergeinfo 读取"),
+    ("merge", "merge"),
+    ("merge_dry_run", "merge --dry-run"),
+    ("commit", "commit"),
+    ("update", "update"),
+    ("info", "info"),
+    ("unknown", "未配对（只有结束日志）"),
+]
+OPERATION_NAMES = dict(OPERATIONS)
+
+# 直方图桶上界（毫秒），最后一个桶为 >= 最大上界
+HISTOGRAM_BOUNDS_MS = (10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000)
+
+# 结束行与开始行的时间允许误差（日志时间戳是毫秒级，写日志本身也有延迟）
+PAIR_TOLERANCE_SECONDS = 1.0
+
+# 未配对的开始行最多保留的数量和时长，防止异常日志导致无限增长
+MAX_PENDING_COMMANDS = 256
+MAX_PENDING_AGE = timedelta(hours=6)
+
+_COMMAND_START = "[SVN 命令执行] svn "
+_COMMAND_RESULT = re.compile(r"^([✓✗]) SVN 命令执行(?:成功|失败) \(退出码: (-?\d+), 耗时: (\d+)ms\)")
+_WORKING_DIR_SUFFIX = re.compile(r" \(工作目录: .*\)$")
+
+_SYNC_STARTS = {"【从 HEAD 同步】开始": "head", "【步骤 1/5】初始化日志同步服务": "full"}
+_SYNC_STEP = re.compile(r"^【步骤 (\d+)/(\d+)】(.+)$")
+_SYNC_ENTRIES = re.compile(r"^\s*(?:获取到|解析完成，获得) (\d+) 条日志")
+_SYNC_DONE = re.compile(r"^✓ (?:从 HEAD 同步|日志同步)完成，新增 (\d+) 条")
+_SYNC_EMPTY = ("没有新数据需要同步", "没有新日志", "截断后没有新日志", "已到达分支点")
+_SYNC_FAILED = ("从 HEAD 同步失败", "日志同步失败")
+_SYNC_DELEGATED = "刷新模式：调用 syncFromHead"
+_SYNC_FETCH_STEPS = ("从 SVN 获取日志", "从 SVN 抓取日志")
+
+
+def classify_command(args: List[str]) -> str:
+    """按 svn 参数分类操作"""
+    options = [arg for arg in args if arg.startswith("-")]
+    positional = [arg for arg in args if not arg.startswith("-")]
+    if not positional:
+        return "unknown"
+    command = positional[0]
+    if command == "log":
+        if "-r" in args and "1:HEAD" in args:
+            return "log_probe"
+        limit = args[args.index("-l") + 1] if "-l" in args[:-1] else None
+        if limit == "1" and "-r" not in args:
+            return "head"
+        return "log"
+    if command == "mergeinfo" or (command in ("propget", "pg") and "svn:mergeinfo" in args):
+        return "mergeinfo"
+    if command == "merge":
+        return "merge_dry_run" if "--dry-run" in options else "merge"
+    if command in ("commit", "ci"):
+        return "commit"
+    if command in ("update", "up"):
+        return "update"
+    return command
+
+
+def parse_command_start(message: str) -> Optional[List[str]]:
+    """解析命令开始行，返回 svn 参数（不含可执行文件）"""
+    if not message.startswith(_COMMAND_START):
+        return None
+    display = _WORKING_DIR_SUFFIX.sub("", message[len(_COMMAND_START):])
+    display = display.replace(" [XML 输出]", "")
+    return display.split()
+
+
+@dataclass
+class SvnCommand:
+    """一次 SVN 命令"""
+    operation: str
+    args: str
+    started: Optional[datetime]
+    ended: datetime
+    duration: float
+    success: bool
+
+
+@dataclass
+class SyncRun:
+    """一次日志同步"""
+    mode: str
+    started: datetime
+    ended: Optional[datetime] = None
+    result: str = "incomplete"
+    fetched: int = 0
+    added: int = 0
+    steps: Dict[str, float] = field(default_factory=dict)
+    fetch_seconds: Optional[float] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        return (self.ended - self.started).total_seconds() if self.ended else None
+
+    @property
+    def entries_per_second(self) -> Optional[float]:
+        """获取日志阶段每秒获取的条数"""
+        if not self.fetched or not self.fetch_seconds:
+            return None
+        return self.fetched / self.fetch_seconds
+
+
+@dataclass
+class _PendingCommand:
+    started: datetime
+    args: List[str]
+
+
+class SvnLatencyCollector:
+    """逐条接收 SVN tag 的日志，配对命令和同步阶段
+
+    每个日志文件（一次应用运行）使用一个实例，文件之间没有跨进程的未结束命令。
+    """
+
+    def __init__(self):
+        self.commands: List[SvnCommand] = []
+        self.syncs: List[SyncRun] = []
+        self.unmatched_results = 0
+        self._pending: List[_PendingCommand] = []
+        self._sync: Optional[SyncRun] = None
+        self._step: Optional[Tuple[str, datetime]] = None
+
+    def add(self, record: LogRecord):
+        if record.tag != SVN_TAG:
+            return
+        message = record.message
+        args = parse_command_start(message)
+        if args is not None:
+            self._pending.append(_PendingCommand(record.time, args))
+            self._trim_pending(record.time)
+            return
+        match = _COMMAND_RESULT.match(message)
+        if match:
+            self._finish_command(record.time, match.group(1) == "✓", int(match.group(3)) / 1000)
+            return
+        self._track_sync(record.time, message.strip())
+
+    def _trim_pending(self, now: datetime):
+        self._pending = [item for item in self._pending if now - item.started <= MAX_PENDING_AGE]
+        del self._pending[:-MAX_PENDING_COMMANDS]
+
+    def _finish_command(self, ended: datetime, success: bool, duration: float):
+        expected = ended - timedelta(seconds=duration)
+        best: Optional[_PendingCommand] = None
+        best_error = PAIR_TOLERANCE_SECONDS
+        for item in self._pending:
+            error = abs((item.started - expected).total_seconds())
+            if item.started <= ended and error <= best_error:
+                best, best_error = item, error
+        if best is None:
+            self.unmatched_results += 1
+            self.commands.append(SvnCommand("unknown", "", None, ended, duration, success))
+            return
+        self._pending.remove(best)
+        self.commands.append(
+            SvnCommand(classify_command(best.args), " ".join(best.args), best.started, ended, duration, success)
+        )
+
+    def _close_step(self, now: datetime):
+        if self._sync is None or self._step is None:
+            return
+        name, started = self._step
+        elapsed = (now - started).total_seconds()
+        self._sync.steps[name] = self._sync.steps.get(name, 0.0) + elapsed
+        if name in _SYNC_FETCH_STEPS:
+            self._sync.fetch_seconds = elapsed
+        self._step = None
+
+    def _close_sync(self, now: datetime, result: str, added: Optional[int] = None):
+        if self._sync is None:
+            return
+        self._close_step(now)
+        self._sync.ended = now
+        self._sync.result = result
+        if added is not None:
+            self._sync.added = added
+        self.syncs.append(self._sync)
+        self._sync = None
+
+    def _track_sync(self, now: datetime, message: str):
+        mode = _SYNC_STARTS.get(message)
+        if mode is not None:
+            if self._sync is not None:
+                self._close_sync(now, "incomplete")
+            self._sync = SyncRun(mode, now)
+        if self._sync is None:
+            return
+
+        step = _SYNC_STEP.match(message)
+        if step:
+            self._close_step(now)
+            self._step = (step.group(3), now)
+            return
+        entries = _SYNC_ENTRIES.match(message)
+        if entries:
+            self._sync.fetched = int(entries.group(1))
+            return
+        done = _SYNC_DONE.match(message)
+        if done:
+            self._close_sync(now, "ok", int(done.group(1)))
+        elif message.startswith(_SYNC_EMPTY):
+            self._close_sync(now, "empty", 0)
+        elif message.startswith(_SYNC_FAILED):
+            self._close_sync(now, "failed")
+        elif message.startswith(_SYNC_DELEGATED):
+            # 刷新模式转交 syncFromHead，由其单独计时
+            self._sync = None
+            self._step = None
+
+    def finish(self):
+        """文件结束：未完成的同步记为 incomplete，未配对的开始行丢弃"""
+        if self._sync is not None:
+            self._sync.result = "incomplete"
+            self.syncs.append(self._sync)
+            self._sync = None
+        self._pending.clear()
+
+
+def histogram(values_ms: List[float]) -> List[Tuple[str, int]]:
+    """按 HISTOGRAM_BOUNDS_MS 分桶计数"""
+    counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+    for value in values_ms:
+        counts[bisect_right(HISTOGRAM_BOUNDS_MS, value)] += 1
+    labels = [f"< {_format_ms(bound)}" for bound in HISTOGRAM_BOUNDS_MS]
+    labels.append(f">= {_format_ms(HISTOGRAM_BOUNDS_MS[-1])}")
+    return list(zip(labels, counts))
+
+
+def _format_ms(value: float) -> str:
+    return f"{value / 1000:g}s" if value >= 1000 else f"{value:g}ms"
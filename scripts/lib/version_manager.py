@@ -8,36 +8,182 @@ Manage project version numbers, supports:
 - Set version number
 - Increment version number
 - Sync version number to project configuration file
+
+In-process usage (build.py / deploy.py):
+```python
+manager = VersionManager(project_root=project_root)
+results = manager.sync_all("app")   # VERSION.yaml is read once, every target updated in one pass
+version = manager.get_version("app")
+```
+
+Sync targets: pubspec.yaml, the fallback version defines in windows/runner/Runner.rc,
+and macos Info.plist / AppInfo.xcconfig when they hold literal versions (Flutter's
+template uses $(FLUTTER_BUILD_NAME) there, which needs no sync). Files are written
+atomically and only when their content changes, so unchanged mtimes do not trigger
+a Flutter rebuild.
 """
 
 import argparse
+import io
 import json
+import os
 import re
+import shutil
 import sys
-import io
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Tuple
-
-# Fix encoding for Windows
-if sys.platform == 'win32':
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+from typing import Callable, List, Optional, Tuple
 
 try:
     import yaml
 except ImportError:
-    print("Error: PyYAML library is required")
-    print("Please run: pip install pyyaml")
-    sys.exit(1)
+    yaml = None
+
+
+@dataclass
+class SyncResult:
+    """Result of syncing the version into one target file"""
+    target: str
+    path: Path
+    status: str  # updated / unchanged / skipped
+    reason: str = ""
+
+
+@dataclass
+class VersionTarget:
+    """A version-bearing file
+
+    Attributes:
+        name: Display name
+        relative_path: Path relative to project root
+        render: Returns the new content for (content, version), or None when the
+            file holds no literal version to sync
+        required: Missing file is an error instead of being skipped
+    """
+    name: str
+    relative_path: Path
+    render: Callable[[str, str], Optional[str]]
+    required: bool = False
+
+
+def write_if_changed(path: Path, content: str) -> bool:
+    """Atomically write content only if it differs from the file on disk
+
+    Returns:
+        Whether the file was written
+    """
+    exists = True
+    try:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            if f.read() == content:
+                return False
+    except FileNotFoundError:
+        exists = False
+    temp_file = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(temp_file, 'w', encoding='utf-8', newline='') as f:
+        f.write(content)
+    if exists:
+        # os.replace installs the temp file's default mode; keep the original permissions
+        shutil.copymode(path, temp_file)
+    os.replace(temp_file, path)
+    return True
+
+
+def _split_version(version: str) -> Tuple[str, str]:
+    """Split x.y.z+build into (x.y.z, build)"""
+    name, _, build = version.partition('+')
+    return name, build or "0"
+
+
+def _render_pubspec(content: str, version: str) -> Optional[str]:
+    # Replace version (format: version: x.y.z+build)
+    pattern = r'^version:\s*[\d.]+(?:\+\d+)?'
+    if re.search(pattern, content, flags=re.MULTILINE):
+        return re.sub(pattern, f'version: {version}', content, count=1, flags=re.MULTILINE)
+    if re.search(r'^version:', content, flags=re.MULTILINE):
+        return None
+    # Add version after name line
+    return re.sub(r'^(name:.*)$', f'\\1\nversion: {version}', content, count=1, flags=re.MULTILINE)
+
+
+def _render_runner_rc(content: str, version: str) -> Optional[str]:
+    # Only the fallback defines (used when FLUTTER_VERSION_* are not passed by CMake) are literal
+    name, build = _split_version(version)
+    number = ",".join(name.split(".") + [build])
+    if not re.search(r'^#define VERSION_AS_(?:NUMBER \d|STRING ")', content, flags=re.MULTILINE):
+        return None
+    content = re.sub(r'^(#define VERSION_AS_NUMBER )\d+,\d+,\d+,\d+', f'\\g<1>{number}', content, flags=re.MULTILINE)
+    return re.sub(r'^(#define VERSION_AS_STRING )"[^"]*"', f'\\g<1>"{name}"', content, flags=re.MULTILINE)
+
+
+def _render_plist_keys(content: str, version: str) -> Optional[str]:
+    name, build = _split_version(version)
+    found = False
+    for key, value in (("CFBundleShortVersionString", name), ("CFBundleVersion", build)):
+        pattern = rf'(<key>{key}</key>\s*<string>)([^<$]*)(</string>)'
+        if re.search(pattern, content):
+            found = True
+            content = re.sub(pattern, rf'\g<1>{value}\g<3>', content)
+    return content if found else None
+
+
+def _render_xcconfig(content: str, version: str) -> Optional[str]:
+    name, build = _split_version(version)
+    found = False
+    for key, value in (("FLUTTER_BUILD_NAME", name), ("FLUTTER_BUILD_NUMBER", build)):
+        pattern = rf'^({key}\s*=\s*)[^$\s].*$'
+        if re.search(pattern, content, flags=re.MULTILINE):
+            found = True
+            content = re.sub(pattern, rf'\g<1>{value}', content, flags=re.MULTILINE)
+    return content if found else None
+
+
+VERSION_TARGETS = [
+    VersionTarget("pubspec", Path("pubspec.yaml"), _render_pubspec, required=True),
+    VersionTarget("windows_rc", Path("windows") / "runner" / "Runner.rc", _render_runner_rc),
+    VersionTarget("macos_plist", Path("macos") / "Runner" / "Info.plist", _render_plist_keys),
+    VersionTarget("macos_xcconfig", Path("macos") / "Runner" / "Configs" / "AppInfo.xcconfig", _render_xcconfig),
+]
+
+
+def parse_version(version_str: str) -> Tuple[int, int, int, int]:
+    """Parse x.y.z+build (or x.y.z) into a comparable (major, minor, patch, build) tuple
+
+    Raises ValueError for any other format.
+    """
+    # 分离版本号和构建号
+    if '+' in version_str:
+        version_part, build_part = version_str.split('+', 1)
+        build = int(build_part)
+    else:
+        version_part = version_str
+        build = 0
+
+    # Parse version number part
+    parts = version_part.split('.')
+    if len(parts) != 3:
+        raise ValueError(f"Invalid version format: {version_str}, expected x.y.z+build")
+
+    major = int(parts[0])
+    minor = int(parts[1])
+    patch = int(parts[2])
+
+    return (major, minor, patch, build)
 
 
 class VersionManager:
     """Version Manager"""
     
-    def __init__(self, version_file: str = "VERSION.yaml"):
-        """Initialize version manager"""
-        self.project_root = self._find_project_root()
+    def __init__(self, version_file: str = "VERSION.yaml", project_root: Optional[Path] = None):
+        """Initialize version manager
+
+        Args:
+            version_file: Version file name relative to project root
+            project_root: Project root, searched upward from cwd when omitted
+        """
+        self.project_root = Path(project_root) if project_root else self._find_project_root()
         self.version_file = self.project_root / version_file
+        self._data: Optional[dict] = None
         
         if not self.version_file.exists():
             raise FileNotFoundError(f"Version file not found: {self.version_file}")
@@ -55,14 +201,19 @@ class VersionManager:
         return current
     
     def _load_version_file(self) -> dict:
-        """加载版本文件"""
-        with open(self.version_file, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f) or {}
+        """加载版本文件（同一实例只解析一次）"""
+        if self._data is None:
+            if yaml is None:
+                raise RuntimeError("PyYAML library is required, please run: pip install pyyaml")
+            with open(self.version_file, 'r', encoding='utf-8') as f:
+                self._data = yaml.safe_load(f) or {}
+        return self._data
     
     def _save_version_file(self, data: dict):
-        """保存版本文件"""
-        with open(self.version_file, 'w', encoding='utf-8') as f:
-            yaml.dump(data, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        """保存版本文件（内容不变时不写入）"""
+        content = yaml.dump(data, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        write_if_changed(self.version_file, content)
+        self._data = data
     
     def _parse_version(self, version_str: str) -> Tuple[int, int, int, int]:
         """解析版本号字符串
@@ -70,24 +221,7 @@ class VersionManager:
         格式: x.y.z+build 或 x.y.z
         返回: (major, minor, patch, build)
         """
-        # 分离版本号和构建号
-        if '+' in version_str:
-            version_part, build_part = version_str.split('+', 1)
-            build = int(build_part)
-        else:
-            version_part = version_str
-            build = 0
-        
-        # Parse version number part
-        parts = version_part.split('.')
-        if len(parts) != 3:
-            raise ValueError(f"Invalid version format: {version_str}, expected x.y.z+build")
-        
-        major = int(parts[0])
-        minor = int(parts[1])
-        patch = int(parts[2])
-        
-        return (major, minor, patch, build)
+        return parse_version(version_str)
     
     def _format_version(self, major: int, minor: int, patch: int, build: int) -> str:
         """Format version string"""
@@ -144,44 +278,45 @@ class VersionManager:
         self.set_version(component, new_version)
         return new_version
     
+    def sync_all(self, component: str = "app", targets: Optional[List[VersionTarget]] = None) -> List[SyncResult]:
+        """Sync version number to every version-bearing file in one pass
+
+        VERSION.yaml is read once; each target is rendered in memory and written
+        atomically only when its content changes.
+
+        Raises:
+            FileNotFoundError: A required target (pubspec.yaml) is missing
+        """
+        version = self.get_version(component)
+        results: List[SyncResult] = []
+        for target in targets if targets is not None else VERSION_TARGETS:
+            path = self.project_root / target.relative_path
+            try:
+                with open(path, 'r', encoding='utf-8', newline='') as f:
+                    content = f.read()
+            except FileNotFoundError:
+                if target.required:
+                    raise FileNotFoundError(f"{target.relative_path} not found: {path}")
+                results.append(SyncResult(target.name, path, "skipped", "file not found"))
+                continue
+            
+            new_content = target.render(content, version)
+            if new_content is None:
+                results.append(SyncResult(target.name, path, "skipped", "no literal version"))
+            elif write_if_changed(path, new_content):
+                results.append(SyncResult(target.name, path, "updated"))
+            else:
+                results.append(SyncResult(target.name, path, "unchanged"))
+        return results
+    
     def sync_to_pubspec(self, component: str = "app"):
         """Sync version number to pubspec.yaml"""
         version = self.get_version(component)
-        pubspec_file = self.project_root / "pubspec.yaml"
-        
-        if not pubspec_file.exists():
-            raise FileNotFoundError(f"pubspec.yaml not found: {pubspec_file}")
-        
-        # Read pubspec.yaml
-        with open(pubspec_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Replace version (format: version: x.y.z+build)
-        pattern = r'^version:\s*[\d.]+(?:\+\d+)?'
-        replacement = f'version: {version}'
-        new_content = re.sub(pattern, replacement, content, flags=re.MULTILINE)
-        
-        if new_content == content:
-            # If not matched, try to add
-            if 'version:' not in content:
-                # Add version after name line
-                content = re.sub(
-                    r'^(name:.*)$',
-                    f'\\1\nversion: {version}',
-                    content,
-                    flags=re.MULTILINE
-                )
-                new_content = content
-            else:
-                # Version already matches, no need to update
-                print(f"Version already synced: {version}")
-                return True
-        
-        # Write file
-        with open(pubspec_file, 'w', encoding='utf-8') as f:
-            f.write(new_content)
-        
-        print(f"Synced version to pubspec.yaml: {version}")
+        result = self.sync_all(component, [VERSION_TARGETS[0]])[0]
+        if result.status == "updated":
+            print(f"Synced version to pubspec.yaml: {version}")
+        else:
+            print(f"Version already synced: {version}")
         return True
     
     def extract_version(self, component: str = "app", output_format: str = "text") -> str:
@@ -211,6 +346,16 @@ class VersionManager:
 
 def main():
     """Main function"""
+    # Fix encoding for Windows
+    if sys.platform == 'win32':
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+        sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+    
+    if yaml is None:
+        print("Error: PyYAML library is required")
+        print("Please run: pip install pyyaml")
+        sys.exit(1)
+    
     parser = argparse.ArgumentParser(description="Version Management Tool")
     subparsers = parser.add_subparsers(dest='command', help='Command')
     
@@ -230,7 +375,7 @@ def main():
     parser_bump.add_argument('part', choices=['major', 'minor', 'patch', 'build'], help='Part to increment')
     
     # sync command
-    parser_sync = subparsers.add_parser('sync', help='Sync version to project config file')
+    parser_sync = subparsers.add_parser('sync', help='Sync version to pubspec.yaml and platform runner files')
     parser_sync.add_argument('component', nargs='?', default='app', help='Component name')
     
     # extract command (for CI/CD)
@@ -260,7 +405,12 @@ def main():
             print(f"Version incremented to: {new_version}")
         
         elif args.command == 'sync':
-            manager.sync_to_pubspec(args.component)
+            version = manager.get_version(args.component)
+            for result in manager.sync_all(args.component):
+                if result.status == "updated":
+                    print(f"Synced version to {result.path.relative_to(manager.project_root)}: {version}")
+                elif result.status == "unchanged":
+                    print(f"Version already synced: {result.path.relative_to(manager.project_root)}")
         
         elif args.command == 'extract':
             output_format = 'json' if args.json else 'text'
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SVN 合并助手 - 合并任务时间线
+
+把 queue.json 中的任务（id、revision、状态）与应用日志中合并执行路径的日志
+（merge_execution_state.dart，MERGE tag）按任务 id 关联，重建每个任务、每个 revision、
+每个步骤（准备 → 更新 → 合并 → 校验 → 提交）的时间线，包括提交 out-of-date 后的重试
+和暂停等待人工处理的区间（日志契约见 lib/merge_timeline.py）。
+
+输出：
+- 每个任务的墙钟时间拆分：SVN 命令耗时 / 步骤内其他工作 / 等待人工 / 步骤之间的调度与刷新
+- 各步骤的耗时统计
+- `--trace`：Chrome trace-event JSON（chrome://tracing 或 https://ui.perfetto.dev 打开），
+  每个任务一行泳道，分为 revision / 步骤 / 等待人工三条轨道
+- `--json`：甘特图数据（每个任务的 revision、步骤、暂停的起止时间）和汇总
+
+SVN 命令耗时来自与步骤时间重叠的 SVN 命令（配对方式同 svn_latency.py），
+不含后台预加载的 svn log 查询。
+
+使用示例：
+```bash
+python scripts/merge_timeline.py                          # 默认日志位置 + 应用目录的 queue.json
+python scripts/merge_timeline.py logs/collected_xxx/ --queue logs/collected_xxx/queue.json
+python scripts/merge_timeline.py --job 12 --detail        # 逐个 revision 输出
+python scripts/merge_timeline.py --trace merge.trace.json --json merge_gantt.json
+```
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent / "lib"))
+from app_log_reader import LogRecord, iter_log_records, resolve_log_files
+from build_history import percentile
+from log_time_window import TimeWindow, time_argument
+from merge_timeline import (
+    BACKGROUND_OPERATIONS,
+    MERGE_TAG,
+    STEPS,
+    JobTimeline,
+    MergeTimelineCollector,
+    attribute_svn_time,
+    find_queue_file,
+    load_queue,
+    split_time,
+)
+from svn_timing import SvnLatencyCollector
+
+RESOLUTIONS = {"resume": "继续执行", "skip": "跳过 revision", "cancel": "终止任务", "": "仍在暂停"}
+
+# Chrome trace 中每个任务的轨道
+TRACK_REVISION = 1
+TRACK_STEP = 2
+TRACK_PAUSE = 3
+
+
+@dataclass
+class StepStats:
+    """某个步骤的耗时统计（秒）"""
+    step: str
+    count: int
+    failed: int
+    p50: float
+    p95: float
+    max: float
+    total: float
+    svn: float
+
+
+def extract_file(path: Path, window: Optional[TimeWindow]) -> Tuple[List[LogRecord], List[Tuple[datetime, datetime]]]:
+    """提取一个日志文件中的合并执行日志和 SVN 命令区间（在工作进程中执行）"""
+    records: List[LogRecord] = []
+    svn = SvnLatencyCollector()
+    for record in iter_log_records([path], window):
+        if record.tag == MERGE_TAG:
+            records.append(record)
+        else:
+            svn.add(record)
+    svn.finish()
+    commands = [
+        (command.started, command.ended)
+        for command in svn.commands
+        if command.started is not None and command.operation not in BACKGROUND_OPERATIONS
+    ]
+    return records, commands
+
+
+def build_timeline(files: List[Path], window: Optional[TimeWindow], jobs: int) -> MergeTimelineCollector:
+    """并行提取各文件，再按时间顺序重建时间线（暂停和重启跨越多个文件）"""
+    if jobs <= 1 or len(files) <= 1:
+        results = [extract_file(path, window) for path in files]
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(files))) as pool:
+            results = list(pool.map(extract_file, files, [window] * len(files)))
+
+    collector = MergeTimelineCollector()
+    for record in sorted((record for records, _ in results for record in records), key=lambda item: item.time):
+        collector.add(record)
+    collector.finish()
+    attribute_svn_time(list(collector.jobs.values()), [command for _, commands in results for command in commands])
+    return collector
+
+
+def build_step_stats(timelines: List[JobTimeline]) -> List[StepStats]:
+    """各步骤的耗时统计（按步骤顺序）"""
+    by_step: Dict[str, list] = {}
+    for job in timelines:
+        for step in job.steps():
+            if step.ended is not None:
+                by_step.setdefault(step.title, []).append(step)
+    stats = []
+    for title in [title for _, title in STEPS] + sorted(set(by_step) - {title for _, title in STEPS}):
+        steps = by_step.get(title)
+        if not steps:
+            continue
+        durations = [step.duration for step in steps]
+        stats.append(
+            StepStats(
+                step=title,
+                count=len(steps),
+                failed=sum(1 for step in steps if step.result in ("failed", "retry")),
+                p50=percentile(durations, 50),
+                p95=percentile(durations, 95),
+                max=max(durations),
+                total=sum(durations),
+                svn=sum(step.svn_seconds for step in steps),
+            )
+        )
+    return stats
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds >= 3600:
+        return f"{int(seconds // 3600)}h{int(seconds % 3600 // 60):02d}m"
+    if seconds >= 60:
+        return f"{int(seconds // 60)}m{int(seconds % 60):02d}s"
+    return f"{seconds:.1f}s"
+
+
+def _format_time(moment: Optional[datetime]) -> str:
+    return moment.isoformat(sep=" ", timespec="seconds") if moment else "-"
+
+
+def _share(part: float, whole: float) -> str:
+    return f"{part * 100.0 / whole:.0f}%" if whole > 0 else "-"
+
+
+def print_job(job: JobTimeline, log_end: Optional[datetime], detail: bool) -> None:
+    """输出一个任务的时间线摘要"""
+    split = split_time(job, log_end)
+    queue = job.queue or {}
+    status = f"queue.json 状态 {queue.get('status', '-')}" if job.queue else "不在 queue.json 中"
+    revisions = queue.get("revisions") or sorted({run.revision for run in job.revisions})
+    print(f"任务 #{job.job_id}  {job.result}（{status}）  {len(revisions)} 个 revision")
+    source = queue.get("sourceUrl") or job.source_url
+    if source:
+        print(f"  源 URL: {source}")
+    print(f"  时间: {_format_time(job.started)} ~ {_format_time(job.ended)}，墙钟 {_format_seconds(split.wall)}")
+    print(
+        f"  SVN 命令 {_format_seconds(split.svn)} ({_share(split.svn, split.wall)})，"
+        f"步骤内其他 {_format_seconds(split.step_other)} ({_share(split.step_other, split.wall)})，"
+        f"等待人工 {_format_seconds(split.waiting)} ({_share(split.waiting, split.wall)})"
+        + ("（仍在暂停）" if split.ongoing_pause else "")
+        + f"，调度/刷新 {_format_seconds(split.idle)} ({_share(split.idle, split.wall)})"
+    )
+    done = sum(1 for run in job.revisions if run.result == "done")
+    print(f"  完成 revision {done} 个，重试 {split.retries} 次，暂停 {len(job.pauses)} 次")
+
+    if detail:
+        for run in job.revisions:
+            steps = " ".join(
+                f"{step.title}{'#' + str(step.attempt) if step.attempt > 1 else ''} {_format_seconds(step.duration)}"
+                + ("" if step.result == "ok" else f"[{step.result}]")
+                for step in run.steps
+            )
+            elapsed = (run.ended - run.started).total_seconds() if run.ended else 0.0
+            print(f"    r{run.revision} ({run.index}/{run.total}) {run.result} {_format_seconds(elapsed)}: {steps}")
+    for pause in job.pauses:
+        end = pause.ended or log_end or pause.started
+        revision = f" r{pause.revision}" if pause.revision is not None else ""
+        print(
+            f"    暂停{revision} {_format_time(pause.started)} ~ {_format_time(pause.ended)} "
+            f"({_format_seconds((end - pause.started).total_seconds())}) → {RESOLUTIONS.get(pause.resolution, pause.resolution)}"
+        )
+        if pause.reason:
+            print(f"      原因: {pause.reason}")
+
+
+def print_report(
+    timelines: List[JobTimeline],
+    queue_only: List[Dict[str, Any]],
+    steps: List[StepStats],
+    log_end: Optional[datetime],
+    detail: bool,
+) -> None:
+    """输出文本报告"""
+    if not timelines:
+        print("没有找到合并任务的执行日志")
+    for job in timelines:
+        print_job(job, log_end, detail)
+        print()
+
+    if steps:
+        print("步骤耗时")
+        print(f"  {'步骤':<6} {'次数':>6} {'失败/重试':>9} {'p50':>8} {'p95':>8} {'最大':>8} {'总耗时':>9} {'SVN 占比':>8}")
+        for item in steps:
+            print(
+                f"  {item.step:<6} {item.count:>6} {item.failed:>9} {_format_seconds(item.p50):>8} "
+                f"{_format_seconds(item.p95):>8} {_format_seconds(item.max):>8} "
+                f"{_format_seconds(item.total):>9} {_share(item.svn, item.total):>8}"
+            )
+    if queue_only:
+        print()
+        print(f"queue.json 中另有 {len(queue_only)} 个任务没有执行日志:")
+        for job in queue_only:
+            print(f"  #{job.get('jobId')}  {job.get('status', '-')}  {len(job.get('revisions') or [])} 个 revision")
+
+
+def _iso(moment: Optional[datetime]) -> Optional[str]:
+    return moment.isoformat(timespec="milliseconds") if moment else None
+
+
+def build_gantt(job: JobTimeline, log_end: Optional[datetime]) -> Dict[str, Any]:
+    """一个任务的甘特图数据"""
+    return {
+        "job_id": job.job_id,
+        "result": job.result,
+        "queue": job.queue,
+        "source_url": (job.queue or {}).get("sourceUrl") or job.source_url,
+        "started": _iso(job.started),
+        "ended": _iso(job.ended),
+        "summary": {
+            key: round(value, 3) if isinstance(value, float) else value
+            for key, value in asdict(split_time(job, log_end)).items()
+        },
+        "revisions": [
+            {
+                "revision": run.revision,
+                "index": run.index,
+                "total": run.total,
+                "started": _iso(run.started),
+                "ended": _iso(run.ended),
+                "result": run.result,
+                "retries": run.retries,
+                "steps": [
+                    dict(asdict(step), started=_iso(step.started), ended=_iso(step.ended), duration=step.duration)
+                    for step in run.steps
+                ],
+            }
+            for run in job.revisions
+        ],
+        "pauses": [dict(asdict(pause), started=_iso(pause.started), ended=_iso(pause.ended)) for pause in job.pauses],
+    }
+
+
+def build_chrome_trace(timelines: List[JobTimeline], log_end: Optional[datetime]) -> Dict[str, Any]:
+    """Chrome trace-event 格式（时间单位：微秒，以最早的任务开始时间为 0）"""
+    if not timelines:
+        return {"traceEvents": [], "displayTimeUnit": "ms"}
+    origin = min(job.started for job in timelines)
+
+    def span(name: str, category: str, pid: int, tid: int, started: datetime, ended: Optional[datetime], args):
+        end = ended or log_end or started
+        return {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": round((started - origin).total_seconds() * 1_000_000),
+            "dur": round((end - started).total_seconds() * 1_000_000),
+            "pid": pid,
+            "tid": tid,
+            "args": args,
+        }
+
+    events: List[Dict[str, Any]] = []
+    for job in timelines:
+        pid = job.job_id
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": f"任务 #{pid}"}})
+        for tid, name in ((TRACK_REVISION, "revision"), (TRACK_STEP, "步骤"), (TRACK_PAUSE, "等待人工")):
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+        for run in job.revisions:
+            events.append(
+                span(
+                    f"r{run.revision}",
+                    "revision",
+                    pid,
+                    TRACK_REVISION,
+                    run.started,
+                    run.ended,
+                    {"index": f"{run.index}/{run.total}", "result": run.result, "retries": run.retries},
+                )
+            )
+            for step in run.steps:
+                events.append(
+                    span(
+                        step.title,
+                        "step",
+                        pid,
+                        TRACK_STEP,
+                        step.started,
+                        step.ended,
+                        {
+                            "revision": run.revision,
+                            "attempt": step.attempt,
+                            "result": step.result,
+                            "error": step.error,
+                            "svn_seconds": round(step.svn_seconds, 3),
+                        },
+                    )
+                )
+        for pause in job.pauses:
+            events.append(
+                span(
+                    "等待人工",
+                    "pause",
+                    pid,
+                    TRACK_PAUSE,
+                    pause.started,
+                    pause.ended,
+                    {"revision": pause.revision, "reason": pause.reason, "resolution": pause.resolution},
+                )
+            )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="从应用日志和 queue.json 重建合并任务时间线")
+    parser.add_argument("paths", nargs="*", type=Path, help="日志文件或目录，默认查找所有日志位置")
+    parser.add_argument("--queue", type=Path, help="queue.json 路径，默认为应用目录中的 queue.json")
+    parser.add_argument("--job", type=int, action="append", help="只输出该任务 id（可重复）")
+    parser.add_argument("--since", type=time_argument, help='起始时间，如 "2026-10-16 22:40"、"22:40"、"1d"')
+    parser.add_argument("--until", type=time_argument, help="结束时间，格式同 --since")
+    parser.add_argument("--detail", action="store_true", help="逐个 revision 输出各步骤耗时")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="并行读取日志的进程数，默认为 CPU 核数")
+    parser.add_argument("--trace", metavar="PATH", help="写出 Chrome trace-event JSON")
+    parser.add_argument("--json", metavar="PATH", help="把甘特图数据和汇总写入 JSON 文件（- 表示输出到标准输出）")
+    args = parser.parse_args(argv)
+
+    if args.jobs <= 0:
+        parser.error("--jobs 必须为正数")
+    window = TimeWindow(args.since, args.until) if args.since or args.until else None
+
+    queue_file = args.queue or find_queue_file()
+    queue: Dict[int, Dict[str, Any]] = {}
+    if queue_file is not None:
+        try:
+            queue = load_queue(queue_file)
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            print(f"读取 {queue_file} 失败: {e}", file=sys.stderr)
+            if args.queue:
+                return 1
+
+    files = resolve_log_files(args.paths, Path(__file__).parent.parent)
+    if not files:
+        print("未找到日志文件（可用 check_log_paths.py 查看检查的位置）")
+        return 1
+
+    collector = build_timeline(files, window, args.jobs)
+    log_end = collector.last_time
+    for job_id, job in collector.jobs.items():
+        job.queue = queue.get(job_id)
+    selected = set(args.job) if args.job else None
+    timelines = sorted(
+        (job for job in collector.jobs.values() if selected is None or job.job_id in selected),
+        key=lambda job: job.started,
+    )
+    queue_only = [
+        job
+        for job_id, job in queue.items()
+        if job_id not in collector.jobs and (selected is None or job_id in selected)
+    ]
+    steps = build_step_stats(timelines)
+
+    if args.trace:
+        Path(args.trace).write_text(
+            json.dumps(build_chrome_trace(timelines, log_end), ensure_ascii=False, indent=1),
+            encoding="utf-8",
+        )
+    data = {
+        "files": [str(path) for path in files],
+        "queue_file": str(queue_file) if queue_file else None,
+        "jobs": [build_gantt(job, log_end) for job in timelines],
+        "steps": [asdict(item) for item in steps],
+        "queue_only": queue_only,
+    }
+    if args.json == "-":
+        print(json.dumps(data, ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"分析 {len(files)} 个日志文件，{len(timelines)} 个合并任务")
+    print(f"queue.json: {queue_file if queue_file else '未找到'}")
+    print()
+    print_report(timelines, queue_only, steps, log_end, args.detail)
+    if args.trace:
+        print(f"\nChrome trace: {args.trace}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\nJSON 报告: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SVN 合并助手 - 应用日志索引搜索
+
+维护 logs/log_index.sqlite3 倒排索引（见 lib/log_index.py），按词、tag、级别和时间
+查找日志，直接按字节偏移读取命中的日志行，不再逐个扫描 app_*.log：
+
+- 每次运行先增量更新索引：默认日志位置、--add 加入过的目录（递归，适合收集到的日志目录）
+  和已索引的文件；没有变化的文件只比较大小和 mtime，latest.log 只索引追加的部分
+- 查询语法：`tag:svn`（可重复，任一匹配）、`level:error`（该级别及以上），其余词需全部出现；
+  词按整词匹配（r12345 也可写作 12345），中文按原文子串匹配（单个汉字也可查），带空格的短语用引号括起来
+
+使用示例：
+```bash
+python scripts/search_logs.py tag:svn level:error r12345
+python scripts/search_logs.py "合并失败" --since 1d
+python scripts/search_logs.py --add logs/collected_xxx/      # 加入收集到的日志目录并建立索引
+python scripts/search_logs.py out-of-date --count
+python scripts/search_logs.py tag:merge 提交 --json -
+```
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent / "lib"))
+from log_index import IndexTask, LogIndex, get_default_index_file, index_range, load_texts, parse_query
+from log_time_window import TimeWindow, time_argument
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def _index_task(task: IndexTask):
+    """索引一个字节范围（在工作进程中执行）"""
+    return index_range(task.path, task.start, task.end)
+
+
+def update_index(index: LogIndex, added: Sequence[Path], jobs: int, quiet: bool) -> Tuple[int, int, int]:
+    """增量更新索引，返回 (索引的片段数, 字节数, 删除的记录数)"""
+    index.add_roots([path for path in added if path.is_dir()])
+    files = index.candidate_files(PROJECT_ROOT)
+    files.extend(path.resolve() for path in added if path.is_file())
+    tasks, dropped = index.plan(sorted(set(files)))
+    if not tasks:
+        return 0, 0, dropped
+
+    total = sum(task.end - task.start for task in tasks)
+    if not quiet:
+        print(f"更新索引: {len(tasks)} 个文件片段，{total / 1024 / 1024:.1f} MB ...", file=sys.stderr)
+    if jobs <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            index.store(task, _index_task(task))
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+            for task, segment in zip(tasks, pool.map(_index_task, tasks)):
+                index.store(task, segment)
+    return len(tasks), total, dropped
+
+
+def print_stats(index: LogIndex) -> None:
+    stats = index.stats()
+    print(f"索引: {index.index_file}（{stats['index_bytes'] / 1024 / 1024:.1f} MB）")
+    print(
+        f"  {stats['files']} 个文件，{stats['indexed_bytes'] / 1024 / 1024:.1f} MB 日志，"
+        f"{stats['records']} 条记录，{stats['segments']} 个片段，{stats['tokens']} 个词"
+    )
+    roots = index.roots()
+    if roots:
+        print("  递归索引的目录:")
+        for root in roots:
+            print(f"    {root}{'' if root.is_dir() else '（不存在）'}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="应用日志倒排索引与搜索")
+    parser.add_argument("query", nargs="*", help="查询词，如 tag:svn level:error r12345；不给出时只更新索引")
+    parser.add_argument("--add", type=Path, action="append", default=[], help="加入索引的目录（递归）或日志文件，可重复")
+    parser.add_argument("--index", type=Path, help=f"索引文件，默认 {get_default_index_file()}")
+    parser.add_argument("--no-update", action="store_true", help="不更新索引，直接查询")
+    parser.add_argument("--rebuild", action="store_true", help="删除索引后重建")
+    parser.add_argument("--stats", action="store_true", help="输出索引规模")
+    parser.add_argument("--since", type=time_argument, help='起始时间，如 "2026-10-16 22:40"、"22:40"、"2h"')
+    parser.add_argument("--until", type=time_argument, help="结束时间，格式同 --since")
+    parser.add_argument("--limit", type=int, default=200, help="最多输出的条数（按时间取最新的），0 表示不限，默认 200")
+    parser.add_argument("--count", action="store_true", help="只输出命中条数")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="并行建索引的进程数，默认为 CPU 核数")
+    parser.add_argument("--json", metavar="PATH", help="把命中的日志写入 JSON 文件（- 表示输出到标准输出）")
+    args = parser.parse_args(argv)
+
+    if args.jobs <= 0 or args.limit < 0:
+        parser.error("--jobs 必须为正数，--limit 不能为负数")
+    for path in args.add:
+        if not path.exists():
+            parser.error(f"路径不存在: {path}")
+    try:
+        query = parse_query(args.query)
+    except ValueError as e:
+        parser.error(str(e))
+    window = TimeWindow(args.since, args.until) if args.since or args.until else None
+
+    index_file = args.index or get_default_index_file()
+    if args.rebuild and index_file.exists():
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{index_file}{suffix}").unlink(missing_ok=True)
+    index = LogIndex(index_file)
+    try:
+        quiet = args.json == "-"
+        if not args.no_update:
+            started = time.monotonic()
+            indexed, total, dropped = update_index(index, args.add, args.jobs, quiet)
+            if not quiet and (indexed or dropped or not args.query):
+                print(
+                    f"索引已更新: 新增 {indexed} 个片段（{total / 1024 / 1024:.1f} MB），"
+                    f"移除 {dropped} 个已删除或已轮转的文件，耗时 {time.monotonic() - started:.2f}s",
+                    file=sys.stderr,
+                )
+        if args.stats or not args.query:
+            print_stats(index)
+        if not args.query:
+            return 0
+
+        started = time.monotonic()
+        hits = index.search(query, window)
+        if any(term.needs_verify for term in query.terms):
+            hits = load_texts(hits, query)
+            matched = len(hits)
+            shown = hits[-args.limit:] if args.limit else hits
+        else:
+            matched = len(hits)
+            shown = load_texts(hits[-args.limit:] if args.limit else hits, query)
+        elapsed = time.monotonic() - started
+    finally:
+        index.close()
+
+    if args.count:
+        print(matched)
+        return 0 if matched else 1
+    if args.json:
+        data = {
+            "query": args.query,
+            "matched": matched,
+            "elapsed": round(elapsed, 4),
+            "hits": [
+                {"path": str(hit.path), "offset": hit.offset, "time": hit.time.isoformat(timespec="milliseconds"), "text": hit.text}
+                for hit in shown
+            ],
+        }
+        text = json.dumps(data, ensure_ascii=False, indent=2)
+        if args.json == "-":
+            print(text)
+            return 0 if matched else 1
+        Path(args.json).write_text(text, encoding="utf-8")
+
+    current: Optional[Path] = None
+    for hit in shown:
+        if hit.path != current:
+            current = hit.path
+            print(f"\n{current}")
+        lines = hit.text.split("\n")
+        print(f"  @{hit.offset:<10} {lines[0]}")
+        for line in lines[1:]:
+            print(f"  {'':<11} {line}")
+    print()
+    omitted = f"，显示最新的 {len(shown)} 条" if len(shown) < matched else ""
+    print(f"命中 {matched} 条{omitted}，查询耗时 {elapsed * 1000:.1f}ms")
+    if args.json:
+        print(f"JSON 结果: {args.json}")
+    return 0 if matched else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SVN 合并助手 - SVN 操作耗时分析
+
+从应用日志中提取每次 SVN 命令的耗时（svn_service.dart 的 `[SVN 命令执行]` 开始行与
+`✓/✗ SVN 命令执行成功/失败 (..., 耗时: Nms)` 结束行按时间配对），按操作输出：
+- 次数、失败次数、p50 / p95 / p99、最大值、总耗时及占全部 SVN 耗时的比例
+- 耗时直方图
+
+并统计日志同步（log_sync_service.dart 的 `【步骤 i/n】` 阶段）：各阶段耗时，
+以及获取日志阶段每秒获取的条数。命令与阶段的日志契约见 lib/svn_timing.py。
+
+每个日志文件对应一次应用运行，各文件在独立进程中并行分析后合并。
+
+使用示例：
+```bash
+python scripts/svn_latency.py                         # 所有默认位置的日志
+python scripts/svn_latency.py logs/collected_xxx/     # 分析收集到的日志目录
+python scripts/svn_latency.py --since 1d --operation merge --operation commit
+python scripts/svn_latency.py --json report.json
+```
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent / "lib"))
+from app_log_reader import iter_log_records, resolve_log_files
+from build_history import percentile
+from log_time_window import TimeWindow, time_argument
+from svn_timing import OPERATION_NAMES, OPERATIONS, SvnCommand, SvnLatencyCollector, SyncRun, histogram
+
+# 直方图条形的最大宽度
+BAR_WIDTH = 40
+
+
+@dataclass
+class OperationStats:
+    """某类 SVN 操作的耗时统计（毫秒）"""
+    operation: str
+    description: str
+    count: int
+    failed: int
+    p50: float
+    p95: float
+    p99: float
+    max: float
+    total: float
+    share: float
+    histogram: List[Tuple[str, int]]
+
+
+@dataclass
+class StepStats:
+    """某个同步阶段的耗时统计（秒）"""
+    name: str
+    count: int
+    p50: float
+    p95: float
+    max: float
+
+
+def collect_file(path: Path, window: Optional[TimeWindow]) -> Tuple[List[SvnCommand], List[SyncRun]]:
+    """分析一个日志文件（在工作进程中执行）"""
+    collector = SvnLatencyCollector()
+    for record in iter_log_records([path], window):
+        collector.add(record)
+    collector.finish()
+    return collector.commands, collector.syncs
+
+
+def collect(files: List[Path], window: Optional[TimeWindow], jobs: int) -> Tuple[List[SvnCommand], List[SyncRun]]:
+    """并行分析所有日志文件，按时间合并结果"""
+    if jobs <= 1 or len(files) <= 1:
+        results = [collect_file(path, window) for path in files]
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(files))) as pool:
+            results = list(pool.map(collect_file, files, [window] * len(files)))
+    commands = sorted((command for items, _ in results for command in items), key=lambda item: item.ended)
+    syncs = sorted((sync for _, items in results for sync in items), key=lambda item: item.started)
+    return commands, syncs
+
+
+def build_operation_stats(commands: List[SvnCommand], operations: Optional[List[str]]) -> List[OperationStats]:
+    """按操作汇总命令耗时，按预定义顺序、其余按总耗时排列"""
+    by_operation: Dict[str, List[SvnCommand]] = {}
+    for command in commands:
+        by_operation.setdefault(command.operation, []).append(command)
+    grand_total = sum(command.duration for command in commands) * 1000
+
+    order = [key for key, _ in OPERATIONS if key in by_operation]
+    order += sorted(
+        (key for key in by_operation if key not in order),
+        key=lambda key: -sum(command.duration for command in by_operation[key]),
+    )
+    stats = []
+    for key in order:
+        if operations and key not in operations:
+            continue
+        values = [command.duration * 1000 for command in by_operation[key]]
+        total = sum(values)
+        stats.append(
+            OperationStats(
+                operation=key,
+                description=OPERATION_NAMES.get(key, f"svn {key}"),
+                count=len(values),
+                failed=sum(1 for command in by_operation[key] if not command.success),
+                p50=percentile(values, 50),
+                p95=percentile(values, 95),
+                p99=percentile(values, 99),
+                max=max(values),
+                total=total,
+                share=total * 100.0 / grand_total if grand_total else 0.0,
+                histogram=histogram(values),
+            )
+        )
+    return stats
+
+
+def build_step_stats(syncs: List[SyncRun]) -> List[StepStats]:
+    """各同步阶段的耗时统计（按首次出现顺序）"""
+    by_step: Dict[str, List[float]] = {}
+    for sync in syncs:
+        for name, elapsed in sync.steps.items():
+            by_step.setdefault(name, []).append(elapsed)
+    return [
+        StepStats(name, len(values), percentile(values, 50), percentile(values, 95), max(values))
+        for name, values in by_step.items()
+    ]
+
+
+def _format_ms(value: float) -> str:
+    return f"{value / 1000:.2f}s" if value >= 1000 else f"{value:.0f}ms"
+
+
+def print_report(stats: List[OperationStats], syncs: List[SyncRun], steps: List[StepStats], unmatched: int) -> None:
+    """输出文本报告"""
+    print("SVN 命令耗时")
+    if not stats:
+        print("  没有找到 SVN 命令日志")
+    else:
+        print(f"  {'操作':<28} {'次数':>6} {'失败':>5} {'p50':>8} {'p95':>8} {'p99':>8} {'最大':>8} {'总耗时':>9} {'占比':>6}")
+        for item in stats:
+            print(
+                f"  {item.description:<28} {item.count:>6} {item.failed:>5} {_format_ms(item.p50):>8} "
+                f"{_format_ms(item.p95):>8} {_format_ms(item.p99):>8} {_format_ms(item.max):>8} "
+                f"{_format_ms(item.total):>9} {item.share:>5.1f}%"
+            )
+    if unmatched:
+        print(f"  另有 {unmatched} 条结束日志没有找到对应的开始日志（计入 unknown）")
+
+    for item in stats:
+        print()
+        print(f"{item.description} 耗时分布（{item.count} 次）")
+        peak = max(count for _, count in item.histogram) or 1
+        for label, count in item.histogram:
+            if count:
+                print(f"  {label:>9} {count:>6} {'█' * max(1, round(count * BAR_WIDTH / peak))}")
+
+    print()
+    print("日志同步")
+    if not syncs:
+        print("  没有找到日志同步记录")
+        return
+    results: Dict[str, int] = {}
+    for sync in syncs:
+        results[sync.result] = results.get(sync.result, 0) + 1
+    durations = [sync.duration for sync in syncs if sync.duration is not None and sync.result == "ok"]
+    print(f"  次数: {len(syncs)}（" + "，".join(f"{name} {count}" for name, count in sorted(results.items())) + "）")
+    if durations:
+        print(f"  成功同步耗时 p50 {percentile(durations, 50):.2f}s，p95 {percentile(durations, 95):.2f}s")
+
+    rates = [sync.entries_per_second for sync in syncs if sync.entries_per_second is not None]
+    if rates:
+        fetched = sum(sync.fetched for sync in syncs if sync.entries_per_second is not None)
+        seconds = sum(sync.fetch_seconds for sync in syncs if sync.entries_per_second is not None)
+        print(
+            f"  获取日志: 共 {fetched} 条，整体 {fetched / seconds:.1f} 条/秒，"
+            f"单次 p50 {percentile(rates, 50):.1f} 条/秒，最慢 {min(rates):.1f} 条/秒"
+        )
+    if steps:
+        print(f"  {'阶段':<20} {'次数':>6} {'p50':>8} {'p95':>8} {'最大':>8}")
+        for step in steps:
+            print(f"  {step.name:<20} {step.count:>6} {step.p50:>7.2f}s {step.p95:>7.2f}s {step.max:>7.2f}s")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="从应用日志统计 SVN 操作耗时")
+    parser.add_argument("paths", nargs="*", type=Path, help="日志文件或目录，默认查找所有日志位置")
+    parser.add_argument(
+        "--operation",
+        action="append",
+        help="只输出该操作（head / log / mergeinfo / merge / commit / update ...，可重复）",
+    )
+    parser.add_argument("--since", type=time_argument, help='起始时间，如 "2026-10-16 22:40"、"22:40"、"1d"')
+    parser.add_argument("--until", type=time_argument, help="结束时间，格式同 --since")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="并行分析的进程数，默认为 CPU 核数")
+    parser.add_argument("--json", metavar="PATH", help="把报告写入 JSON 文件（- 表示输出到标准输出）")
+    args = parser.parse_args(argv)
+
+    if args.jobs <= 0:
+        parser.error("--jobs 必须为正数")
+    window = TimeWindow(args.since, args.until) if args.since or args.until else None
+
+    files = resolve_log_files(args.paths, Path(__file__).parent.parent)
+    if not files:
+        print("未找到日志文件（可用 check_log_paths.py 查看检查的位置）")
+        return 1
+
+    commands, syncs = collect(files, window, args.jobs)
+    stats = build_operation_stats(commands, args.operation)
+    steps = build_step_stats(syncs)
+    unmatched = sum(1 for command in commands if command.started is None)
+
+    data = {
+        "files": [str(path) for path in files],
+        "operations": [asdict(item) for item in stats],
+        "syncs": [
+            dict(
+                asdict(sync),
+                started=sync.started.isoformat(timespec="milliseconds"),
+                ended=sync.ended.isoformat(timespec="milliseconds") if sync.ended else None,
+                duration=sync.duration,
+                entries_per_second=sync.entries_per_second,
+            )
+            for sync in syncs
+        ],
+        "steps": [asdict(step) for step in steps],
+        "unmatched_results": unmatched,
+    }
+    if args.json == "-":
+        print(json.dumps(data, ensure_ascii=False, indent=2))
+        return 0
+    print(f"分析 {len(files)} 个日志文件，{len(commands)} 次 SVN 命令，{len(syncs)} 次日志同步")
+    print()
+    print_report(stats, syncs, steps, unmatched)
+    if args.json:
+        Path(args.json).write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\nJSON 报告: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
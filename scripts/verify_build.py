@@ -6,15 +6,39 @@ SVN 合并助手 - 构建环境验证脚本（跨平台 Python 实现）
 验证 Flutter 构建环境
 检查环境是否准备好进行构建
 
+各项检查声明依赖关系，由 lib/check_runner.py 并发执行并记录耗时：
+- Flutter 版本、flutter doctor、CMake、设备列表在开始时并发探测，
+  结果按 TTL 缓存（见 lib/env_probe.py）
+- 依赖获取与 dry-run 构建的输入指纹未变化时沿用上次成功结果
+  （依赖获取与 build.py / deploy.py 共用指纹缓存）
+- --refresh-env 忽略缓存重新执行；--json / --report 输出 JSON 检查报告
+
 路径处理规则：
 - 必须使用 pathlib.Path 处理所有路径
 """
 
+import argparse
+import json
 import sys
-import subprocess
 import os
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent / 'lib'))
+from build_fingerprint import FingerprintCache, flutter_build_inputs, pub_get_inputs
+from check_runner import (
+    STATUS_FAIL,
+    STATUS_OK,
+    STATUS_SKIPPED,
+    STATUS_WARN,
+    Check,
+    CheckOutcome,
+    CheckResult,
+    CheckRunner,
+)
+from env_probe import EnvProbe, ProbeResult, run_tool
+
+STATUS_MARKS = {STATUS_OK: "✓", STATUS_WARN: "⚠", STATUS_FAIL: "✗", STATUS_SKIPPED: "-"}
 
 
 def get_project_root() -> Path:
@@ -24,121 +48,158 @@ def get_project_root() -> Path:
     return project_root
 
 
-def find_command(cmd: str) -> Optional[str]:
-    """查找命令是否在 PATH 中"""
-    import platform
-    if platform.system() == 'Windows':
-        result = subprocess.run(
-            ['where', cmd],
-            capture_output=True,
-            text=True,
-            check=False
-        )
-    else:
-        result = subprocess.run(
-            ['which', cmd],
-            capture_output=True,
-            text=True,
-            check=False
-        )
-    
-    if result.returncode == 0:
-        return result.stdout.strip().split('\n')[0]
-    return None
-
-
-def run_command(cmd: list, check: bool = False) -> bool:
-    """运行命令"""
-    try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=60,
-            check=check
+def probe_outcome(result: ProbeResult, status: str, message: str, details: Optional[List[str]] = None) -> CheckOutcome:
+    """由探测结果构造检查结果（探测命中缓存时标记为 cached）"""
+    return CheckOutcome(status, message, details or [], cached=result.cached)
+
+
+def build_checks(project_root: Path, probe: EnvProbe, cache: FingerprintCache) -> List[Check]:
+    """声明各项检查及其依赖"""
+    flutter_path = probe.flutter_path or 'flutter'
+
+    def check_flutter() -> CheckOutcome:
+        if not probe.flutter_path:
+            return CheckOutcome(STATUS_FAIL, "未找到 Flutter")
+        version = probe.get('flutter_version')
+        if not version.ok:
+            return probe_outcome(version, STATUS_FAIL, "flutter --version 执行失败")
+        return probe_outcome(version, STATUS_OK, f"已检测到 Flutter: {version.value}")
+
+    def check_doctor() -> CheckOutcome:
+        doctor = probe.get('doctor')
+        if not doctor.ok:
+            return probe_outcome(doctor, STATUS_WARN, "flutter doctor 执行失败")
+        issues = doctor.value["issues"]
+        if issues:
+            return probe_outcome(doctor, STATUS_WARN, f"flutter doctor 发现 {len(issues)} 项问题", issues)
+        return probe_outcome(doctor, STATUS_OK, "flutter doctor 未发现问题")
+
+    def check_project() -> CheckOutcome:
+        if not (project_root / 'pubspec.yaml').exists():
+            return CheckOutcome(STATUS_FAIL, f"未找到 pubspec.yaml: {project_root}")
+        return CheckOutcome(STATUS_OK, f"项目目录: {project_root}")
+
+    def pub_digest() -> str:
+        return cache.fingerprint(project_root, pub_get_inputs(project_root, flutter_path), extra={"flutter": flutter_path})
+
+    def run_pub_get() -> CheckOutcome:
+        result = run_tool([flutter_path, 'pub', 'get'], timeout=600)
+        if result.returncode != 0:
+            return CheckOutcome(STATUS_FAIL, "获取依赖失败", (result.stdout + result.stderr).splitlines()[-10:])
+        return CheckOutcome(STATUS_OK, "依赖获取成功")
+
+    def check_cmake() -> CheckOutcome:
+        cmake = probe.get('cmake')
+        if not cmake.ok:
+            return probe_outcome(cmake, STATUS_WARN, "未检测到 CMake（Windows 构建可能需要）")
+        return probe_outcome(cmake, STATUS_OK, f"已检测到 CMake: {cmake.value}")
+
+    def check_devices() -> CheckOutcome:
+        devices = probe.get('devices')
+        if not devices.ok:
+            return probe_outcome(devices, STATUS_WARN, "获取设备列表失败")
+        names = [
+            f"{device.get('name') or device.get('id')} ({device.get('targetPlatform') or '-'})"
+            for device in devices.value
+        ]
+        return probe_outcome(devices, STATUS_OK, f"检测到 {len(devices.value)} 个可用设备", names)
+
+    def dry_run_digest() -> str:
+        return cache.fingerprint(
+            project_root,
+            flutter_build_inputs(project_root, 'windows', flutter_path),
+            extra={"flutter": flutter_path, "platform": "windows", "mode": "debug", "dry_run": True},
         )
-        return result.returncode == 0
-    except Exception:
-        return False
 
-
-def main():
+    def run_dry_run() -> CheckOutcome:
+        result = run_tool([flutter_path, 'build', 'windows', '--debug', '--dry-run'], timeout=60)
+        if result.returncode == 0:
+            return CheckOutcome(STATUS_OK, "构建配置看起来正常")
+        if 'build windows' in result.stdout:
+            return CheckOutcome(STATUS_OK, "构建配置看起来正常")
+        return CheckOutcome(STATUS_WARN, "dry-run 已完成（可能仍有警告）")
+
+    return [
+        Check('flutter', "检查 Flutter", check_flutter),
+        Check('doctor', "运行 flutter doctor", check_doctor, deps=['flutter']),
+        Check('project', "检查项目目录", check_project),
+        Check(
+            'pub_get',
+            "获取依赖",
+            run_pub_get,
+            deps=['flutter', 'project'],
+            cache_key='pub_get',
+            fingerprint=pub_digest,
+            outputs=lambda: [project_root / '.dart_tool' / 'package_config.json'],
+        ),
+        Check('cmake', "检查构建工具", check_cmake),
+        Check('devices', "检查可用设备", check_devices, deps=['flutter']),
+        Check(
+            'dry_run',
+            "测试构建（dry-run）",
+            run_dry_run,
+            deps=['pub_get'],
+            cache_key='verify_dry_run_windows',
+            fingerprint=dry_run_digest,
+        ),
+    ]
+
+
+def print_result(result: CheckResult):
+    """输出一项检查的结果（按完成顺序）"""
+    flags = f"{result.duration:.1f}s" + ("，缓存" if result.cached else "")
+    print(f"{STATUS_MARKS[result.status]} {result.description}（{flags}）: {result.message}")
+    for detail in result.details:
+        print(f"    {detail}")
+
+
+def main(argv: Optional[List[str]] = None):
     """主函数"""
-    print("=" * 40)
-    print("  验证构建环境")
-    print("=" * 40)
-    print()
+    parser = argparse.ArgumentParser(description="验证 Flutter 构建环境")
+    parser.add_argument('--refresh-env', action='store_true', help='忽略缓存，重新探测 Flutter 环境并重新执行所有检查')
+    parser.add_argument('--json', action='store_true', help='以 JSON 格式输出检查报告')
+    parser.add_argument('--report', type=Path, help='把 JSON 检查报告写入该文件')
+    parser.add_argument('--jobs', type=int, default=4, help='最大并发检查数，默认 4')
+    args = parser.parse_args(argv)
     
     project_root = get_project_root()
     os.chdir(str(project_root))
     
-    # 1. 检查 Flutter
-    print("1. 检查 Flutter...")
-    flutter_cmd = find_command('flutter')
-    if flutter_cmd:
-        try:
-            result = subprocess.run(
-                ['flutter', '--version'],
-                capture_output=True,
-                text=True,
-                timeout=10,
-                check=False
-            )
-            if result.returncode == 0:
-                version_line = result.stdout.split('\n')[0]
-                print(f"✓ 已检测到 Flutter: {version_line}")
-            else:
-                print("✗ 未找到 Flutter")
-                return 1
-        except Exception:
-            print("✗ 未找到 Flutter")
-            return 1
-    else:
-        print("✗ 未找到 Flutter")
-        return 1
+    if not args.json:
+        print("=" * 40)
+        print("  验证构建环境")
+        print("=" * 40)
+        print()
     
-    # 2. 运行 flutter doctor
-    print("\n2. 运行 flutter doctor...")
-    run_command(['flutter', 'doctor'], check=False)
+    # 环境探测在后台提前启动，检查按依赖关系并发执行
+    probe = EnvProbe(use_cache=not args.refresh_env)
+    if probe.flutter_path:
+        probe.start(['flutter_version', 'doctor', 'cmake', 'devices'])
+    cache = FingerprintCache.for_project(project_root)
+    checks = build_checks(project_root, probe, cache)
+    if args.refresh_env:
+        for check in checks:
+            if check.cache_key:
+                cache.invalidate(check.cache_key)
+    runner = CheckRunner(checks, cache=cache, max_workers=max(1, args.jobs))
+    runner.run(on_result=None if args.json else print_result)
+    probe.shutdown()
     
-    # 3. 检查项目目录
-    print("\n3. 检查项目目录...")
-    print(f"✓ 项目目录: {project_root}")
+    report = runner.report()
+    if args.report:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        args.report.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return 1 if runner.failed else 0
     
-    # 4. 获取依赖
-    print("\n4. 获取依赖...")
-    if run_command(['flutter', 'pub', 'get']):
-        print("✓ 依赖获取成功")
-    else:
-        print("✗ 获取依赖失败")
+    print(f"\n总耗时 {report['duration']:.1f} 秒（各项检查耗时合计 {report['serial_duration']:.1f} 秒）")
+    if args.report:
+        print(f"检查报告: {args.report}")
+    if runner.failed:
+        print("\n✗ 构建环境验证未通过")
         return 1
     
-    # 5. 检查构建工具
-    print("\n5. 检查构建工具...")
-    cmake_cmd = find_command('cmake')
-    if cmake_cmd:
-        print("✓ 已检测到 CMake")
-    else:
-        print("⚠ 未检测到 CMake（Windows 构建可能需要）")
-    
-    # 6. 检查设备
-    print("\n6. 检查可用设备...")
-    run_command(['flutter', 'devices'], check=False)
-    
-    # 7. 测试构建（dry-run）
-    print("\n7. 测试构建（dry-run）...")
-    result = subprocess.run(
-        ['flutter', 'build', 'windows', '--debug', '--dry-run'],
-        capture_output=True,
-        text=True,
-        timeout=60,
-        check=False
-    )
-    if 'build windows' in result.stdout or result.returncode == 0:
-        print("✓ 构建配置看起来正常")
-    else:
-        print("⚠ dry-run 已完成（可能仍有警告）")
-    
     print("\n" + "=" * 40)
     print("  构建环境验证完成！")
     print("=" * 40)